@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 
 from pebblo.app.api.req_models import ReqDiscover, ReqLoaderDoc, ReqPrompt, ReqPromptGov
 from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.classification_executor import run_classification
 from pebblo.app.service.prompt_gov import PromptGov
 from pebblo.app.utils.handler_mapper import get_handler
 
@@ -33,13 +34,15 @@ class App:
         return response
 
     @staticmethod
-    def loader_doc(
+    async def loader_doc(
         data: ReqLoaderDoc,
         loader_doc_obj=Depends(lambda: get_handler(handler_name="loader")),
     ):
         # "/loader/doc" API entrypoint
-        # Execute loader doc object based on a storage type
-        response = loader_doc_obj.process_request(data.model_dump())
+        # Execute loader doc object based on a storage type, on the bounded classification executor
+        response = await run_classification(
+            loader_doc_obj.process_request, data.model_dump()
+        )
         return response
 
     @staticmethod
@@ -49,17 +52,19 @@ class App:
         return response
 
     @staticmethod
-    def prompt(
+    async def prompt(
         data: ReqPrompt, prompt_obj=Depends(lambda: get_handler(handler_name="prompt"))
     ):
         # "/prompt" API entrypoint
-        # Execute a prompt object based on a storage type
-        response = prompt_obj.process_request(data.model_dump())
+        # Execute a prompt object based on a storage type, on the bounded classification executor
+        response = await run_classification(
+            prompt_obj.process_request, data.model_dump()
+        )
         return response
 
     @staticmethod
-    def promptgov(data: ReqPromptGov):
+    async def promptgov(data: ReqPromptGov):
         # "/prompt/governance" API entrypoint
         prompt_obj = PromptGov(data=data.model_dump())
-        response = prompt_obj.process_request()
+        response = await run_classification(prompt_obj.process_request)
         return response
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
 
 from pebblo.app.daemon import server_version
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.metrics import metrics_registry
 
 
 class App:
@@ -17,3 +20,19 @@ class App:
     @staticmethod
     def health(request: Request):
         return f"Pebblo Server version {server_version} is running"
+
+    @staticmethod
+    def ready():
+        # Ready only after classifier models are loaded and warmed up
+        if get_classification_engine().is_ready:
+            return PlainTextResponse(f"Pebblo Server version {server_version} is ready")
+        return PlainTextResponse(
+            "Pebblo Server is initializing classifier models", status_code=503
+        )
+
+    @staticmethod
+    def metrics():
+        # Server metrics in Prometheus text exposition format
+        return PlainTextResponse(
+            metrics_registry.render(), media_type="text/plain; version=0.0.4"
+        )
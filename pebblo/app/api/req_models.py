@@ -2,9 +2,10 @@
 
 from typing import List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from pebblo.app.enums.common import ClassificationMode
+from pebblo.entity_classifier.utils.config import get_entity_types
 
 
 class Runtime(BaseModel):
@@ -67,6 +68,15 @@ class ReqLoaderDoc(BaseModel):
     classifier_location: str
     classifier_mode: Optional[str] = None
     anonymize_snippets: Optional[bool] = None
+    classifier_entities: Optional[List[str]] = None
+
+    @field_validator("classifier_entities")
+    @classmethod
+    def validate_classifier_entities(
+        cls, classifier_entities: Optional[List[str]]
+    ) -> Optional[List[str]]:
+        get_entity_types(classifier_entities)
+        return classifier_entities
 
 
 class Context(BaseModel):
@@ -96,12 +106,26 @@ class ReqPrompt(BaseModel):
 
 class ReqPromptGov(BaseModel):
     prompt: str
+    entities: Optional[List[str]] = None
+
+    @field_validator("entities")
+    @classmethod
+    def validate_entities(cls, entities: Optional[List[str]]) -> Optional[List[str]]:
+        get_entity_types(entities)
+        return entities
 
 
 class ReqClassifier(BaseModel):
     data: str
     mode: Optional[ClassificationMode] = Field(default=ClassificationMode.ALL)
     anonymize: Optional[bool] = Field(default=False)
+    entities: Optional[List[str]] = None
+
+    @field_validator("entities")
+    @classmethod
+    def validate_entities(cls, entities: Optional[List[str]]) -> Optional[List[str]]:
+        get_entity_types(entities)
+        return entities
 
     class Config:
         extra = "forbid"
@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from pebblo.app.api.req_models import ReqClassifier
 from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.classification_executor import run_classification
 from pebblo.app.service.classification import Classification
 
 config_details = var_server_config_dict.get()
@@ -16,9 +17,9 @@ class APIv1:
         self.router = APIRouter(prefix=prefix)
 
     @staticmethod
-    def classify_data(data: ReqClassifier):
+    async def classify_data(data: ReqClassifier):
         # "/classify" API entrypoint
-        # Execute entity/topic classification
+        # Execute entity/topic classification on the bounded classification executor
         cls_obj = Classification(data.model_dump())
-        response = cls_obj.process_request()
+        response = await run_classification(cls_obj.process_request)
         return response
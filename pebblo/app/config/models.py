@@ -1,7 +1,8 @@
 import importlib.util
 import logging
 import os
-from typing import Optional, Union
+import re
+from typing import List, Optional, Union
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
@@ -12,6 +13,7 @@ from pebblo.app.config.utils import (
     DEFAULT_LOG_FILE,
     DEFAULT_LOG_LEVEL,
     DEFAULT_LOG_MAX_FILE_SIZE,
+    DEFAULT_MODEL_BUNDLE_DIR,
     dir_path,
     expand_path,
     update_anonymize_snippets_exists,
@@ -19,9 +21,11 @@ from pebblo.app.config.utils import (
 from pebblo.app.enums.common import (
     ClassificationMode,
     DBStorageTypes,
+    NlpProfile,
     ReportFormat,
     ReportLibraries,
     StorageTypes,
+    TopicBackend,
 )
 
 
@@ -29,6 +33,7 @@ from pebblo.app.enums.common import (
 class DaemonConfig(BaseSettings):
     host: str = Field(default="localhost")
     port: int = Field(default=8000)
+    workers: int = Field(default=1)
 
     @field_validator("port")
     @classmethod
@@ -40,6 +45,16 @@ class DaemonConfig(BaseSettings):
             )
         return port
 
+    @field_validator("workers")
+    @classmethod
+    def validate_workers(cls, workers: int) -> int:
+        # check to validate at least one server worker is configured
+        if workers < 1:
+            raise ValueError(
+                f"Error: Invalid workers '{workers}'. workers must be greater than or equal to 1."
+            )
+        return workers
+
 
 # Logging BaseModel
 class LoggingConfig(BaseSettings):
@@ -141,6 +156,27 @@ class ClassifierConfig(BaseSettings):
     mode: str = Field(default=ClassificationMode.ALL.value)
     use_llm: bool = Field(default=False)
     anonymizeSnippets: Optional[bool] = None
+    replicas: int = Field(default=1)
+    maxConcurrency: int = Field(default=2)
+    maxQueueSize: int = Field(default=32)
+    processes: int = Field(default=0)
+    batchSize: int = Field(default=8)
+    maxTasksPerProcess: int = Field(default=1000)
+    nlpBatchSize: int = Field(default=32)
+    cacheSize: int = Field(default=4096)
+    cacheDiskSize: int = Field(default=100000)
+    cachePath: Optional[str] = None
+    windowSize: int = Field(default=20000)
+    windowOverlap: int = Field(default=4096)
+    secretPatterns: List[dict] = Field(default=[])
+    regexTimeout: float = Field(default=1.0)
+    recognizerTimings: bool = Field(default=False)
+    nlpProfile: str = Field(default=NlpProfile.LG.value)
+    topicBackend: str = Field(default=TopicBackend.PYTORCH.value)
+    topicQuantize: bool = Field(default=False)
+    topicThreads: int = Field(default=0)
+    offline: bool = Field(default=False)
+    bundleDir: str = Field(default=DEFAULT_MODEL_BUNDLE_DIR)
 
     @field_validator("mode")
     @classmethod
@@ -154,6 +190,183 @@ class ClassifierConfig(BaseSettings):
             )
         return mode
 
+    @field_validator("nlpProfile")
+    @classmethod
+    def validate_nlp_profile(cls, nlp_profile: str) -> str:
+        # check to validate the spaCy pipeline size is one of the supported profiles
+        valid_nlp_profiles = [profile.value for profile in NlpProfile]
+        if nlp_profile not in valid_nlp_profiles:
+            raise ValueError(
+                f"Error: Unsupported nlpProfile '{nlp_profile}' specified in the configuration. Valid values are {valid_nlp_profiles}"
+            )
+        if nlp_profile == NlpProfile.TRF.value:
+            # Check if spacy-transformers is installed, the transformer pipeline can not be loaded without it
+            if importlib.util.find_spec("spacy_transformers") is None:
+                raise ValueError(
+                    "Error: `nlpProfile: trf` was specified, but spacy-transformers was not found. "
+                    "Install it with `pip install 'pebblo[trf]'`."
+                )
+        return nlp_profile
+
+    @field_validator("topicBackend")
+    @classmethod
+    def validate_topic_backend(cls, topic_backend: str) -> str:
+        # check to validate the topic classifier runs with a supported inference backend
+        valid_topic_backends = [backend.value for backend in TopicBackend]
+        if topic_backend not in valid_topic_backends:
+            raise ValueError(
+                f"Error: Unsupported topicBackend '{topic_backend}' specified in the configuration. Valid values are {valid_topic_backends}"
+            )
+        return topic_backend
+
+    @field_validator("topicThreads")
+    @classmethod
+    def validate_topic_threads(cls, topic_threads: int) -> int:
+        # check to validate topic threads is not negative, 0 lets ONNX Runtime pick one thread per core
+        if topic_threads < 0:
+            raise ValueError(
+                f"Error: Invalid topicThreads '{topic_threads}'. topicThreads must be greater than or equal to 0."
+            )
+        return topic_threads
+
+    @field_validator("replicas")
+    @classmethod
+    def validate_replicas(cls, replicas: int) -> int:
+        # check to validate at least one classifier replica is configured
+        if replicas < 1:
+            raise ValueError(
+                f"Error: Invalid replicas '{replicas}'. replicas must be greater than or equal to 1."
+            )
+        return replicas
+
+    @field_validator("maxConcurrency")
+    @classmethod
+    def validate_max_concurrency(cls, max_concurrency: int) -> int:
+        # check to validate at least one classification can run at a time
+        if max_concurrency < 1:
+            raise ValueError(
+                f"Error: Invalid maxConcurrency '{max_concurrency}'. maxConcurrency must be greater than or equal to 1."
+            )
+        return max_concurrency
+
+    @field_validator("maxQueueSize")
+    @classmethod
+    def validate_max_queue_size(cls, max_queue_size: int) -> int:
+        # check to validate queue size is not negative
+        if max_queue_size < 0:
+            raise ValueError(
+                f"Error: Invalid maxQueueSize '{max_queue_size}'. maxQueueSize must be greater than or equal to 0."
+            )
+        return max_queue_size
+
+    @field_validator("processes")
+    @classmethod
+    def validate_processes(cls, processes: int) -> int:
+        # check to validate processes is not negative, 0 classifies in the server process
+        if processes < 0:
+            raise ValueError(
+                f"Error: Invalid processes '{processes}'. processes must be greater than or equal to 0."
+            )
+        return processes
+
+    @field_validator("cacheSize")
+    @classmethod
+    def validate_cache_size(cls, cache_size: int) -> int:
+        # check to validate cache size is not negative, 0 disables the classification cache
+        if cache_size < 0:
+            raise ValueError(
+                f"Error: Invalid cacheSize '{cache_size}'. cacheSize must be greater than or equal to 0."
+            )
+        return cache_size
+
+    @field_validator("windowSize")
+    @classmethod
+    def validate_window_size(cls, window_size: int) -> int:
+        # check to validate windows fit in the 1000000 characters spaCy processes at most
+        if window_size < 1 or window_size > 1000000:
+            raise ValueError(
+                f"Error: Invalid windowSize '{window_size}'. windowSize must be between 1 and 1000000."
+            )
+        return window_size
+
+    @field_validator("windowOverlap")
+    @classmethod
+    def validate_window_overlap(cls, window_overlap: int) -> int:
+        # check to validate window overlap is not negative
+        if window_overlap < 0:
+            raise ValueError(
+                f"Error: Invalid windowOverlap '{window_overlap}'. windowOverlap must be greater than or equal to 0."
+            )
+        return window_overlap
+
+    @model_validator(mode="after")
+    def validate_window_overlap_fits_window(self):
+        # check to validate consecutive windows share at most half of a window, the default overlap is
+        # reduced to fit a smaller windowSize
+        max_window_overlap = self.windowSize // 2
+        if "windowOverlap" not in self.model_fields_set:
+            self.windowOverlap = min(self.windowOverlap, max_window_overlap)
+        elif self.windowOverlap > max_window_overlap:
+            raise ValueError(
+                f"Error: Invalid windowOverlap '{self.windowOverlap}'. windowOverlap must be at most half of windowSize, {max_window_overlap}."
+            )
+        return self
+
+    @field_validator("secretPatterns")
+    @classmethod
+    def validate_secret_patterns(cls, secret_patterns: List[dict]) -> List[dict]:
+        # check to validate user-defined secret patterns have a name and a valid regex, score and context
+        for secret_pattern in secret_patterns:
+            name = secret_pattern.get("name")
+            if not name or not isinstance(name, str):
+                raise ValueError(
+                    f"Error: Invalid secretPatterns entry '{secret_pattern}'. Every pattern must have a name."
+                )
+            regex = secret_pattern.get("regex")
+            if not regex or not isinstance(regex, str):
+                raise ValueError(
+                    f"Error: Invalid regex of secret pattern '{name}'. regex must not be empty."
+                )
+            try:
+                re.compile(regex)
+            except re.error as ex:
+                raise ValueError(
+                    f"Error: Invalid regex of secret pattern '{name}'. {ex}."
+                )
+            score = secret_pattern.get("score", 0.8)
+            if not isinstance(score, (int, float)) or not 0 < score <= 1:
+                raise ValueError(
+                    f"Error: Invalid score '{score}' of secret pattern '{name}'. score must be between 0 and 1."
+                )
+            context = secret_pattern.get("context", [])
+            if not isinstance(context, list) or not all(
+                isinstance(word, str) for word in context
+            ):
+                raise ValueError(
+                    f"Error: Invalid context of secret pattern '{name}'. context must be a list of words."
+                )
+        return secret_patterns
+
+    @field_validator("regexTimeout")
+    @classmethod
+    def validate_regex_timeout(cls, regex_timeout: float) -> float:
+        # check to validate the time budget of a regex pattern scan is positive
+        if regex_timeout <= 0:
+            raise ValueError(
+                f"Error: Invalid regexTimeout '{regex_timeout}'. regexTimeout must be greater than 0."
+            )
+        return regex_timeout
+
+    @field_validator("batchSize", "maxTasksPerProcess", "nlpBatchSize", "cacheDiskSize")
+    @classmethod
+    def validate_positive_value(cls, value: int, info) -> int:
+        # check to validate batch and process pool settings are positive
+        if value < 1:
+            raise ValueError(
+                f"Error: Invalid {info.field_name} '{value}'. {info.field_name} must be greater than or equal to 1."
+            )
+        return value
+
     @field_validator("anonymizeSnippets")
     @classmethod
     def validate_anonymize_snippets(cls, anonymize_snippets: bool) -> bool:
@@ -234,3 +447,12 @@ class Config(BaseSettings):
     classifier: ClassifierConfig
     logging: LoggingConfig
     storage: StorageConfig
+
+    @model_validator(mode="after")
+    def validate_workers_and_processes(self):
+        # Forked server workers cannot share a classification process pool, use one way to scale across cores
+        if self.daemon.workers > 1 and self.classifier.processes > 0:
+            raise ValueError(
+                "Error: 'daemon.workers' and 'classifier.processes' can not be used together."
+            )
+        return self
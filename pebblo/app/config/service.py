@@ -1,9 +1,13 @@
 import asyncio
+import gc
 import logging
+import os
+import signal
+import time
 from contextlib import redirect_stderr, redirect_stdout
 from io import StringIO
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict
 
 import uvicorn
 from fastapi import FastAPI, Response
@@ -13,6 +17,7 @@ from fastapi.staticfiles import StaticFiles
 from pebblo.app.exceptions.exception_handler import exception_handlers
 from pebblo.app.routers.local_ui_routers import local_ui_router_instance
 from pebblo.app.routers.redirection_router import redirect_router_instance
+from pebblo.app.utils.utils import get_process_memory_usage
 
 with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
     from pebblo.app.routers.routers import api_v1_router_instance, router_instance
@@ -21,6 +26,16 @@ from pebblo.log import get_logger, get_uvicorn_logconfig
 
 logger = get_logger(__name__)
 
+# Seconds between two memory usage reports of the worker processes
+WORKER_MEMORY_REPORT_INTERVAL = 300
+# A crashed worker is restarted after 1, 2, 4, ... seconds, at most WORKER_RESTART_MAX_DELAY
+WORKER_RESTART_BASE_DELAY = 1
+WORKER_RESTART_MAX_DELAY = 60
+# A worker slot is given up after this many restarts in a row, e.g. when the worker crashes on startup
+WORKER_MAX_RESTARTS = 5
+# Seconds a worker must stay up for its slot's restart count and delay to be reset
+WORKER_STABLE_UPTIME = 300
+
 
 class NoCacheStaticFiles(StaticFiles):
     def __init__(self, *args: Any, **kwargs: Any):
@@ -61,8 +76,15 @@ class Service:
         self.host = self.config_details.get("daemon", {}).get("host", "localhost")
         self.log_level = self.config_details.get("logging", {}).get("level", "INFO")
         self.log_file = self.config_details.get("logging", {}).get("file", "")
+        self.workers = self.config_details.get("daemon", {}).get("workers", 1)
+        self._worker_pids: Dict[int, int] = {}
+        # Per worker slot: start time of its current worker, restarts in a row and pending restart time
+        self._worker_start_times: Dict[int, float] = {}
+        self._worker_restarts: Dict[int, int] = {}
+        self._pending_restarts: Dict[int, float] = {}
+        self._stopping = False
 
-    async def create_main_api_server(self):
+    def _create_server_config(self) -> uvicorn.Config:
         self.app.mount(
             path="/static",
             app=NoCacheStaticFiles(
@@ -78,12 +100,130 @@ class Service:
         config = uvicorn.Config(
             app=self.app, host=self.host, port=self.port, log_config=log_cfg
         )
-        server = uvicorn.Server(config)
         logging.getLogger("uvicorn").propagate = False
         logging.getLogger("uvicorn.error").propagate = False
         logging.getLogger("uvicorn.access").propagate = False
+        return config
+
+    async def create_main_api_server(self):
+        server = uvicorn.Server(self._create_server_config())
         await server.serve()
 
     def start(self):
         logger.info(f"Starting Pebblo Server with config {self.config_details}")
-        asyncio.run(self.create_main_api_server())
+        if self.workers > 1:
+            self.start_workers()
+        else:
+            asyncio.run(self.create_main_api_server())
+
+    def start_workers(self):
+        """
+        Fork worker processes that serve requests on a socket shared with this master process.
+        Classifier models must already be loaded here, the workers share them copy-on-write.
+        """
+        config = self._create_server_config()
+        sock = config.bind_socket()
+        # Move everything loaded so far out of the garbage collector's reach, otherwise
+        # collections in the workers touch the shared objects and un-share their pages.
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop_workers)
+        signal.signal(signal.SIGINT, self._stop_workers)
+        for worker_id in range(1, self.workers + 1):
+            self._spawn_worker(worker_id, config, sock)
+        logger.info(f"Started {self.workers} Pebblo server workers")
+
+        last_report_time = time.monotonic()
+        while self._worker_pids or (self._pending_restarts and not self._stopping):
+            self._restart_due_workers(config, sock)
+            # Without live workers, e.g. while every slot waits for its restart, there is nothing to wait for
+            pid, status = os.waitpid(-1, os.WNOHANG) if self._worker_pids else (0, 0)
+            if pid == 0:
+                time.sleep(1)
+                if time.monotonic() - last_report_time >= WORKER_MEMORY_REPORT_INTERVAL:
+                    self.log_worker_memory_usage()
+                    last_report_time = time.monotonic()
+                continue
+            worker_id = self._worker_pids.pop(pid, None)
+            if worker_id is not None and not self._stopping:
+                self._schedule_restart(worker_id, pid, status)
+        if not self._stopping:
+            logger.error(
+                "Every Pebblo server worker exceeded its restart limit, stopping the server"
+            )
+        sock.close()
+
+    def _schedule_restart(self, worker_id: int, pid: int, status: int):
+        """
+        Schedule the restart of a worker slot whose worker exited, with an exponential backoff.
+        The slot is given up once its workers crashed WORKER_MAX_RESTARTS times in a row.
+        """
+        now = time.monotonic()
+        if now - self._worker_start_times.pop(worker_id, now) >= WORKER_STABLE_UPTIME:
+            self._worker_restarts[worker_id] = 0
+        restarts = self._worker_restarts.get(worker_id, 0)
+        if restarts >= WORKER_MAX_RESTARTS:
+            logger.error(
+                f"Pebblo server worker {worker_id} (pid {pid}) exited with status {status} "
+                f"after {restarts} restarts in a row, not restarting it"
+            )
+            return
+        delay = min(WORKER_RESTART_BASE_DELAY * 2**restarts, WORKER_RESTART_MAX_DELAY)
+        self._worker_restarts[worker_id] = restarts + 1
+        self._pending_restarts[worker_id] = now + delay
+        logger.error(
+            f"Pebblo server worker {worker_id} (pid {pid}) exited with status {status}, "
+            f"restarting it in {delay}s"
+        )
+
+    def _restart_due_workers(self, config: uvicorn.Config, sock):
+        now = time.monotonic()
+        for worker_id, restart_time in list(self._pending_restarts.items()):
+            if restart_time <= now and not self._stopping:
+                del self._pending_restarts[worker_id]
+                self._spawn_worker(worker_id, config, sock)
+
+    def _spawn_worker(self, worker_id: int, config: uvicorn.Config, sock):
+        pid = os.fork()
+        if pid == 0:
+            # Worker process, uvicorn installs its own shutdown signal handlers
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            except Exception as ex:
+                logger.error(f"Pebblo server worker {worker_id} failed. {ex}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._worker_pids[pid] = worker_id
+        self._worker_start_times[worker_id] = time.monotonic()
+        logger.info(f"Started Pebblo server worker {worker_id} with pid {pid}")
+
+    def _stop_workers(self, signum, frame):
+        self._stopping = True
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._worker_pids.pop(pid, None)
+
+    def log_worker_memory_usage(self):
+        """
+        Log memory of the master and every worker. Model weights shared copy-on-write show
+        up in rss of each worker, pss splits them between the processes sharing them.
+        """
+        processes = {"master": os.getpid()}
+        for pid, worker_id in sorted(self._worker_pids.items(), key=lambda x: x[1]):
+            processes[f"worker {worker_id}"] = pid
+        for name, pid in processes.items():
+            memory_usage = get_process_memory_usage(pid)
+            if not memory_usage:
+                continue
+            logger.info(
+                f"Pebblo server {name} (pid {pid}) memory: "
+                f"rss {memory_usage.get('rss', 0):.1f} MB, "
+                f"pss {memory_usage.get('pss', 0):.1f} MB, "
+                f"shared {memory_usage.get('shared', 0):.1f} MB"
+            )
@@ -13,6 +13,9 @@ DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_LOG_FILE_PATH = "/tmp/logs"
 DEFAULT_LOG_FILE = f"{DEFAULT_LOG_FILE_PATH}/{DEFAULT_LOGGER_NAME}.log"
 
+# Offline model bundle Defaults
+DEFAULT_MODEL_BUNDLE_DIR = "~/.pebblo/models"
+
 
 # set shared variable to verify if anonymizeSnippets is either in classifier or reports
 anonymize_snippets_exists = False
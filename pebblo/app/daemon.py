@@ -4,10 +4,11 @@ This is entry point for Pebblo(Pebblo Server and Local UI)
 
 import argparse
 import os
+import signal
+import threading
+import time
 import warnings
-
-import nltk
-from tqdm import tqdm
+from typing import Optional
 
 from pebblo.app.config.config import (
     load_config,
@@ -16,7 +17,6 @@ from pebblo.app.config.config import (
 )
 from pebblo.app.utils.version import get_pebblo_version
 
-nltk.download("punkt_tab")
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -32,6 +32,27 @@ def start():
     parser.add_argument(
         "-v", "--version", action="store_true", help="display the version"
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print a ranked import time and memory report of the server startup and exit",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    models_parser = subparsers.add_parser("models", help="manage the model bundle")
+    models_subparsers = models_parser.add_subparsers(
+        dest="models_command", required=True
+    )
+    prefetch_parser = models_subparsers.add_parser(
+        "prefetch", help="download all models into a local bundle for offline use"
+    )
+    prefetch_parser.add_argument(
+        "--bundle-dir",
+        type=str,
+        help="bundle root directory, defaults to classifier.bundleDir from config",
+    )
+    prefetch_parser.add_argument(
+        "--force", action="store_true", help="rebuild the bundle if it already exists"
+    )
     args = parser.parse_args()
     if args.version:
         print(f"Pebblo Server version: {server_version}")
@@ -45,50 +66,121 @@ def start():
         )
 
     config_details, server_config = load_config(path)
-    p_bar = tqdm(range(10))
     var_server_config_dict.set(config_details)
     var_server_config.set(server_config)
-    server_start(config_details, p_bar)
+    if args.command == "models":
+        models_prefetch(config_details, args.bundle_dir, args.force)
+        exit(0)
+    if args.profile_startup:
+        profile_startup(config_details)
+        exit(0)
+    prepare_models(config_details)
+    server_start(config_details)
 
 
-def classifier_init(p_bar):
-    """Initialize topic and entity classifier."""
-    p_bar.write("Downloading topic, entity classifier models ...")
-    from pebblo.entity_classifier.entity_classifier import EntityClassifier
-    from pebblo.topic_classifier.topic_classifier import TopicClassifier
+def models_prefetch(config: dict, bundle_dir: Optional[str], force: bool):
+    """Download every model asset into the versioned offline bundle."""
+    from pebblo.app.libs.model_bundle import prefetch_models
 
-    p_bar.update(3)
-    p_bar.write("Initializing topic classifier ...")
-    p_bar.update(1)
+    bundle_dir = bundle_dir or config.get("classifier", {}).get("bundleDir")
+    prefetch_models(bundle_dir, force=force)
 
-    # Init TopicClassifier(This step downloads the models and put in cache)
-    _ = TopicClassifier()
-    p_bar.write("Initializing topic classifier ... done")
-    p_bar.update(1)
 
-    p_bar.write("Initializing entity classifier ...")
-    p_bar.update(1)
+def prepare_models(config: dict):
+    """
+    Make model assets available before any model library is imported.
+    In offline mode everything is served from the prefetched bundle and network lookups are disabled.
+    """
+    from pebblo.app.libs.model_bundle import (
+        enable_offline_mode,
+        ensure_nltk_data,
+        load_bundle,
+    )
 
-    # Init EntityClassifier(This step downloads all necessary training models)
-    _ = EntityClassifier()
-    p_bar.write("Initializing entity classifier ... done")
-    p_bar.update(1)
+    classifier_config = config.get("classifier", {})
+    if classifier_config.get("offline", False):
+        bundle = load_bundle(classifier_config.get("bundleDir"))
+        enable_offline_mode(bundle)
+        print(f"Pebblo server running offline with model bundle {bundle.path}")
+    else:
+        ensure_nltk_data()
+
+
+def profile_startup(config: dict):
+    """
+    Import the server the same way `server_start` does and print which modules are expensive to import.
+    """
+    from pebblo.app.libs.import_profiler import ImportProfiler
+
+    with ImportProfiler() as profiler:
+        prepare_models(config)
+        from pebblo.app.config.service import Service  # noqa: F401
+    print(profiler.report())
+
+
+def classifier_init() -> dict:
+    """
+    Load topic and entity classifier models concurrently and run a warm-up inference through each pipeline,
+    in this process or in every classification process. Returns seconds spent per warm-up stage.
+    """
+    from pebblo.app.libs.classification_engine import get_classification_engine
+
+    # This step downloads the models, put them in cache and loads them in memory
+    return get_classification_engine().warm_up()
+
+
+def classifier_warm_up(startup_timings: dict, start_time: float):
+    """
+    Warm up classifiers in the background, the /ready endpoint reports ready once it finishes.
+    """
+    from pebblo.log import get_logger
+
+    logger = get_logger(__name__)
+    logger.info("Initializing topic and entity classifiers ...")
+    try:
+        startup_timings.update(classifier_init())
+    except Exception as ex:
+        logger.error(f"Classifier initialization failed, stopping Pebblo server. {ex}")
+        os.kill(os.getpid(), signal.SIGTERM)
+        return
+
+    startup_timings["total"] = time.perf_counter() - start_time
+    timing_breakdown = ", ".join(
+        f"{stage}: {seconds:.2f}s" for stage, seconds in startup_timings.items()
+    )
+    logger.info(f"Pebblo server is ready. Startup timing breakdown: {timing_breakdown}")
 
 
-def server_start(config: dict, p_bar: tqdm):
+def server_start(config: dict):
     """Start server."""
-    p_bar.write(f"Pebblo server version {server_version} starting ...")
-
-    # Initialize Topic and Entity Classifier
-    classifier_init(p_bar)
+    print(f"Pebblo server version {server_version} starting ...")
+    start_time = time.perf_counter()
+    startup_timings = {}
+    workers = config.get("daemon", {}).get("workers", 1)
+    if workers > 1:
+        # Each worker is meant to use one core, and native thread pools do not survive a fork
+        os.environ.setdefault("OMP_NUM_THREADS", "1")
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
     # Starting Uvicorn Service Using config details
     from pebblo.app.config.service import Service
 
-    p_bar.update(1)
+    startup_timings["server_imports"] = time.perf_counter() - start_time
     svc = Service(config_details=config)
-    p_bar.update(2)
-    p_bar.close()
+
+    if workers > 1:
+        # Load classifiers before forking so that all workers share the model weights copy-on-write
+        classifier_warm_up(startup_timings, start_time)
+    else:
+        # Initialize Topic and Entity Classifier while the server starts accepting connections
+        warm_up_thread = threading.Thread(
+            target=classifier_warm_up,
+            args=(startup_timings, start_time),
+            name="classifier-warm-up",
+            daemon=True,
+        )
+        warm_up_thread.start()
+
     svc.start()
     print("Pebblo server stopped. BYE!")
 
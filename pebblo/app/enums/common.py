@@ -14,6 +14,19 @@ class ClassificationMode(Enum):
     ALL = "all"
     ENTITY = "entity"
     TOPIC = "topic"
+    SECRETS = "secrets"
+
+
+class NlpProfile(Enum):
+    SM = "sm"
+    MD = "md"
+    LG = "lg"
+    TRF = "trf"
+
+
+class TopicBackend(Enum):
+    PYTORCH = "pytorch"
+    ONNX = "onnx"
 
 
 class ReportFormat(Enum):
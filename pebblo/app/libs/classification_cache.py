@@ -0,0 +1,267 @@
+"""
+Cache of entity and topic classification results keyed by content hash.
+
+RAG loaders re-ingest the same chunks on every reindex and prompts repeat the same system and
+context text, so identical texts are classified once. Keys combine the hash of the text, the
+classification options and a fingerprint of the classifier models, recognizers and thresholds,
+so that results computed with another configuration are never returned.
+
+Results are kept in a bounded in-memory LRU and, when `classifier.cachePath` is set, in a
+SQLite database shared by all processes of the server and kept across restarts. Rows written
+with another fingerprint are dropped when a classifier registers its current fingerprint.
+Degraded results, e.g. computed with fallbacks after an LLM call or a regex scan timed out, are
+not cached so that the text is classified again once the dependency recovers.
+
+Texts themselves are never cached, only their hash: entries hold entity and topic counts, their
+locations, types and scores, and the spans to replace when anonymizing, so that classifiers
+rebuild the returned text from their input.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.log import get_logger
+
+logger = get_logger(__name__)
+config_details = var_server_config_dict.get()
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CACHE_DISK_SIZE = 100000
+
+hits_counter = metrics_registry.counter(
+    "pebblo_classification_cache_hits_total",
+    "Classification results served from the cache.",
+)
+misses_counter = metrics_registry.counter(
+    "pebblo_classification_cache_misses_total",
+    "Classification results not found in the cache.",
+)
+evictions_counter = metrics_registry.counter(
+    "pebblo_classification_cache_evictions_total",
+    "Classification results evicted from the in-memory cache.",
+)
+entries_gauge = metrics_registry.gauge(
+    "pebblo_classification_cache_entries",
+    "Classification results held in the in-memory cache.",
+)
+
+
+# Reasons the classification running in the current context is degraded, None when not tracked
+_degradations: ContextVar[Optional[List[str]]] = ContextVar(
+    "degradations", default=None
+)
+
+
+def mark_degraded(reason: str) -> None:
+    """Flag the classification running in the current context as degraded, i.e. not to be cached."""
+    degradations = _degradations.get()
+    if degradations is not None:
+        degradations.append(reason)
+
+
+@contextlib.contextmanager
+def track_degradation() -> Iterator[List[str]]:
+    """
+    Collect the reasons the classification run within the block is degraded, they are also reported to
+    the enclosing block if any.
+    """
+    degradations = []
+    token = _degradations.set(degradations)
+    try:
+        yield degradations
+    finally:
+        _degradations.reset(token)
+        outer_degradations = _degradations.get()
+        if outer_degradations is not None:
+            outer_degradations.extend(degradations)
+
+
+def get_fingerprint(*components: Any) -> str:
+    """Stable short hash of JSON serializable configuration components."""
+    serialized = json.dumps(components, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+def get_cache_key(fingerprint: str, text: str, *options: Any) -> str:
+    """Cache key of a text classified with the given options by a classifier with this fingerprint."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([fingerprint, *options], default=str).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ClassificationCache:
+    """
+    Thread-safe LRU of classification results with an optional SQLite tier.
+
+    Results are stored JSON serialized, every lookup returns a fresh copy that callers may modify.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = DEFAULT_CACHE_DISK_SIZE,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.db_path = os.path.expanduser(db_path) if db_path else None
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._disk_writes = 0
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        # Connections must not be shared with forked server workers, each process opens its own
+        if self._connection is None or self._connection_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS classification_cache ("
+                "key TEXT PRIMARY KEY, classifier TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS classification_cache_accessed "
+                "ON classification_cache (accessed)"
+            )
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _run_db(self, operation, *args):
+        """Run a database operation, the disk tier is best effort and never fails a classification."""
+        try:
+            with self._db_lock:
+                connection = self._get_connection()
+                if connection is None:
+                    return None
+                return operation(connection, *args)
+        except sqlite3.Error as ex:
+            logger.warning(f"Classification cache database error. {ex}")
+            return None
+
+    def register_fingerprint(self, classifier: str, fingerprint: str) -> None:
+        """Drop persisted results of a classifier that were computed with another configuration."""
+
+        def delete_stale(connection, classifier, fingerprint):
+            deleted = connection.execute(
+                "DELETE FROM classification_cache WHERE classifier = ? AND fingerprint != ?",
+                (classifier, fingerprint),
+            ).rowcount
+            connection.commit()
+            if deleted:
+                logger.info(
+                    f"Invalidated {deleted} cached {classifier} classification results"
+                )
+
+        self._run_db(delete_stale, classifier, fingerprint)
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evictions_counter.inc()
+            entries_gauge.set(len(self._entries))
+
+    def get(self, classifier: str, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            hits_counter.inc(classifier=classifier, tier="memory")
+            return json.loads(value)
+
+        def select(connection, key):
+            row = connection.execute(
+                "SELECT value FROM classification_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE classification_cache SET accessed = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                connection.commit()
+            return row[0] if row else None
+
+        value = self._run_db(select, key)
+        if value is not None:
+            hits_counter.inc(classifier=classifier, tier="disk")
+            self._remember(key, value)
+            return json.loads(value)
+        misses_counter.inc(classifier=classifier)
+        return None
+
+    def set(self, classifier: str, fingerprint: str, key: str, result: Any) -> None:
+        value = json.dumps(result)
+        self._remember(key, value)
+
+        def insert(connection, key, value):
+            connection.execute(
+                "INSERT OR REPLACE INTO classification_cache "
+                "(key, classifier, fingerprint, value, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, classifier, fingerprint, value, time.time()),
+            )
+            self._disk_writes += 1
+            # Trim the least recently used rows once in a while rather than on every write
+            if self._disk_writes % 1000 == 0:
+                connection.execute(
+                    "DELETE FROM classification_cache WHERE key IN ("
+                    "SELECT key FROM classification_cache ORDER BY accessed DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+            connection.commit()
+
+        self._run_db(insert, key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            entries_gauge.set(0)
+
+
+_cache: Optional[ClassificationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """
+    Return the process-wide classification cache, or None if `classifier.cacheSize` is 0.
+    """
+    global _cache
+    if _cache is None:
+        classifier_config = config_details.get("classifier", {})
+        cache_size = classifier_config.get("cacheSize", DEFAULT_CACHE_SIZE)
+        if not cache_size:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClassificationCache(
+                    cache_size,
+                    classifier_config.get("cachePath"),
+                    classifier_config.get("cacheDiskSize", DEFAULT_CACHE_DISK_SIZE),
+                )
+    return _cache
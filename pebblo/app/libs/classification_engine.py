@@ -0,0 +1,260 @@
+"""
+Classification engines used by the loader and classify handlers.
+
+The in-process engine classifies documents one by one with the warm classifiers of the
+process-wide registry. The process pool engine fans batches of documents out to worker
+processes that each hold their own warm classifiers, so that CPU bound Presidio, spaCy
+and transformer inference scales across cores instead of being serialized by the GIL.
+"""
+
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pebblo.app.config.config import var_server_config, var_server_config_dict
+from pebblo.app.libs.classification_worker import (
+    ClassificationTask,
+    classify_batch,
+    classify_tasks,
+    empty_result,
+    init_worker,
+    ping,
+)
+from pebblo.log import get_logger
+
+logger = get_logger(__name__)
+config_details = var_server_config_dict.get()
+
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MAX_TASKS_PER_PROCESS = 1000
+
+
+def _get_classifier_registry():
+    # Imported lazily, spawned worker processes import this module and must stay light until configured
+    from pebblo.app.libs.classifier_registry import get_classifier_registry
+
+    return get_classifier_registry()
+
+
+class InProcessClassificationEngine:
+    """
+    Classify documents in the calling thread with the shared classifier registry.
+    """
+
+    def __init__(self, nlp_batch_size: Optional[int] = None):
+        self.nlp_batch_size = nlp_batch_size
+
+    def classify(self, tasks: List[ClassificationTask]) -> List[dict]:
+        return classify_tasks(_get_classifier_registry(), tasks, self.nlp_batch_size)
+
+    def warm_up(self) -> Dict[str, float]:
+        return _get_classifier_registry().warm_up()
+
+    @property
+    def is_ready(self) -> bool:
+        return _get_classifier_registry().is_ready
+
+
+class _WorkerSlot:
+    """
+    One classification process of the pool, with the replacement process warming up to take over from it.
+    """
+
+    def __init__(self):
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks = 0
+        self.in_flight = 0
+        self.replacement: Optional[ProcessPoolExecutor] = None
+        self.replacement_ready: Optional[Future] = None
+
+
+class ProcessPoolClassificationEngine:
+    """
+    Classify documents in a pool of worker processes.
+
+    Documents are sent in batches to the least busy process and results are returned in input order.
+    A process is replaced once it classified about `max_tasks_per_process` documents, to cap memory growth.
+    Its replacement loads its models while the old process keeps classifying, and one process is replaced
+    at a time, so the pool never loses its warm processes. If a worker process dies, it is restarted and the
+    affected documents are retried one by one, so a document that crashes a worker only loses its own result.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_tasks_per_process: int = DEFAULT_MAX_TASKS_PER_PROCESS,
+        initializer: Callable[..., None] = init_worker,
+        batch_classifier: Callable[
+            [List[ClassificationTask]], List[dict]
+        ] = classify_batch,
+    ):
+        self.processes = max(1, int(processes))
+        self.batch_size = max(1, int(batch_size))
+        self.max_tasks_per_process = max(1, int(max_tasks_per_process))
+        self._lock = threading.Lock()
+        # In-flight counts are updated by future callbacks, which may run while _lock is held
+        self._in_flight_lock = threading.Lock()
+        self._slots = [_WorkerSlot() for _ in range(self.processes)]
+        self._initializer = initializer
+        self._batch_classifier = batch_classifier
+        self._ready = threading.Event()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Spawned workers do not inherit the server threads, every worker loads its own models.
+        # A single process per executor lets every process be replaced on its own.
+        kwargs = {
+            "max_workers": 1,
+            "mp_context": multiprocessing.get_context("spawn"),
+            "initializer": self._initializer,
+            "initargs": (var_server_config_dict.get(), var_server_config.get()),
+        }
+        logger.debug("Starting a classification process")
+        return ProcessPoolExecutor(**kwargs)
+
+    def _promote_replacements(self) -> None:
+        for slot in self._slots:
+            if slot.replacement_ready is None or not slot.replacement_ready.done():
+                continue
+            if slot.replacement_ready.exception() is not None:
+                logger.error("A replacement classification process failed to start")
+                slot.replacement.shutdown(wait=False)
+            else:
+                # Work already submitted to the old process still completes
+                if slot.executor is not None:
+                    slot.executor.shutdown(wait=False)
+                slot.executor = slot.replacement
+                slot.tasks = 0
+            slot.replacement = None
+            slot.replacement_ready = None
+
+    def _recycle(self, slot: _WorkerSlot) -> None:
+        if slot.tasks < self.max_tasks_per_process or slot.replacement is not None:
+            return
+        # Replace one process at a time, the other processes stay warm meanwhile
+        if any(other.replacement is not None for other in self._slots):
+            return
+        logger.debug("Recycling a classification process")
+        slot.replacement = self._create_executor()
+        # ProcessPoolExecutor's own max_tasks_per_child needs Python 3.11 and can deadlock there
+        slot.replacement_ready = slot.replacement.submit(ping)
+
+    def _on_done(self, slot: _WorkerSlot, future: Future) -> None:
+        with self._in_flight_lock:
+            slot.in_flight -= 1
+
+    def _submit_to(
+        self, slot: _WorkerSlot, fn, *args
+    ) -> Tuple[ProcessPoolExecutor, Future]:
+        if slot.executor is None:
+            slot.executor = self._create_executor()
+            slot.tasks = 0
+        executor = slot.executor
+        with self._in_flight_lock:
+            slot.in_flight += 1
+        future = executor.submit(fn, *args)
+        future.add_done_callback(functools.partial(self._on_done, slot))
+        slot.tasks += len(args[0]) if args else 0
+        self._recycle(slot)
+        return executor, future
+
+    def _submit(self, fn, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        with self._lock:
+            self._promote_replacements()
+            with self._in_flight_lock:
+                slot = min(self._slots, key=lambda worker_slot: worker_slot.in_flight)
+            return self._submit_to(slot, fn, *args)
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            for slot in self._slots:
+                if slot.executor is executor:
+                    logger.error("A classification process died, restarting it")
+                    executor.shutdown(wait=False)
+                    slot.executor = None
+
+    def _classify_isolated(self, batch: List[ClassificationTask]) -> List[dict]:
+        results = []
+        for task in batch:
+            executor, future = self._submit(self._batch_classifier, [task])
+            try:
+                results.extend(future.result())
+            except BrokenProcessPool:
+                self._discard(executor)
+                logger.error(
+                    "Skipping classification of a document that crashed its process"
+                )
+                results.append(empty_result(task))
+        return results
+
+    def classify(self, tasks: List[ClassificationTask]) -> List[dict]:
+        batches = [
+            tasks[index : index + self.batch_size]
+            for index in range(0, len(tasks), self.batch_size)
+        ]
+        submitted = [self._submit(self._batch_classifier, batch) for batch in batches]
+        results = []
+        for batch, (executor, future) in zip(batches, submitted):
+            try:
+                results.extend(future.result())
+            except BrokenProcessPool:
+                self._discard(executor)
+                results.extend(self._classify_isolated(batch))
+        return results
+
+    def warm_up(self) -> Dict[str, float]:
+        """Start every worker process and wait until their classifiers are loaded."""
+        start_time = time.perf_counter()
+        with self._lock:
+            futures = [self._submit_to(slot, ping)[1] for slot in self._slots]
+        for future in futures:
+            future.result()
+        self._ready.set()
+        return {"classification_processes.load": time.perf_counter() - start_time}
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for slot in self._slots:
+                for executor in [slot.replacement, slot.executor]:
+                    if executor is not None:
+                        executor.shutdown(wait=True)
+                slot.executor = None
+                slot.replacement = None
+                slot.replacement_ready = None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_classification_engine():
+    """
+    Return the process-wide classification engine configured by `classifier.processes`.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                classifier_config = config_details.get("classifier", {})
+                processes = classifier_config.get("processes", 0)
+                if processes > 0:
+                    _engine = ProcessPoolClassificationEngine(
+                        processes,
+                        classifier_config.get("batchSize", DEFAULT_BATCH_SIZE),
+                        classifier_config.get(
+                            "maxTasksPerProcess", DEFAULT_MAX_TASKS_PER_PROCESS
+                        ),
+                    )
+                else:
+                    _engine = InProcessClassificationEngine(
+                        classifier_config.get("nlpBatchSize")
+                    )
+    return _engine
@@ -0,0 +1,198 @@
+"""
+Bounded executor for CPU heavy classification work of the API handlers.
+
+Classification requests run on a dedicated thread pool with a fixed concurrency
+limit instead of Starlette's unbounded default threadpool. Requests beyond the
+concurrency limit wait in a bounded queue, once the queue is full new requests are
+rejected right away with 503 and a Retry-After hint instead of piling up.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+
+from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs import recognizer_timings
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.log import get_logger
+
+logger = get_logger(__name__)
+config_details = var_server_config_dict.get()
+
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_MAX_QUEUE_SIZE = 32
+
+queue_depth_gauge = metrics_registry.gauge(
+    "pebblo_classification_queue_depth",
+    "Classification requests waiting for a free executor slot.",
+)
+in_flight_gauge = metrics_registry.gauge(
+    "pebblo_classification_in_flight",
+    "Classification requests currently running.",
+)
+queue_wait_histogram = metrics_registry.histogram(
+    "pebblo_classification_queue_wait_seconds",
+    "Time classification requests spent waiting in the queue.",
+)
+duration_histogram = metrics_registry.histogram(
+    "pebblo_classification_duration_seconds",
+    "Time spent running classification requests.",
+)
+rejected_counter = metrics_registry.counter(
+    "pebblo_classification_rejected_total",
+    "Classification requests rejected because the queue was full.",
+)
+
+
+class ClassificationQueueFull(Exception):
+    """Raised when the classification queue cannot accept another request."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Classification queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ClassificationExecutor:
+    """
+    Thread pool with a concurrency limit and a bounded wait queue.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue_size: int):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue_size = max(0, int(max_queue_size))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="classification"
+        )
+        # Admission slots cover running plus queued requests
+        self._slots = threading.BoundedSemaphore(
+            self.max_concurrency + self.max_queue_size
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._avg_duration: Optional[float] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queue slot frees up, at least one second."""
+        avg_duration = self._avg_duration or 1.0
+        estimate = avg_duration * (self._queued + 1) / self.max_concurrency
+        return max(1, math.ceil(estimate))
+
+    def _record_duration(self, duration: float) -> None:
+        # Exponential moving average of the task duration, used for Retry-After estimates
+        with self._lock:
+            if self._avg_duration is None:
+                self._avg_duration = duration
+            else:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+    def _set_queued(self, delta: int) -> None:
+        with self._lock:
+            self._queued += delta
+            queue_depth_gauge.set(self._queued)
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any):
+        """
+        Schedule func on the executor, raise ClassificationQueueFull if there is no slot left.
+        """
+        if not self._slots.acquire(blocking=False):
+            rejected_counter.inc()
+            raise ClassificationQueueFull(self.retry_after())
+
+        enqueued_time = time.perf_counter()
+        self._set_queued(1)
+
+        def task():
+            start_time = time.perf_counter()
+            self._set_queued(-1)
+            queue_wait_histogram.observe(start_time - enqueued_time)
+            in_flight_gauge.inc()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start_time
+                in_flight_gauge.dec()
+                duration_histogram.observe(duration)
+                self._record_duration(duration)
+
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._set_queued(-1)
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future) -> None:
+        # A queued task cancelled after its client went away never runs, it leaves the queue here
+        if future.cancelled():
+            self._set_queued(-1)
+        # The slot is released when the work is done, even if the client went away meanwhile
+        self._slots.release()
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run func on the executor and await its result."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+
+_executor: Optional[ClassificationExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_classification_executor() -> ClassificationExecutor:
+    """
+    Return the process-wide classification executor, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                classifier_config = config_details.get("classifier", {})
+                _executor = ClassificationExecutor(
+                    classifier_config.get("maxConcurrency", DEFAULT_MAX_CONCURRENCY),
+                    classifier_config.get("maxQueueSize", DEFAULT_MAX_QUEUE_SIZE),
+                )
+    return _executor
+
+
+async def run_classification(func: Callable[..., Any], *args: Any, **kwargs: Any):
+    """
+    Run a classification handler on the bounded executor from an async route.
+    Responds with 503 and a Retry-After header when the server is saturated.
+    With `classifier.recognizerTimings`, the time spent in the entity classifier components is
+    returned in a Server-Timing header.
+    """
+    try:
+        if not recognizer_timings.is_enabled():
+            return await get_classification_executor().run(func, *args, **kwargs)
+        response, timings = await get_classification_executor().run(
+            _run_with_timings, func, *args, **kwargs
+        )
+    except ClassificationQueueFull as ex:
+        logger.warning(f"Rejecting classification request. {ex}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Pebblo server is busy classifying other requests, retry later.",
+            headers={"Retry-After": str(ex.retry_after)},
+        )
+    # Debug header with the time spent in the entity classifier components by this request
+    if timings and isinstance(response, Response):
+        response.headers[recognizer_timings.SERVER_TIMING_HEADER] = (
+            recognizer_timings.format_server_timing(timings)
+        )
+    return response
+
+
+def _run_with_timings(func: Callable[..., Any], *args: Any, **kwargs: Any) -> tuple:
+    with recognizer_timings.collect_timings() as timings:
+        response = func(*args, **kwargs)
+    return response, timings
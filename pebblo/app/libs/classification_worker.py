@@ -0,0 +1,174 @@
+"""
+Classification of a single document, shared by the in-process engine and the worker
+processes of the process pool engine.
+
+This module is imported by freshly spawned worker processes before the server config
+is known, so it must not import anything that reads the config at import time.
+"""
+
+import os
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from pebblo.app.config.config import var_server_config, var_server_config_dict
+
+
+class ClassificationTask(NamedTuple):
+    data: Optional[str]
+    topics: bool = True
+    entities: bool = True
+    anonymize_snippets: bool = False
+    secrets_only: bool = False
+    # Entity types to classify, all entities if None
+    entity_types: Optional[Tuple[str, ...]] = None
+
+
+def empty_result(task: ClassificationTask) -> dict:
+    return {
+        "data": task.data,
+        "entities": {},
+        "entityCount": 0,
+        "entityDetails": {},
+        "topics": {},
+        "topicCount": 0,
+        "topicDetails": {},
+    }
+
+
+def classify_task(classifier_registry, task: ClassificationTask) -> dict:
+    """
+    Run topic and entity classification of one document with classifiers borrowed from the registry.
+    On failure the result holds whatever was classified before the error.
+    """
+    from pebblo.log import get_logger
+
+    result = empty_result(task)
+    if not task.data:
+        return result
+    try:
+        if task.topics:
+            with classifier_registry.topic_classifier() as topic_classifier_obj:
+                topics, topic_count, topic_details = topic_classifier_obj.predict(
+                    task.data
+                )
+            result["topics"] = topics
+            result["topicCount"] = topic_count
+            result["topicDetails"] = topic_details
+        if task.entities:
+            with classifier_registry.entity_classifier() as entity_classifier_obj:
+                (
+                    entities,
+                    entity_count,
+                    anonymized_doc,
+                    entity_details,
+                ) = entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
+                    task.data,
+                    anonymize_snippets=task.anonymize_snippets,
+                    secrets_only=task.secrets_only,
+                    entity_types=task.entity_types,
+                )
+            result["entities"] = entities
+            result["entityCount"] = entity_count
+            result["entityDetails"] = entity_details
+            result["data"] = anonymized_doc
+    except Exception as ex:
+        get_logger(__name__).error(f"Get Classifier Response Failed, Exception: {ex}")
+    return result
+
+
+def classify_tasks(
+    classifier_registry, tasks: List[ClassificationTask], nlp_batch_size: int = None
+) -> List[dict]:
+    """
+    Classify many documents in input order. Entities are classified with one EntityClassifier.classify_batch
+    call per anonymization, secrets mode and entity allow-list setting, so that the spaCy pipeline processes
+    the documents in batches.
+    """
+    from pebblo.log import get_logger
+
+    if len(tasks) < 2:
+        return [classify_task(classifier_registry, task) for task in tasks]
+
+    results = [
+        classify_task(classifier_registry, task._replace(entities=False))
+        for task in tasks
+    ]
+    entity_options = {
+        (task.anonymize_snippets, task.secrets_only, task.entity_types)
+        for task in tasks
+        if task.entities and task.data
+    }
+    for anonymize_snippets, secrets_only, entity_types in sorted(
+        entity_options, key=lambda options: (options[0], options[1], options[2] or ())
+    ):
+        indexes = [
+            index
+            for index, task in enumerate(tasks)
+            if task.entities
+            and task.data
+            and task.anonymize_snippets == anonymize_snippets
+            and task.secrets_only == secrets_only
+            and task.entity_types == entity_types
+        ]
+        if not indexes:
+            continue
+        try:
+            with classifier_registry.entity_classifier() as entity_classifier_obj:
+                entity_results = entity_classifier_obj.classify_batch(
+                    [tasks[index].data for index in indexes],
+                    anonymize_snippets=anonymize_snippets,
+                    batch_size=nlp_batch_size,
+                    secrets_only=secrets_only,
+                    entity_types=entity_types,
+                )
+        except Exception as ex:
+            get_logger(__name__).error(
+                f"Get Classifier Response Failed, Exception: {ex}"
+            )
+            continue
+        for index, entity_result in zip(indexes, entity_results):
+            try:
+                entities, entity_count, anonymized_doc, entity_details = entity_result
+            except ValueError:
+                # Classification of this document failed, it keeps its topics only
+                continue
+            results[index]["entities"] = entities
+            results[index]["entityCount"] = entity_count
+            results[index]["entityDetails"] = entity_details
+            results[index]["data"] = anonymized_doc
+    return results
+
+
+_worker_registry = None
+_worker_nlp_batch_size = None
+
+
+def init_worker(config_details: dict, server_config) -> None:
+    """
+    Initializer of a worker process: apply the server config and load warm classifiers.
+    """
+    global _worker_registry, _worker_nlp_batch_size
+    var_server_config_dict.set(config_details)
+    _worker_nlp_batch_size = config_details.get("classifier", {}).get("nlpBatchSize")
+    var_server_config.set(server_config)
+
+    from pebblo.app.libs.classifier_registry import ClassifierRegistry
+    from pebblo.log import get_logger
+
+    start_time = time.perf_counter()
+    # A worker process classifies one batch at a time, a single replica is enough
+    _worker_registry = ClassifierRegistry(replicas=1)
+    _worker_registry.warm_up()
+    get_logger(__name__).info(
+        f"Classification process {os.getpid()} ready in {time.perf_counter() - start_time:.2f}s"
+    )
+
+
+def classify_batch(tasks: List[ClassificationTask]) -> List[dict]:
+    """Worker process entry point, classify a batch of documents in order."""
+    return classify_tasks(_worker_registry, tasks, _worker_nlp_batch_size)
+
+
+def ping() -> int:
+    """No-op task used to start worker processes ahead of the first request."""
+    return os.getpid()
@@ -0,0 +1,180 @@
+"""
+Import time and memory profiler for the server startup, used by `pebblo --profile-startup`.
+
+The profiler hooks into the import system and records, for every module executed while it
+is active, the wall time and resident memory growth of its import. Cumulative figures include
+the modules imported as a side effect, self figures exclude them.
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+DEFAULT_REPORT_LIMIT = 30
+
+
+def get_rss_bytes() -> int:
+    """Current resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs (e.g. macOS), fall back to the peak RSS which only ever grows
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    cumulative_time: float = 0.0
+    self_time: float = 0.0
+    cumulative_rss: int = 0
+    self_rss: int = 0
+    modules: int = 1
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+class _Frame:
+    __slots__ = ("start_time", "start_rss", "child_time", "child_rss")
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.start_rss = get_rss_bytes()
+        self.child_time = 0.0
+        self.child_rss = 0
+
+
+class ImportProfiler:
+    """
+    Meta path finder that times the execution of every module imported inside its `with` block.
+    """
+
+    def __init__(self):
+        self.records: Dict[str, ImportRecord] = {}
+        self._stack: List[_Frame] = []
+        self._start_time = 0.0
+        self._start_rss = 0
+        self.total_time = 0.0
+        self.total_rss = 0
+
+    def __enter__(self) -> "ImportProfiler":
+        self._start_time = time.perf_counter()
+        self._start_rss = get_rss_bytes()
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self.total_time = time.perf_counter() - self._start_time
+        self.total_rss = get_rss_bytes() - self._start_rss
+
+    def find_spec(self, fullname, path, target=None):
+        # Let the regular finders locate the module, only its loader is instrumented
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                self._instrument(spec)
+                return spec
+        return None
+
+    def _instrument(self, spec) -> None:
+        loader = spec.loader
+        # Built-in and frozen modules are loaded by classes shared by all modules, they are cheap anyway
+        if loader is None or isinstance(loader, type):
+            return
+        exec_module = getattr(loader, "exec_module", None)
+        if exec_module is None:
+            return
+        profiler = self
+
+        def timed_exec_module(module):
+            profiler._stack.append(_Frame())
+            try:
+                exec_module(module)
+            finally:
+                profiler._record(spec.name, profiler._stack.pop())
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            # Loaders with __slots__ can not be instrumented
+            pass
+
+    def _record(self, name: str, frame: _Frame) -> None:
+        cumulative_time = time.perf_counter() - frame.start_time
+        cumulative_rss = get_rss_bytes() - frame.start_rss
+        self.records[name] = ImportRecord(
+            name=name,
+            cumulative_time=cumulative_time,
+            self_time=cumulative_time - frame.child_time,
+            cumulative_rss=cumulative_rss,
+            self_rss=cumulative_rss - frame.child_rss,
+        )
+        if self._stack:
+            self._stack[-1].child_time += cumulative_time
+            self._stack[-1].child_rss += cumulative_rss
+
+    def top_modules(self, limit: int = DEFAULT_REPORT_LIMIT) -> List[ImportRecord]:
+        """Modules ranked by cumulative import time."""
+        return sorted(
+            self.records.values(), key=lambda r: r.cumulative_time, reverse=True
+        )[:limit]
+
+    def top_packages(self, limit: int = DEFAULT_REPORT_LIMIT) -> List[ImportRecord]:
+        """Top level packages ranked by the summed self time of their modules."""
+        packages: Dict[str, ImportRecord] = {}
+        for record in self.records.values():
+            package = packages.setdefault(
+                record.package, ImportRecord(name=record.package, modules=0)
+            )
+            package.self_time += record.self_time
+            package.self_rss += record.self_rss
+            package.modules += 1
+        return sorted(packages.values(), key=lambda r: r.self_time, reverse=True)[
+            :limit
+        ]
+
+    def report(self, limit: Optional[int] = DEFAULT_REPORT_LIMIT) -> str:
+        """Human readable, ranked import time and memory report."""
+        limit = limit or len(self.records)
+        lines = [
+            f"Imported {len(self.records)} modules in {self.total_time:.3f}s, "
+            f"RSS grew by {_format_mb(self.total_rss)}",
+            "",
+            f"Top {limit} modules by cumulative import time:",
+            f"{'cumulative':>11} {'self':>9} {'cum. RSS':>10} {'self RSS':>10}  module",
+        ]
+        for record in self.top_modules(limit):
+            lines.append(
+                f"{record.cumulative_time:>10.3f}s {record.self_time:>8.3f}s "
+                f"{_format_mb(record.cumulative_rss):>10} {_format_mb(record.self_rss):>10}  "
+                f"{record.name}"
+            )
+        lines.extend(
+            [
+                "",
+                f"Top {limit} packages by self import time:",
+                f"{'self':>11} {'self RSS':>10} {'modules':>8}  package",
+            ]
+        )
+        for package in self.top_packages(limit):
+            lines.append(
+                f"{package.self_time:>10.3f}s {_format_mb(package.self_rss):>10} "
+                f"{package.modules:>8}  {package.name}"
+            )
+        return "\n".join(lines)
+
+
+def _format_mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}MB"
@@ -0,0 +1,327 @@
+"""
+Versioned local bundle of every model asset Pebblo server needs at runtime.
+
+`pebblo models prefetch` downloads the spaCy pipeline used by Presidio, the NLTK
+tokenizer data and the Hugging Face topic classifier snapshot, exported to ONNX with
+`classifier.topicBackend: onnx`, into `<bundleDir>/<pebblo version>/` and records them in a manifest. With
+`classifier.offline` enabled the server loads everything from that bundle and never
+reaches out to the network, which makes startup deterministic in air-gapped
+deployments.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.config.utils import DEFAULT_MODEL_BUNDLE_DIR, expand_path
+from pebblo.app.enums.common import NlpProfile, TopicBackend
+from pebblo.app.utils.version import get_pebblo_version
+from pebblo.topic_classifier.config import (
+    CLASSIFIER_PATH,
+    MODEL_REVISION,
+    TOKENIZER_PATH,
+)
+
+config_details = var_server_config_dict.get()
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+
+# spaCy pipeline loaded by the Presidio analyzer engine, by `classifier.nlpProfile`
+SPACY_MODEL_NAMES = {
+    NlpProfile.SM.value: "en_core_web_sm",
+    NlpProfile.MD.value: "en_core_web_md",
+    NlpProfile.LG.value: "en_core_web_lg",
+    NlpProfile.TRF.value: "en_core_web_trf",
+}
+DEFAULT_NLP_PROFILE = NlpProfile.LG.value
+SPACY_LANG_CODE = "en"
+# Presidio only reads tokens, lemmas and named entities, the dependency parse is never used
+SPACY_EXCLUDED_COMPONENTS = ["parser", "senter"]
+NLTK_PACKAGES = ["punkt_tab"]
+
+SPACY_DIR = "spacy"
+NLTK_DIR = "nltk_data"
+HUGGINGFACE_DIR = "huggingface"
+
+# Environment variables that keep Hugging Face and litellm from calling out at import or load time
+OFFLINE_ENV_VARS = {
+    "HF_HUB_OFFLINE": "1",
+    "TRANSFORMERS_OFFLINE": "1",
+    "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+}
+
+
+class ModelBundle:
+    """
+    Resolved, validated view of a prefetched model bundle on disk.
+    """
+
+    def __init__(self, path: str, manifest: dict):
+        self.path = path
+        self.manifest = manifest
+
+    def _asset_path(self, relative_path: str) -> str:
+        return os.path.join(self.path, relative_path)
+
+    @property
+    def spacy_model_path(self) -> str:
+        return self._asset_path(self.manifest["assets"]["spacy"]["path"])
+
+    @property
+    def nltk_data_path(self) -> str:
+        return self._asset_path(self.manifest["assets"]["nltk"]["path"])
+
+    def huggingface_path(self, repo_id: str) -> str:
+        """Local snapshot directory of the given Hugging Face repository."""
+        return self._asset_path(self.manifest["assets"]["huggingface"][repo_id]["path"])
+
+    @property
+    def topic_tokenizer_path(self) -> str:
+        return self.huggingface_path(TOKENIZER_PATH)
+
+    @property
+    def topic_classifier_path(self) -> str:
+        return self.huggingface_path(CLASSIFIER_PATH)
+
+
+def get_bundle_path(bundle_dir: Optional[str] = None) -> str:
+    """
+    Return the versioned bundle directory for this Pebblo release.
+    """
+    bundle_dir = expand_path(bundle_dir or DEFAULT_MODEL_BUNDLE_DIR)
+    return os.path.join(bundle_dir, get_pebblo_version())
+
+
+def get_nlp_profile() -> str:
+    return config_details.get("classifier", {}).get("nlpProfile", DEFAULT_NLP_PROFILE)
+
+
+def get_spacy_model_name() -> str:
+    """Name of the spaCy pipeline of the configured NLP profile."""
+    return SPACY_MODEL_NAMES[get_nlp_profile()]
+
+
+def _huggingface_repos() -> List[str]:
+    return list(dict.fromkeys([TOKENIZER_PATH, CLASSIFIER_PATH]))
+
+
+def _prefetch_spacy(model_name: str, target_dir: str) -> dict:
+    import spacy
+    from spacy.cli import download
+
+    if not spacy.util.is_package(model_name):
+        download(model_name)
+    nlp = spacy.load(model_name)
+    nlp.to_disk(target_dir)
+    return {"name": model_name, "version": nlp.meta.get("version")}
+
+
+def _prefetch_nltk(target_dir: str) -> dict:
+    import nltk
+
+    for package in NLTK_PACKAGES:
+        nltk.download(package, download_dir=target_dir, quiet=True, raise_on_error=True)
+    return {"packages": NLTK_PACKAGES}
+
+
+def _prefetch_huggingface(repo_id: str, target_dir: str) -> dict:
+    from huggingface_hub import snapshot_download
+
+    # HF_TOKEN from the environment is picked up by huggingface_hub if set
+    snapshot_download(repo_id=repo_id, revision=MODEL_REVISION, local_dir=target_dir)
+    return {"revision": MODEL_REVISION}
+
+
+def _prefetch_onnx(model_path: str, bundle_path: str) -> None:
+    classifier_config = config_details.get("classifier", {})
+    if classifier_config.get("topicBackend") != TopicBackend.ONNX.value:
+        return
+    from pebblo.topic_classifier.onnx_backend import export_onnx_model, get_export_path
+
+    quantize = classifier_config.get("topicQuantize", False)
+    print(f"Exporting topic classifier {CLASSIFIER_PATH}@{MODEL_REVISION} to ONNX ...")
+    export_onnx_model(
+        model_path,
+        get_export_path(bundle_path, MODEL_REVISION, quantize),
+        quantize=quantize,
+    )
+
+
+def prefetch_models(bundle_dir: Optional[str] = None, force: bool = False) -> str:
+    """
+    Download every model asset into a versioned bundle and write its manifest.
+
+    :param bundle_dir: Root directory of the bundles, defaults to ~/.pebblo/models
+    :param force: Rebuild the bundle even if a complete one already exists
+    :return: Path of the bundle directory
+    """
+    bundle_path = get_bundle_path(bundle_dir)
+    manifest_path = os.path.join(bundle_path, MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_path) and not force:
+        bundle = load_bundle(bundle_path)
+        _prefetch_onnx(bundle.topic_classifier_path, bundle_path)
+        print(f"Model bundle already present at {bundle_path}")
+        return bundle_path
+
+    # Build into a staging directory so an interrupted prefetch never leaves a half-written bundle behind
+    staging_path = f"{bundle_path}.partial"
+    shutil.rmtree(staging_path, ignore_errors=True)
+    os.makedirs(staging_path)
+
+    spacy_model_name = get_spacy_model_name()
+    spacy_path = os.path.join(SPACY_DIR, spacy_model_name)
+    print(f"Fetching spaCy model {spacy_model_name} ...")
+    spacy_asset = _prefetch_spacy(
+        spacy_model_name, os.path.join(staging_path, spacy_path)
+    )
+    spacy_asset["path"] = spacy_path
+
+    print(f"Fetching NLTK data {', '.join(NLTK_PACKAGES)} ...")
+    nltk_asset = _prefetch_nltk(os.path.join(staging_path, NLTK_DIR))
+    nltk_asset["path"] = NLTK_DIR
+
+    huggingface_assets: Dict[str, dict] = {}
+    for repo_id in _huggingface_repos():
+        repo_path = os.path.join(HUGGINGFACE_DIR, repo_id.replace("/", "--"))
+        print(f"Fetching Hugging Face model {repo_id}@{MODEL_REVISION} ...")
+        huggingface_assets[repo_id] = _prefetch_huggingface(
+            repo_id, os.path.join(staging_path, repo_path)
+        )
+        huggingface_assets[repo_id]["path"] = repo_path
+    _prefetch_onnx(
+        os.path.join(staging_path, huggingface_assets[CLASSIFIER_PATH]["path"]),
+        staging_path,
+    )
+
+    manifest = {
+        "bundle_format_version": BUNDLE_FORMAT_VERSION,
+        "pebblo_version": get_pebblo_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "assets": {
+            "spacy": spacy_asset,
+            "nltk": nltk_asset,
+            "huggingface": huggingface_assets,
+        },
+    }
+    with open(os.path.join(staging_path, MANIFEST_FILE_NAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+
+    shutil.rmtree(bundle_path, ignore_errors=True)
+    os.replace(staging_path, bundle_path)
+    print(f"Model bundle written to {bundle_path}")
+    return bundle_path
+
+
+def load_bundle(bundle_path: str) -> ModelBundle:
+    """
+    Read and validate the manifest of a prefetched bundle.
+
+    `bundle_path` is either the versioned bundle directory itself or the bundle root
+    containing one directory per Pebblo version.
+    """
+    bundle_path = expand_path(bundle_path)
+    if not os.path.exists(os.path.join(bundle_path, MANIFEST_FILE_NAME)):
+        bundle_path = get_bundle_path(bundle_path)
+    manifest_path = os.path.join(bundle_path, MANIFEST_FILE_NAME)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(
+            f"Model bundle manifest '{manifest_path}' does not exist. Run 'pebblo models prefetch' first."
+        )
+
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest.get("bundle_format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Model bundle '{bundle_path}' has unsupported format version "
+            f"'{manifest.get('bundle_format_version')}', re-run 'pebblo models prefetch --force'."
+        )
+    bundle = ModelBundle(bundle_path, manifest)
+    spacy_model_name = get_spacy_model_name()
+    if manifest["assets"].get("spacy", {}).get("name") != spacy_model_name:
+        raise ValueError(
+            f"Model bundle '{bundle_path}' does not contain spaCy model {spacy_model_name} of "
+            f"nlpProfile '{get_nlp_profile()}', re-run 'pebblo models prefetch --force'."
+        )
+    for repo_id in _huggingface_repos():
+        repo_asset = manifest["assets"].get("huggingface", {}).get(repo_id)
+        if repo_asset is None or repo_asset.get("revision") != MODEL_REVISION:
+            raise ValueError(
+                f"Model bundle '{bundle_path}' does not contain {repo_id}@{MODEL_REVISION}, "
+                f"re-run 'pebblo models prefetch --force'."
+            )
+
+    for asset_path in [
+        bundle.spacy_model_path,
+        bundle.nltk_data_path,
+        bundle.topic_tokenizer_path,
+        bundle.topic_classifier_path,
+    ]:
+        if not os.path.isdir(asset_path):
+            raise FileNotFoundError(
+                f"Model bundle asset '{asset_path}' is missing, re-run 'pebblo models prefetch --force'."
+            )
+    return bundle
+
+
+def get_offline_bundle() -> Optional[ModelBundle]:
+    """
+    Return the configured model bundle when the server runs in offline mode, else None.
+    """
+    classifier_config = config_details.get("classifier", {})
+    if not classifier_config.get("offline", False):
+        return None
+    return load_bundle(classifier_config.get("bundleDir") or DEFAULT_MODEL_BUNDLE_DIR)
+
+
+def enable_offline_mode(bundle: ModelBundle) -> None:
+    """
+    Point every model loader at the bundle and disable their network lookups.
+    Must run before transformers, huggingface_hub or litellm are imported.
+    """
+    import nltk
+
+    os.environ.update(OFFLINE_ENV_VARS)
+    if bundle.nltk_data_path not in nltk.data.path:
+        nltk.data.path.insert(0, bundle.nltk_data_path)
+
+
+def ensure_nltk_data() -> None:
+    """
+    Download the NLTK data used by Pebblo, only if it is not available locally yet.
+    """
+    import nltk
+
+    for package in NLTK_PACKAGES:
+        try:
+            nltk.data.find(f"tokenizers/{package}")
+        except LookupError:
+            nltk.download(package, quiet=True)
+
+
+def load_spacy_nlp_engine(bundle: Optional[ModelBundle] = None):
+    """
+    Build the Presidio NLP engine from the spaCy pipeline of the configured NLP profile, without the
+    components Presidio does not use. In offline mode the pipeline is loaded from the bundle, otherwise
+    the model is downloaded first if it is not an installed package.
+    """
+    import spacy
+    from presidio_analyzer.nlp_engine import SpacyNlpEngine
+
+    model_name = get_spacy_model_name()
+    nlp_engine = SpacyNlpEngine(
+        models=[{"lang_code": SPACY_LANG_CODE, "model_name": model_name}]
+    )
+    if bundle is not None:
+        model_path = bundle.spacy_model_path
+    else:
+        SpacyNlpEngine._download_spacy_model_if_needed(model_name)
+        model_path = model_name
+    nlp_engine.nlp = {
+        SPACY_LANG_CODE: spacy.load(model_path, exclude=SPACY_EXCLUDED_COMPONENTS)
+    }
+    return nlp_engine
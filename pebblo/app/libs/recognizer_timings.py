@@ -0,0 +1,119 @@
+"""
+Opt-in timing of the entity classifier components, enabled by `classifier.recognizerTimings`.
+
+The NLP engine, every recognizer and the context enhancers of an analyzer engine are wrapped so that
+each call is observed in the pebblo_entity_recognizer_duration_seconds histogram. Timings of a
+classification request are also summed per component and returned in its Server-Timing response header.
+"""
+
+import contextlib
+import functools
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.metrics import metrics_registry
+
+SERVER_TIMING_HEADER = "Server-Timing"
+# Recognizers run from well under a millisecond for a regex to seconds for the NLP pipeline
+RECOGNIZER_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+recognizer_duration_histogram = metrics_registry.histogram(
+    "pebblo_entity_recognizer_duration_seconds",
+    "Time spent in the NLP engine, recognizers and context enhancers of the entity classifier, by component and stage.",
+    buckets=RECOGNIZER_BUCKETS,
+)
+
+# Seconds spent by (component, stage) during the current classification request
+_request_timings: ContextVar[Optional[Dict[Tuple[str, str], float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def is_enabled() -> bool:
+    config_details = var_server_config_dict.get() or {}
+    return bool(config_details.get("classifier", {}).get("recognizerTimings", False))
+
+
+def record(component: str, stage: str, duration: float) -> None:
+    recognizer_duration_histogram.observe(duration, component=component, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        key = (component, stage)
+        timings[key] = timings.get(key, 0) + duration
+
+
+def _timed(func, component: str, stage: str):
+    if getattr(func, "recognizer_timed", False):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(component, stage, time.perf_counter() - start_time)
+
+    wrapper.recognizer_timed = True
+    return wrapper
+
+
+def instrument_analyzer(analyzer) -> None:
+    """
+    Time the NLP engine, recognizers and context enhancers of a Presidio analyzer engine.
+
+    Components shared by several analyzer engines are wrapped once.
+    """
+    nlp_engine = analyzer.nlp_engine
+    nlp_engine_name = type(nlp_engine).__name__
+    nlp_engine.process_text = _timed(nlp_engine.process_text, nlp_engine_name, "nlp")
+    nlp_engine.process_batch = _timed(nlp_engine.process_batch, nlp_engine_name, "nlp")
+    for recognizer in analyzer.registry.recognizers:
+        recognizer.analyze = _timed(recognizer.analyze, recognizer.name, "analyze")
+        recognizer.enhance_using_context = _timed(
+            recognizer.enhance_using_context, recognizer.name, "context"
+        )
+    enhancer = analyzer.context_aware_enhancer
+    enhancer.enhance_using_context = _timed(
+        enhancer.enhance_using_context, type(enhancer).__name__, "context"
+    )
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[Dict[Tuple[str, str], float]]:
+    """Sum the timings recorded in this context, by (component, stage)."""
+    token = _request_timings.set({})
+    try:
+        yield _request_timings.get()
+    finally:
+        _request_timings.reset(token)
+
+
+def format_server_timing(timings: Dict[Tuple[str, str], float]) -> str:
+    """
+    Format timings as a Server-Timing header value in milliseconds, slowest first,
+    e.g. `SpacyNlpEngine.nlp;dur=35.2, EmailRecognizer.analyze;dur=0.4`.
+    """
+    return ", ".join(
+        f"{component}.{stage};dur={duration * 1000:.1f}"
+        for (component, stage), duration in sorted(
+            timings.items(), key=lambda item: item[1], reverse=True
+        )
+    )
@@ -0,0 +1,71 @@
+"""
+Splitting of very large texts into overlapping windows analyzed one after the other.
+
+Classifying a whole document at once makes the memory of the spaCy pipeline grow with its
+length, and transformer models only see its first tokens. Windows are produced lazily so that
+only a bounded number of them is held in memory, whatever the size of the document.
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+WHITESPACE = (" ", "\n", "\t", "\r")
+
+
+def _last_whitespace(text: str, start: int, end: int) -> int:
+    return max(text.rfind(char, start, end) for char in WHITESPACE)
+
+
+def _first_whitespace(text: str, start: int, end: int) -> int:
+    positions = [text.find(char, start, end) for char in WHITESPACE]
+    positions = [position for position in positions if position != -1]
+    return min(positions) if positions else -1
+
+
+def split_windows(
+    text: str, window_size: int, overlap: int = 0
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (offset, window) pairs covering the text, consecutive windows share about `overlap` characters.
+
+    Windows are at most `window_size` characters long and are cut at whitespace where possible, so that
+    words are not split. The overlap is capped to half the window size.
+    """
+    window_size = max(1, int(window_size))
+    overlap = max(0, min(int(overlap), window_size // 2))
+    start = 0
+    while True:
+        end = start + window_size
+        if end >= len(text):
+            yield start, text[start:]
+            return
+        # Cut at the last whitespace of the second half of the window
+        cut = _last_whitespace(text, start + window_size // 2, end)
+        if cut == -1:
+            cut = end
+        yield start, text[start:cut]
+        next_start = max(cut - overlap, start + 1)
+        # Start the next window at the beginning of a word
+        whitespace = _first_whitespace(text, next_start, cut)
+        start = whitespace + 1 if whitespace != -1 else next_start
+
+
+def count_windows(text_length: int, window_size: int, overlap: int = 0) -> int:
+    """Approximate number of windows split_windows() yields for a text of this length."""
+    window_size = max(1, int(window_size))
+    overlap = max(0, min(int(overlap), window_size // 2))
+    if text_length <= window_size:
+        return 1
+    return 1 + -(-(text_length - window_size) // (window_size - overlap))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of at most `size` items, consuming the iterable lazily."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
@@ -12,3 +12,9 @@ redirect_router_instance.router.add_api_route(
 redirect_router_instance.router.add_api_route(
     "/health", App.health, methods=["GET"], response_class=PlainTextResponse
 )
+redirect_router_instance.router.add_api_route(
+    "/ready", App.ready, methods=["GET"], response_class=PlainTextResponse
+)
+redirect_router_instance.router.add_api_route(
+    "/metrics", App.metrics, methods=["GET"], response_class=PlainTextResponse
+)
@@ -9,18 +9,17 @@ from pydantic import ValidationError
 from pebblo.app.api.req_models import ReqClassifier
 from pebblo.app.config.config import var_server_config_dict
 from pebblo.app.enums.common import ClassificationMode
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.models import AiDataModel
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.config import get_entity_types
 from pebblo.log import get_logger
-from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 config_details = var_server_config_dict.get()
 
 
 logger = get_logger(__name__)
-topic_classifier_obj = TopicClassifier()
-entity_classifier_obj = EntityClassifier()
 
 
 class Classification:
@@ -50,37 +49,23 @@ class Classification:
             topicDetails={},
         )
         try:
-            # Process entity classification
-            if req.mode in [
-                ClassificationMode.ENTITY,
-                ClassificationMode.ALL,
-            ]:
-                (
-                    entities,
-                    entity_count,
-                    anonymized_doc,
-                    entity_details,
-                ) = entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-                    req.data,
-                    anonymize_snippets=req.anonymize,
-                )
-                doc_info.entities = entities
-                doc_info.entityCount = entity_count
-                doc_info.entityDetails = entity_details
-                if req.anonymize:
-                    doc_info.data = anonymized_doc
-
-            # Process topic classification
-            if req.mode in [
-                ClassificationMode.TOPIC,
-                ClassificationMode.ALL,
-            ]:
-                topics, topic_count, topic_details = topic_classifier_obj.predict(
-                    req.data
-                )
-                doc_info.topics = topics
-                doc_info.topicCount = topic_count
-                doc_info.topicDetails = topic_details
+            task = ClassificationTask(
+                data=req.data,
+                topics=req.mode in [ClassificationMode.TOPIC, ClassificationMode.ALL],
+                entities=req.mode
+                in [
+                    ClassificationMode.ENTITY,
+                    ClassificationMode.ALL,
+                    ClassificationMode.SECRETS,
+                ],
+                anonymize_snippets=req.anonymize,
+                secrets_only=req.mode == ClassificationMode.SECRETS,
+                entity_types=get_entity_types(req.entities),
+            )
+            result = get_classification_engine().classify([task])[0]
+            doc_info = AiDataModel(**result)
+            if not req.anonymize:
+                doc_info.data = req.data
             return doc_info
         except (KeyError, ValueError, RuntimeError) as e:
             logger.error(f"Failed to get classifier response: {e}")
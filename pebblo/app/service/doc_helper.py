@@ -5,9 +5,12 @@ Doc helper module for loader doc related task
 import ast
 import os.path
 from datetime import datetime
+from typing import Optional, Tuple
 
 from pebblo.app.enums.common import ClassificationMode
 from pebblo.app.enums.enums import CacheDir, ReportConstants
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.models.models import (
     AiDataModel,
     AiDocs,
@@ -22,15 +25,10 @@ from pebblo.app.utils.utils import (
     get_pebblo_server_version,
     read_json_file,
 )
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
 from pebblo.log import get_logger
-from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 logger = get_logger(__name__)
 
-# Init topic classifier
-topic_classifier_obj = TopicClassifier()
-
 
 class LoaderHelper:
     """
@@ -44,6 +42,7 @@ class LoaderHelper:
         load_id: str,
         classifier_mode: str = "all",
         anonymize_snippets: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
     ):
         self.app_details = app_details
         self.data = data
@@ -51,7 +50,7 @@ class LoaderHelper:
         self.loader_mapper = {}
         self.classifier_mode = classifier_mode
         self.anonymize_snippets = anonymize_snippets
-        self.entity_classifier_obj = EntityClassifier()
+        self.entity_types = entity_types
 
     # Initialization
     def _initialize_raw_data(self) -> dict:
@@ -184,49 +183,32 @@ class LoaderHelper:
                     files_with_findings_count += 1
         return files_with_findings_count
 
-    def _get_classifier_response(self, doc: dict) -> AiDataModel:
-        doc_info = AiDataModel(
-            data=doc.get("doc", None),
-            entities={},
-            entityCount=0,
-            entityDetails={},
-            topics={},
-            topicCount=0,
-            topicDetails={},
-        )
-        try:
-            if doc_info.data:
-                if self.classifier_mode and self.classifier_mode in [
-                    ClassificationMode.ALL.value,
-                    ClassificationMode.TOPIC.value,
-                ]:
-                    topics, topic_count, topic_details = topic_classifier_obj.predict(
-                        doc_info.data
-                    )
-                    doc_info.topics = topics
-                    doc_info.topicDetails = topic_details
-                    doc_info.topicCount = topic_count
-                if self.classifier_mode and self.classifier_mode in [
+    def _get_classifier_responses(self, docs: list) -> list:
+        """
+        Classify a list of docs in one go through the classification engine, results are in input order.
+        """
+        tasks = [
+            ClassificationTask(
+                data=doc.get("doc", None),
+                topics=self.classifier_mode
+                in [ClassificationMode.ALL.value, ClassificationMode.TOPIC.value],
+                entities=self.classifier_mode
+                in [
                     ClassificationMode.ALL.value,
                     ClassificationMode.ENTITY.value,
-                ]:
-                    (
-                        entities,
-                        entity_count,
-                        anonymized_doc,
-                        entity_details,
-                    ) = self.entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-                        doc_info.data,
-                        anonymize_snippets=self.anonymize_snippets,
-                    )
-                    doc_info.entities = entities
-                    doc_info.entityDetails = entity_details
-                    doc_info.entityCount = entity_count
-                    doc_info.data = anonymized_doc
-            return doc_info
-        except Exception as e:
-            logger.error(f"Get Classifier Response Failed, Exception: {e}")
-            return doc_info
+                    ClassificationMode.SECRETS.value,
+                ],
+                anonymize_snippets=self.anonymize_snippets,
+                secrets_only=self.classifier_mode == ClassificationMode.SECRETS.value,
+                entity_types=self.entity_types,
+            )
+            for doc in docs
+        ]
+        results = get_classification_engine().classify(tasks)
+        return [AiDataModel(**result) for result in results]
+
+    def _get_classifier_response(self, doc: dict) -> AiDataModel:
+        return self._get_classifier_responses([doc])[0]
 
     def _update_app_details(self, raw_data, ai_app_docs):
         """
@@ -635,13 +617,13 @@ class LoaderHelper:
         logger.debug(
             "Iterating input doc list and perform classification and aggregating report data"
         )
-        for doc in input_doc_list:
-            if doc:
-                # Get classifier Response
-                doc_info: AiDataModel = self._get_classifier_response(doc)
-                doc_obj = self._create_doc_model(doc, doc_info)
-                ai_app_docs.append(doc_obj)
-                raw_data = self._get_doc_report_metadata(doc_obj, raw_data)
+        input_doc_list = [doc for doc in input_doc_list if doc]
+        # Get classifier Response for all docs at once
+        doc_infos = self._get_classifier_responses(input_doc_list)
+        for doc, doc_info in zip(input_doc_list, doc_infos):
+            doc_obj = self._create_doc_model(doc, doc_info)
+            ai_app_docs.append(doc_obj)
+            raw_data = self._get_doc_report_metadata(doc_obj, raw_data)
         # Updating ai apps details
         self._update_app_details(raw_data, ai_app_docs)
 
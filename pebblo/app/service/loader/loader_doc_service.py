@@ -6,6 +6,8 @@ from os import makedirs, path
 from pebblo.app.config.config import var_server_config_dict
 from pebblo.app.enums.common import ClassificationMode
 from pebblo.app.enums.enums import ApplicationTypes, CacheDir
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.db_models import (
     AiDataModel,
@@ -22,17 +24,13 @@ from pebblo.app.service.loader.document.document import AiDocumentHandler
 from pebblo.app.service.local_ui.loader_apps import LoaderApp
 from pebblo.app.storage.sqlite_db import SQLiteClient
 from pebblo.app.utils.utils import get_current_time, get_full_path, timeit
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.config import get_entity_types
 from pebblo.log import get_logger
 from pebblo.reports.reports import Reports
-from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 config_details = var_server_config_dict.get()
 logger = get_logger(__name__)
 
-# Init topic classifier
-topic_classifier_obj = TopicClassifier()
-
 
 class AppLoaderDoc:
     def __init__(self):
@@ -41,7 +39,7 @@ class AppLoaderDoc:
         self.app_name = None
         self.classifier_mode = None
         self.anonymize_snippets = None
-        self.entity_classifier_obj = EntityClassifier()
+        self.entity_types = None
 
     def _initialize_data(self, data: dict):
         self.db = SQLiteClient()
@@ -49,6 +47,7 @@ class AppLoaderDoc:
         self.app_name = data.get("name")
         self._set_classifier_mode()
         self._set_anonymize_snippets()
+        self.entity_types = get_entity_types(data.get("classifier_entities"))
 
     @staticmethod
     def _create_return_response(message, output=None, status_code=200):
@@ -175,54 +174,35 @@ class AppLoaderDoc:
         logger.debug("Loader details Updated successfully.")
         return app_loader_details
 
-    @timeit
-    def _get_doc_classification(self, doc):
-        logger.debug("Doc classification started.")
-        doc_info = AiDataModel(
+    def _get_classification_task(self, doc) -> ClassificationTask:
+        return ClassificationTask(
             data=doc.get("doc", None),
-            entities={},
-            entityCount=0,
-            entityDetails={},
-            topics={},
-            topicCount=0,
-            topicDetails={},
+            topics=self.classifier_mode
+            in [ClassificationMode.ALL.value, ClassificationMode.TOPIC.value],
+            entities=self.classifier_mode
+            in [
+                ClassificationMode.ALL.value,
+                ClassificationMode.ENTITY.value,
+                ClassificationMode.SECRETS.value,
+            ],
+            anonymize_snippets=self.anonymize_snippets,
+            secrets_only=self.classifier_mode == ClassificationMode.SECRETS.value,
+            entity_types=self.entity_types,
         )
-        try:
-            if doc_info.data:
-                if self.classifier_mode and self.classifier_mode in [
-                    ClassificationMode.ALL.value,
-                    ClassificationMode.TOPIC.value,
-                ]:
-                    topics, topic_count, topic_details = topic_classifier_obj.predict(
-                        doc_info.data
-                    )
-                    doc_info.topics = topics
-                    doc_info.topicCount = topic_count
-                    doc_info.topicDetails = topic_details
-                if self.classifier_mode and self.classifier_mode in [
-                    ClassificationMode.ALL.value,
-                    ClassificationMode.ENTITY.value,
-                ]:
-                    (
-                        entities,
-                        entity_count,
-                        anonymized_doc,
-                        entity_details,
-                    ) = self.entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-                        doc_info.data,
-                        anonymize_snippets=self.anonymize_snippets,
-                    )
-                    doc_info.entities = entities
-                    doc_info.entityDetails = entity_details
-                    doc_info.entityCount = entity_count
-                    doc_info.data = anonymized_doc
-            logger.debug("Doc classification finished.")
-            return doc_info
-        except Exception as e:
-            logger.error(
-                f"Get Classifier Response Failed for doc: {doc}, Exception: {e}"
-            )
-            return doc_info
+
+    @timeit
+    def _get_doc_classifications(self, docs):
+        """
+        Classify a list of docs in one go through the classification engine, results are in input order.
+        """
+        logger.debug("Doc classification started.")
+        tasks = [self._get_classification_task(doc) for doc in docs]
+        results = get_classification_engine().classify(tasks)
+        logger.debug("Doc classification finished.")
+        return [AiDataModel(**result) for result in results]
+
+    def _get_doc_classification(self, doc):
+        return self._get_doc_classifications([doc])[0]
 
     @staticmethod
     @timeit
@@ -242,8 +222,8 @@ class AppLoaderDoc:
     def _doc_pre_processing(self):
         logger.debug("Input docs pre processing started.")
         input_doc_list = self.data.get("docs", [])
-        for doc in input_doc_list:
-            doc_info = self._get_doc_classification(doc)
+        doc_infos = self._get_doc_classifications(input_doc_list)
+        for doc, doc_info in zip(input_doc_list, doc_infos):
             self._update_doc_details(doc, doc_info)
 
         # Update input doc with updated one
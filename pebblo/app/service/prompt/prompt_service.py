@@ -1,6 +1,8 @@
 # Prompt API with database implementation.
 from datetime import datetime
 
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.db_models import (
     AiUser as aiuser,
@@ -14,9 +16,7 @@ from pebblo.app.models.db_response_models import PromptResponseModel
 from pebblo.app.models.sqltables import AiAppTable, AiRetrievalTable, AiUser
 from pebblo.app.storage.sqlite_db import SQLiteClient
 from pebblo.app.utils.utils import timeit
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
 from pebblo.log import get_logger
-from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 logger = get_logger(__name__)
 
@@ -26,8 +26,6 @@ class Prompt:
         self.db = None
         self.data = None
         self.app_name = None
-        self.entity_classifier_obj = EntityClassifier()
-        self.topic_classifier_obj = TopicClassifier()
 
     @staticmethod
     def _return_response(data=None, message="", status_code=200):
@@ -49,19 +47,18 @@ class Prompt:
         """
         logger.debug(f"Retrieving details for: {input_type}")
 
-        (entities, entity_count) = (
-            self.entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-                input_data
-            )[:2]
-        )
-
-        data = {"data": input_data, "entityCount": entity_count, "entities": entities}
-
         # Topic classification is performed only for the response.
+        task = ClassificationTask(data=input_data, topics=input_type == "response")
+        result = get_classification_engine().classify([task])[0]
+
+        data = {
+            "data": input_data,
+            "entityCount": result["entityCount"],
+            "entities": result["entities"],
+        }
         if input_type == "response":
-            topics, topic_count, _ = self.topic_classifier_obj.predict(input_data)
-            data["topicCount"] = topic_count
-            data["topics"] = topics
+            data["topicCount"] = result["topicCount"]
+            data["topics"] = result["topics"]
 
         return data
 
@@ -6,9 +6,11 @@ import traceback
 
 from pydantic import ValidationError
 
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.models import AiDataModel, PromptGovResponseModel
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.config import get_entity_types
 from pebblo.log import get_logger
 
 logger = get_logger(__name__)
@@ -21,9 +23,8 @@ class PromptGov:
 
     def __init__(self, data):
         self.input = data
-        self.entity_classifier_obj = EntityClassifier()
 
-    def _get_classifier_response(self):
+    def _get_classifier_response(self, entity_types=None):
         """
         Processes the input prompt through the entity classifier and anonymizer, and returns
         the resulting information encapsulated in an AiDataModel object.
@@ -40,18 +41,15 @@ class PromptGov:
         )
         try:
             if self.input.get("prompt") is not None:
-                (
-                    entities,
-                    entity_count,
-                    anonymized_doc,
-                    entity_details,
-                ) = self.entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-                    self.input.get("prompt"),
-                    anonymize_snippets=False,
+                task = ClassificationTask(
+                    data=self.input.get("prompt"),
+                    topics=False,
+                    entity_types=entity_types,
                 )
-                doc_info.entities = entities
-                doc_info.entityCount = entity_count
-                doc_info.data = anonymized_doc
+                result = get_classification_engine().classify([task])[0]
+                doc_info.entities = result["entities"]
+                doc_info.entityCount = result["entityCount"]
+                doc_info.data = result["data"]
             return doc_info
         except Exception as e:
             logger.error(f"Get Classifier Response Failed, Exception: {e}")
@@ -62,7 +60,8 @@ class PromptGov:
         Process Prompt Governance Request
         """
         try:
-            doc_info = self._get_classifier_response()
+            entity_types = get_entity_types(self.input.get("entities"))
+            doc_info = self._get_classifier_response(entity_types)
             logger.debug(f"Entities {doc_info.entities}")
             logger.debug(f"Entity Count {doc_info.entityCount}")
             response = PromptGovResponseModel(
@@ -74,7 +73,7 @@ class PromptGov:
                 body=response.model_dump(exclude_none=True), status_code=200
             )
 
-        except ValidationError as ex:
+        except (ValidationError, ValueError) as ex:
             response = PromptGovResponseModel(
                 entities={}, entityCount=0, message=f"Error : {str(ex)}"
             )
@@ -5,6 +5,8 @@ This module handles app prompt API business logic.
 from pydantic import ValidationError
 
 from pebblo.app.enums.enums import CacheDir
+from pebblo.app.libs.classification_engine import get_classification_engine
+from pebblo.app.libs.classification_worker import ClassificationTask
 from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.models import (
     PromptResponseModel,
@@ -17,9 +19,7 @@ from pebblo.app.utils.utils import (
     release_lock,
     write_json_to_file,
 )
-from pebblo.entity_classifier.entity_classifier import EntityClassifier
 from pebblo.log import get_logger
-from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 logger = get_logger(__name__)
 
@@ -32,8 +32,6 @@ class Prompt:
     def __init__(self):
         self.data = None
         self.application_name = None
-        self.entity_classifier_obj = EntityClassifier()
-        self.topic_classifier_obj = TopicClassifier()
 
     def _initialize_data(self, data):
         self.data = data
@@ -45,24 +43,18 @@ class Prompt:
         """
         logger.debug(f"Retrieving details for: {input_type}")
 
-        (
-            entities,
-            entity_count,
-            _,
-            _,
-        ) = self.entity_classifier_obj.presidio_entity_classifier_and_anonymizer(
-            input_data
-        )
-
-        data = {"data": input_data, "entityCount": entity_count, "entities": entities}
-
         # Topic classification is performed only for the response.
+        task = ClassificationTask(data=input_data, topics=input_type == "response")
+        result = get_classification_engine().classify([task])[0]
+
+        data = {
+            "data": input_data,
+            "entityCount": result["entityCount"],
+            "entities": result["entities"],
+        }
         if input_type == "response":
-            topics, topic_count, topic_details = self.topic_classifier_obj.predict(
-                input_data
-            )
-            data["topicCount"] = topic_count
-            data["topics"] = topics
+            data["topicCount"] = result["topicCount"]
+            data["topics"] = result["topics"]
 
         return data
 
@@ -14,6 +14,7 @@ from pebblo.app.libs.responses import PebbloJsonResponse
 from pebblo.app.models.models import LoaderDocResponseModel, LoaderDocs, LoaderMetadata
 from pebblo.app.service.doc_helper import LoaderHelper
 from pebblo.app.utils.utils import get_full_path, read_json_file, write_json_to_file
+from pebblo.entity_classifier.utils.config import get_entity_types
 from pebblo.log import get_logger
 from pebblo.reports.reports import Reports
 
@@ -31,12 +32,14 @@ class AppLoaderDoc:
         self.app_name = None
         self.classifier_mode = None
         self.anonymize_snippets = None
+        self.entity_types = None
 
     def _initialize_data(self, data: dict):
         self.data = data
         self.app_name = data.get("name")
         self._set_classifier_mode()
         self._set_anonymize_snippets()
+        self.entity_types = get_entity_types(data.get("classifier_entities"))
 
     def _write_pdf_report(self, final_report):
         """
@@ -208,6 +211,7 @@ class AppLoaderDoc:
                 load_id,
                 self.classifier_mode,
                 self.anonymize_snippets,
+                self.entity_types,
             )
             (
                 app_details,
@@ -311,3 +311,29 @@ def timeit(func):
             return response
 
     return wrapper
+
+
+def get_process_memory_usage(pid: int) -> dict:
+    """
+    Return resident (rss), proportional (pss) and shared memory of a process in MB.
+    Memory shared copy-on-write with a parent process counts fully towards rss of
+    every process but is split between them in pss. Empty if /proc is unavailable.
+    """
+    memory_usage = {}
+    fields = {
+        "Rss": "rss",
+        "Pss": "pss",
+        "Shared_Clean": "shared",
+        "Shared_Dirty": "shared",
+    }
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps_file:
+            for line in smaps_file:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    size_mb = int(value.split()[0]) / 1024
+                    key = fields[name]
+                    memory_usage[key] = memory_usage.get(key, 0) + size_mb
+    except (OSError, ValueError, IndexError):
+        return {}
+    return memory_usage
@@ -1,4 +1,10 @@
 import math
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+
+HIGH_ENTROPY_THRESHOLD = 4.0
 
 
 def calculate_entropy(data: str) -> float:
@@ -17,14 +23,42 @@ def calculate_entropy(data: str) -> float:
     if not data:
         return 0.0  # Return 0 entropy for empty input
 
-    entropy: float = 0.0  # Initialize entropy value
-    # Calculate the probability of each character in the string
-    for char in set(data):
-        p_x: float = float(data.count(char)) / len(data)
-        # Calculate entropy using the formula: -sum(p_x * log2(p_x))
-        entropy -= p_x * math.log2(p_x)
+    length = len(data)
+    # Calculate entropy using the formula: -sum(p_x * log2(p_x)) over the character counts
+    return -sum(
+        count / length * math.log2(count / length) for count in Counter(data).values()
+    )
+
+
+def calculate_entropies(values: Sequence[str]) -> np.ndarray:
+    """
+    Calculate the Shannon entropy of many strings at once.
+
+    The character histograms of all strings are computed together, by counting the distinct
+    (string index, character) pairs of their concatenation, so the cost does not depend on the
+    number of strings or on the size of their alphabet.
+
+    Args:
+        values (Sequence[str]): The input strings.
 
-    return entropy  # Return the calculated entropy
+    Returns:
+        np.ndarray: The entropy of every input string, 0 for empty strings.
+    """
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    if not lengths.sum():
+        return np.zeros(len(values))
+    characters = np.frombuffer("".join(values).encode("utf-32-le"), dtype=np.uint32)
+    indexes = np.repeat(np.arange(len(values), dtype=np.uint64), lengths)
+    pairs, counts = np.unique(
+        (indexes << np.uint64(32)) | characters, return_counts=True
+    )
+    pair_indexes = (pairs >> np.uint64(32)).astype(np.int64)
+    probabilities = counts / lengths[pair_indexes]
+    return np.bincount(
+        pair_indexes,
+        weights=-probabilities * np.log2(probabilities),
+        minlength=len(values),
+    )
 
 
 def is_high_entropy_secret(value: str) -> bool:
@@ -41,9 +75,4 @@ def is_high_entropy_secret(value: str) -> bool:
         bool: True if the string has high entropy (>= 4), indicating it may be a secret.
               False otherwise.
     """
-    entropy: float = calculate_entropy(
-        value
-    )  # Calculate the entropy of the input string
-    if entropy >= 4.0:  # Check if the entropy meets or exceeds the threshold of 4
-        return True  # High entropy detected, return True
-    return False  # Entropy below the threshold, return False
+    return calculate_entropy(value) >= HIGH_ENTROPY_THRESHOLD
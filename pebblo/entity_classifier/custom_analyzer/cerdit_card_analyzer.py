@@ -5,8 +5,12 @@ from presidio_analyzer.predefined_recognizers.credit_card_recognizer import (
     CreditCardRecognizer,
 )
 
+from pebblo.entity_classifier.custom_analyzer.time_limited_analyzer import (
+    TimeLimitedPatternMixin,
+)
+
 
-class ExtendedCreditCardRecognizer(CreditCardRecognizer):
+class ExtendedCreditCardRecognizer(TimeLimitedPatternMixin, CreditCardRecognizer):
     """
     Extends the Credit Card Recognizer by adding support for additional credit card types.
     """
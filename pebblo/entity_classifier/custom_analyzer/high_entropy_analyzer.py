@@ -0,0 +1,107 @@
+from typing import List, Optional
+
+import regex
+from presidio_analyzer import AnalysisExplanation, EntityRecognizer, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+from pebblo.entity_classifier.custom_analyzer.calculate_entropy import (
+    calculate_entropies,
+)
+from pebblo.entity_classifier.utils.config import ConfidenceScore
+from pebblo.entity_classifier.utils.regex_guard import finditer, get_regex_timeout
+from pebblo.log import get_logger
+
+logger = get_logger(__name__)
+
+# Candidate tokens: base64 and url-safe characters with at least one letter and one digit, and padding
+TOKEN_REGEX = regex.compile(
+    r"(?<![\w+/-])(?=[\w+/-]*\d)(?=[\w+/-]*[A-Za-z])[A-Za-z0-9_+/-]{20,256}={0,2}(?![\w+/=-])"
+)
+HIGH_ENTROPY_SECRET_THRESHOLD = 4.5
+
+
+class HighEntropySecretRecognizer(EntityRecognizer):
+    """Recognize secrets not matched by the known secret patterns, e.g. API tokens, from their Shannon entropy.
+
+    The entropy of all candidate tokens of a text is computed in one vectorized call. Results have the
+    minimum pattern score, so that they are reported only when context words raise their score.
+
+    :param context: List of context words to increase confidence in detection
+    :param supported_language: Language this recognizer supports
+    :param supported_entity: The entity this recognizer can detect
+    :param threshold: Minimum entropy of a token in bits per character
+    """
+
+    CONTEXT = [
+        "api",
+        "auth",
+        "bearer",
+        "credential",
+        "key",
+        "password",
+        "secret",
+        "token",
+    ]
+
+    def __init__(
+        self,
+        context: Optional[List[str]] = None,
+        supported_language: str = "en",
+        supported_entity: str = "HIGH_ENTROPY_SECRET",
+        threshold: float = HIGH_ENTROPY_SECRET_THRESHOLD,
+    ):
+        self.threshold = threshold
+        super().__init__(
+            supported_entities=[supported_entity],
+            supported_language=supported_language,
+            context=context if context else self.CONTEXT,
+        )
+
+    def load(self) -> None:
+        pass
+
+    def analyze(
+        self,
+        text: str,
+        entities: List[str] = [],
+        nlp_artifacts: Optional[NlpArtifacts] = None,
+    ) -> List[RecognizerResult]:
+        """
+        Analyzes text to detect high entropy tokens.
+
+        :param text: Text to be analyzed
+        :param entities: Entities this recognizer can detect
+        :param nlp_artifacts: Output values from the NLP engine
+        :return:
+        """
+        spans = [
+            match.span()
+            for match in finditer(
+                TOKEN_REGEX, text, get_regex_timeout(), self.name, "Token"
+            )
+        ]
+        if not spans:
+            return []
+        entropies = calculate_entropies([text[start:end] for start, end in spans])
+        score = float(ConfidenceScore.EntityMinScore.value)
+        results = []
+        for index in (entropies >= self.threshold).nonzero()[0]:
+            start, end = spans[index]
+            results.append(
+                RecognizerResult(
+                    entity_type=self.supported_entities[0],
+                    start=start,
+                    end=end,
+                    score=score,
+                    analysis_explanation=AnalysisExplanation(
+                        recognizer=self.name,
+                        original_score=score,
+                        textual_explanation=f"Token entropy {entropies[index]:.2f}",
+                    ),
+                    recognition_metadata={
+                        RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                        RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+                    },
+                )
+            )
+        return results
@@ -1,5 +1,20 @@
+"""
+Entity detection with an external LLM, enabled by `classifier.use_llm`.
+
+Texts are split in chunks of at most LLM_CHUNK_SIZE characters. Short chunks, e.g. of the documents of a
+loader batch, are packed together in one prompt, numbered, and the LLM returns the entities of every
+chunk under its number. Detected entities are cached by chunk hash. LLM calls run on a
+thread pool shared by the process, at most LLM_MAX_PENDING calls wait or run at once and a text waits
+at most LLM_TIME_BUDGET seconds for its chunks, chunks without answer only get Presidio results.
+"""
+
+import functools
+import hashlib
 import json
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
 
 from presidio_analyzer import (
     EntityRecognizer,
@@ -8,13 +23,36 @@ from presidio_analyzer import (
 )
 from presidio_analyzer.nlp_engine import NlpArtifacts
 
-from pebblo.entity_classifier.utils.prompt_lib import get_entity_detection_prompt
+from pebblo.app.libs.classification_cache import mark_degraded
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.app.libs.text_windows import split_windows
+from pebblo.entity_classifier.utils.prompt_lib import (
+    get_entity_detection_prompt,
+    get_packed_entity_detection_prompt,
+)
 from pebblo.entity_classifier.utils.result_validation import extract_entity_info
 from pebblo.log import get_logger
 from pebblo.text_generation.text_generation import TextGeneration
 
 logger = get_logger(__name__)
 
+# Characters of text in a chunk, and shared by consecutive chunks of a long text
+LLM_CHUNK_SIZE = 2000
+LLM_CHUNK_OVERLAP = 200
+# Characters of the chunks packed in one prompt
+LLM_PACK_SIZE = 2000
+LLM_PACK_SEPARATOR = "\n\n"
+# Maximum number of LLM calls in flight per process, and of calls running or waiting for a slot
+LLM_MAX_CONCURRENCY = 4
+LLM_MAX_PENDING = 16
+# Seconds a text waits for the entities of its chunks
+LLM_TIME_BUDGET = 30.0
+LLM_CACHE_SIZE = 1024
+
+detections_counter = metrics_registry.counter(
+    "pebblo_llm_entity_detections_total",
+    "Text chunks sent to LLM entity detection, by outcome.",
+)
 
 ENTITY_LABELS_UNIQUE = {
     "iban": "IBAN_CODE",
@@ -38,6 +76,49 @@ ENTITY_LABELS_UNIQUE = {
     "bban": "BBAN_CODE",
 }
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending_slots = threading.BoundedSemaphore(LLM_MAX_PENDING)
+# Entities detected in a chunk, by chunk hash
+_cache: OrderedDict = OrderedDict()
+# Calls in flight, by hash of the chunks they detect entities in
+_in_flight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="pebblo-llm"
+                )
+    return _executor
+
+
+def _get_chunk_key(chunk_text: str) -> str:
+    return hashlib.sha256(chunk_text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _split_chunks(text: str) -> List[Tuple[int, str]]:
+    if len(text) <= LLM_CHUNK_SIZE:
+        return [(0, text)]
+    return list(split_windows(text, LLM_CHUNK_SIZE, LLM_CHUNK_OVERLAP))
+
+
+def _pack(chunks: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """Group (key, chunk text) pairs in packs of at most LLM_PACK_SIZE characters."""
+    packs = []
+    pack_size = 0
+    for key, chunk_text in chunks:
+        if not packs or pack_size + len(chunk_text) > LLM_PACK_SIZE:
+            packs.append([])
+            pack_size = 0
+        packs[-1].append((key, chunk_text))
+        pack_size += len(chunk_text) + len(LLM_PACK_SEPARATOR)
+    return packs
+
 
 class LLMRecognizer(EntityRecognizer):
     """
@@ -72,38 +153,144 @@ class LLMRecognizer(EntityRecognizer):
         :param nlp_artifacts: Optional NLP pipeline artifacts (unused in this recognizer).
         :return: List of RecognizerResult objects.
         """
+        results = {}
+        for offset, detected_entities in self.llm_analyzer(text):
+            for entity in detected_entities:
+                entity_type = ENTITY_LABELS_UNIQUE.get(entity.get("label"))
+                start = entity.get("start") + offset
+                end = entity.get("end") + offset
+                # default score is 0.8 if not provided
+                score = entity.get("confidence", 0.8)
+                if entity_type and abs(end - start) > 2:
+                    # Entities found in the overlap of two chunks are reported once
+                    results[(entity_type, start, end)] = RecognizerResult(
+                        entity_type, start, end, score
+                    )
+        return list(results.values())
+
+    def prefetch(self, texts: List[str]) -> None:
+        """
+        Start the LLM calls of the chunks of many texts, e.g. of a batch of documents, so that short
+        texts are packed together. analyze() of these texts then waits for the calls in flight.
+        """
+        self._submit(
+            [
+                (_get_chunk_key(chunk_text), chunk_text)
+                for text in texts
+                for _, chunk_text in _split_chunks(text)
+            ]
+        )
+
+    def llm_analyzer(self, text) -> List[Tuple[int, list]]:
+        """
+        Return the (offset, entities) of the chunks of a text answered within the time budget.
+        """
+        chunks = [
+            (offset, _get_chunk_key(chunk_text), chunk_text)
+            for offset, chunk_text in _split_chunks(text)
+        ]
+        futures = self._submit([(key, chunk_text) for _, key, chunk_text in chunks])
+        if futures:
+            wait(set(futures.values()), timeout=LLM_TIME_BUDGET)
 
-        # Calling the llm_analyzer function you provided
-        detected_entities = self.llm_analyzer(text)
-        # Create a list of RecognizerResult objects based on detected entities
-        results = []
-        for entity in detected_entities:
-            entity_det = entity.get("label")
-            if entity_det:
-                entity_type = ENTITY_LABELS_UNIQUE.get(entity_det)
-                start = entity.get("start")
-                end = entity.get("end")
-                score = entity.get(
-                    "confidence", 0.8
-                )  # default score is 1.0 if not provided
-
-            if abs(end - start) > 2:
-                # Append to results as a RecognizerResult object
-                results.append(RecognizerResult(entity_type, start, end, score))
-        return results
-
-    def llm_analyzer(self, text):
+        detected = []
+        timeouts = 0
+        for offset, key, _ in chunks:
+            with _lock:
+                detected_entities = _cache.get(key)
+            if detected_entities is not None:
+                if key not in futures:
+                    detections_counter.inc(outcome="cached")
+                detected.append((offset, detected_entities))
+            elif key not in futures:
+                detections_counter.inc(outcome="saturated")
+                mark_degraded("llm_saturated")
+            elif futures[key].done():
+                detections_counter.inc(outcome="failed")
+                mark_degraded("llm_failed")
+            else:
+                # The call completes in the background and still fills the cache
+                detections_counter.inc(outcome="timeout")
+                mark_degraded("llm_timeout")
+                timeouts += 1
+        if timeouts:
+            logger.warning(
+                f"LLM entity detection of {timeouts} of {len(chunks)} chunks not answered "
+                f"within {LLM_TIME_BUDGET}s, keeping Presidio results only"
+            )
+        return detected
+
+    def _submit(self, chunks: List[Tuple[str, str]]) -> Dict[str, Future]:
         """
-        Your custom LLM entity detection logic.
+        Submit the LLM calls of (key, chunk text) pairs neither cached nor in flight, and return the
+        calls in flight of all chunks not cached. Chunks are skipped when LLM_MAX_PENDING calls are pending.
         """
-        messages = get_entity_detection_prompt(text)
+        futures = {}
+        pending = {}
+        with _lock:
+            for key, chunk_text in chunks:
+                if key in _cache:
+                    _cache.move_to_end(key)
+                elif key in _in_flight:
+                    futures[key] = _in_flight[key]
+                else:
+                    pending[key] = chunk_text
+        for pack in _pack(list(pending.items())):
+            if not _pending_slots.acquire(blocking=False):
+                break
+            future = _get_executor().submit(self._detect, pack)
+            with _lock:
+                for key, _ in pack:
+                    _in_flight[key] = future
+                    futures[key] = future
+            future.add_done_callback(functools.partial(self._release, pack))
+        return futures
 
-        # Assuming text_gen_obj is already defined and initialized elsewhere
-        entities = self.text_gen_obj.generate(messages)
-        entities = json.loads(entities)
-        if isinstance(entities, dict):
-            entities = [entities]
+    @staticmethod
+    def _release(pack: List[Tuple[str, str]], future: Future) -> None:
+        _pending_slots.release()
+        with _lock:
+            for key, _ in pack:
+                if _in_flight.get(key) is future:
+                    del _in_flight[key]
 
-        # Extract entity information from the detected entities
-        entities = extract_entity_info(entities, text)
-        return entities
+    def _detect(self, pack: List[Tuple[str, str]]) -> None:
+        """
+        Detect the entities of packed chunks with one LLM call, and cache the entities of every chunk.
+        """
+        try:
+            chunk_texts = [chunk_text for _, chunk_text in pack]
+            if len(pack) == 1:
+                messages = get_entity_detection_prompt(chunk_texts[0])
+            else:
+                messages = get_packed_entity_detection_prompt(chunk_texts)
+            response = self.text_gen_obj.generate(messages, timeout=LLM_TIME_BUDGET)
+            if response is None:
+                raise ValueError("No response from the LLM")
+            response = json.loads(response)
+            if len(pack) == 1:
+                chunk_entities = [response]
+            elif isinstance(response, dict):
+                # Entities of every chunk under its number, chunks without answer are not cached
+                chunk_entities = [
+                    response.get(str(chunk_id)) for chunk_id in range(1, len(pack) + 1)
+                ]
+            else:
+                raise ValueError("LLM response is not keyed by sentence number")
+        except Exception as ex:
+            logger.warning(f"LLM entity detection failed. {ex}")
+            return
+        detected = 0
+        with _lock:
+            for (key, chunk_text), entities in zip(pack, chunk_entities):
+                if entities is None:
+                    continue
+                if isinstance(entities, dict):
+                    entities = [entities]
+                # Extract entity information of the chunk from its own detected entities only
+                _cache[key] = extract_entity_info(entities, chunk_text)
+                _cache.move_to_end(key)
+                detected += 1
+            while len(_cache) > LLM_CACHE_SIZE:
+                _cache.popitem(last=False)
+        detections_counter.inc(detected, outcome="detected")
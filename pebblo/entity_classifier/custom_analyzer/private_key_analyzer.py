@@ -1,6 +1,7 @@
-import re
+import time
 from typing import List, Optional
 
+import regex
 from presidio_analyzer import (
     EntityRecognizer,
     Pattern,
@@ -12,13 +13,41 @@ from presidio_analyzer.nlp_engine import NlpArtifacts
 from pebblo.entity_classifier.custom_analyzer.calculate_entropy import (
     is_high_entropy_secret,
 )
+from pebblo.entity_classifier.utils.regex_guard import get_regex_timeout, search
 from pebblo.log import get_logger
 
 logger = get_logger(__name__)
 
+BEGIN_MARKER_REGEX = regex.compile(r"-----BEGIN", regex.IGNORECASE)
+# Entity type of the private key blocks, by the key type in their header
+BLOCK_TYPES = {
+    "": "PRIVATE_KEY",
+    "DSA": "DSA_PRIVATE_KEY",
+    "EC": "ELLIPTIC_CURVE_PRIVATE_KEY",
+    "ENCRYPTED": "ENCRYPTED_PRIVATE_KEY",
+    "OPENSSH": "OPENSSH_PRIVATE_KEY",
+    "RSA": "RSA_PRIVATE_KEY",
+}
+HEADER_REGEX = regex.compile(
+    r"-----BEGIN (?:(DSA|EC|ENCRYPTED|OPENSSH|RSA) )?PRIVATE KEY-----", regex.IGNORECASE
+)
+FOOTER_REGEXES = {
+    label: regex.compile(
+        rf"-----END {label + ' ' if label else ''}PRIVATE KEY", regex.IGNORECASE
+    )
+    for label in BLOCK_TYPES
+}
+MIN_KEY_LENGTH = 10
+# Characters around a private key searched for Google service account keywords
+GOOGLE_KEYWORD_RANGE = 200
+
 
 class PrivateKeyRecognizer(PatternRecognizer):
-    """Recognize Private key using regex.
+    """Recognize Private key in PEM blocks.
+
+    The patterns describe the block types and their score, blocks are found in a single scan of the text
+    for BEGIN headers instead of one regex pass per pattern. Private keys near Google service account
+    keywords are reported as GOOGLE_PRIVATE_KEY.
 
     :param patterns: List of patterns to be used by this recognizer
     :param context: List of context words to increase confidence in detection
@@ -92,7 +121,7 @@ class PrivateKeyRecognizer(PatternRecognizer):
         regex_flags: Optional[int] = None,
     ) -> List[RecognizerResult]:
         """
-        Analyzes text to detect PII using regular expressions or deny-lists.
+        Analyzes text to detect private keys in PEM blocks.
 
         :param text: Text to be analyzed
         :param entities: Entities this recognizer can detect
@@ -100,92 +129,82 @@ class PrivateKeyRecognizer(PatternRecognizer):
         :param regex_flags: regex flags to be used in regex matching
         :return:
         """
-        results = []
+        # Most documents have no PEM block at all, nor dashes to search the marker from
+        if "-----" not in text or BEGIN_MARKER_REGEX.search(text) is None:
+            return []
+        return self.__analyze_blocks(text, regex_flags or self.global_regex_flags)
 
-        if self.patterns:
-            pattern_result = self.__analyze_patterns(
-                text, [re.MULTILINE | re.IGNORECASE]
-            )
-            results.extend(pattern_result)
-
-        return results
-
-    def __analyze_patterns(
-        self, text: str, flags: int = None
-    ) -> List[RecognizerResult]:
+    def __analyze_blocks(self, text: str, flags: int) -> List[RecognizerResult]:
         """
-        Evaluate all patterns in the provided text.
-
-        Including words in the provided deny-list
+        Find private key blocks in one scan of their BEGIN headers, the block type is read from the header.
 
         :param text: text to analyze
         :param flags: regex flags
         :return: A list of RecognizerResult
         """
-        flags = flags if flags else self.global_regex_flags
+        patterns = {pattern.name: pattern for pattern in self.patterns}
+        # The scan of a text shares one time budget
+        deadline = time.monotonic() + get_regex_timeout()
         results = []
-        for pattern in self.patterns:
-            matches = re.finditer(pattern.regex, text, re.MULTILINE | re.IGNORECASE)
-            # matches = re.finditer(pattern.regex, text, re.DOTALL)
-
-            for matchNum, match in enumerate(matches, start=1):
-                start, end = match.span()
-                current_match = text[start:end]
-                range_text = text[start - 200 : end + 200]
-                # Check if any of the keywords exist within the range
-                keyword_found = any(
-                    keyword in range_text for keyword in self.google_keywords
-                )
-
-                # Determine the entity type based on keyword presence
-                if keyword_found:
-                    pattern.name = "GOOGLE_PRIVATE_KEY"
-
-                # Skip empty results
-                if current_match == "":
-                    continue
-
-                score = pattern.score
-
-                validation_result = self.validate_result(current_match)
-                description = self.build_regex_explanation(
-                    self.name,
-                    pattern.name,
-                    pattern.regex,
-                    score,
-                    validation_result,
-                    flags,
-                )
-                pattern_result = RecognizerResult(
-                    entity_type=pattern.name,
-                    start=start,
-                    end=end,
-                    score=score,
-                    analysis_explanation=description,
-                    recognition_metadata={
-                        RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
-                        RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
-                    },
-                )
-
-                if validation_result is not None:
-                    if validation_result:
-                        pattern_result.score = EntityRecognizer.MAX_SCORE
-                    else:
-                        pattern_result.score = EntityRecognizer.MIN_SCORE
-
-                invalidation_result = self.invalidate_result(current_match)
-                if invalidation_result is not None and invalidation_result:
-                    pattern_result.score = EntityRecognizer.MIN_SCORE
-
-                if pattern_result.score > EntityRecognizer.MIN_SCORE:
-                    results.append(pattern_result)
-
-                # Update analysis explanation score following validation or invalidation
-                description.score = pattern_result.score
-
-        results = EntityRecognizer.remove_duplicates(results)
-        return results
+        position = 0
+        while True:
+            header = search(HEADER_REGEX, text, position, deadline, self.name, "Header")
+            if header is None:
+                break
+            position = header.end()
+            label = (header.group(1) or "").upper()
+            pattern = patterns.get(BLOCK_TYPES[label])
+            footer = search(
+                FOOTER_REGEXES[label],
+                text,
+                header.end() + MIN_KEY_LENGTH,
+                deadline,
+                self.name,
+                BLOCK_TYPES[label],
+            )
+            if pattern is None or footer is None:
+                continue
+            position = footer.end()
+
+            start, end = header.end(), footer.start()
+            current_match = text[start:end]
+            entity_type = pattern.name
+            range_text = text[
+                max(0, start - GOOGLE_KEYWORD_RANGE) : end + GOOGLE_KEYWORD_RANGE
+            ]
+            if any(keyword in range_text for keyword in self.google_keywords):
+                entity_type = "GOOGLE_PRIVATE_KEY"
+
+            description = self.build_regex_explanation(
+                self.name,
+                entity_type,
+                pattern.regex,
+                pattern.score,
+                None,
+                flags,
+            )
+            pattern_result = RecognizerResult(
+                entity_type=entity_type,
+                start=start,
+                end=end,
+                score=pattern.score,
+                analysis_explanation=description,
+                recognition_metadata={
+                    RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                    RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+                },
+            )
+
+            if self.invalidate_result(current_match):
+                pattern_result.score = EntityRecognizer.MIN_SCORE
+
+            if pattern_result.score > EntityRecognizer.MIN_SCORE:
+                results.append(pattern_result)
+
+            # Update analysis explanation score following invalidation
+            description.score = pattern_result.score
+
+        return EntityRecognizer.remove_duplicates(results)
 
     def invalidate_result(self, pattern_text: str) -> bool:
         """
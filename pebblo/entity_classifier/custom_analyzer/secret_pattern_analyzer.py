@@ -0,0 +1,264 @@
+import re
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import regex
+from presidio_analyzer import (
+    AnalysisExplanation,
+    EntityRecognizer,
+    Pattern,
+    RecognizerResult,
+)
+from presidio_analyzer.context_aware_enhancers import LemmaContextAwareEnhancer
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+from pebblo.entity_classifier.utils.config import ConfidenceScore
+from pebblo.entity_classifier.utils.regex_guard import finditer, get_regex_timeout
+from pebblo.log import get_logger
+
+logger = get_logger(__name__)
+
+# Global inline flags, e.g. (?i), only apply to a whole regex and are turned into scoped flags
+INLINE_FLAGS_REGEX = re.compile(r"^\(\?([aiLmsux]+)\)")
+# Backreferences change meaning and group names may clash once a regex is part of an alternation
+UNCOMBINABLE_REGEX = re.compile(r"\\[1-9]|\(\?P[<=]")
+MAX_SCANNERS = 64
+
+
+class SecretPatternRecognizer(EntityRecognizer):
+    """Recognize secrets of many types with one scan of the text.
+
+    The regexes of all patterns are compiled into a single alternation of named groups, the group
+    that matched gives the pattern and entity type of a match. Matches of the alternation do not overlap,
+    where several patterns match at one position only the first of them in pattern order is reported.
+    Patterns which can not be combined, i.e. using backreferences or named groups, and the patterns of
+    standalone entities are scanned on their own. Context words are per pattern, the score
+    of a match is raised when a context word of its pattern is near it.
+
+    :param patterns: List of (entity type, pattern) to be used by this recognizer
+    :param contexts: Context words to increase confidence in detection, by pattern name
+    :param standalone_entities: Entities whose patterns are scanned on their own, so that their matches are
+        never shadowed by an overlapping match of another pattern
+    :param supported_language: Language this recognizer supports
+    :param context_aware_enhancer: Enhancer raising scores of matches near context words
+    :param global_regex_flags: regex flags to be used in regex matching, as for Presidio pattern recognizers
+    """
+
+    def __init__(
+        self,
+        patterns: List[Tuple[str, Pattern]],
+        contexts: Optional[Dict[str, List[str]]] = None,
+        standalone_entities: Optional[List[str]] = None,
+        supported_language: str = "en",
+        context_aware_enhancer: Optional[LemmaContextAwareEnhancer] = None,
+        global_regex_flags: int = re.DOTALL | re.MULTILINE | re.IGNORECASE,
+    ):
+        self.global_regex_flags = global_regex_flags
+        self.entity_patterns = list(patterns)
+        self.patterns = [pattern for _, pattern in self.entity_patterns]
+        self.contexts = contexts or {}
+        self.standalone_entities = set(standalone_entities or [])
+        self.context_aware_enhancer = (
+            context_aware_enhancer
+            or LemmaContextAwareEnhancer(
+                context_similarity_factor=float(
+                    ConfidenceScore.EntityContextSimilarityFactor.value
+                ),
+                min_score_with_context_similarity=float(
+                    ConfidenceScore.EntityMinScoreWithContext.value
+                ),
+            )
+        )
+        # Combined regexes by entity subset, built on demand
+        self.scanners = OrderedDict()
+        self.scanners_lock = threading.Lock()
+        super().__init__(
+            supported_entities=list(
+                dict.fromkeys(entity for entity, _ in self.entity_patterns)
+            ),
+            name="SecretPatternRecognizer",
+            supported_language=supported_language,
+            # Context is applied per pattern by enhance_using_context()
+            context=[],
+        )
+
+    def load(self) -> None:
+        pass
+
+    @staticmethod
+    def _scoped_regex(pattern_regex: str) -> str:
+        flags = INLINE_FLAGS_REGEX.match(pattern_regex)
+        if flags is None:
+            return pattern_regex
+        return f"(?{flags.group(1)}:{pattern_regex[flags.end() :]})"
+
+    @staticmethod
+    def _has_top_level_alternation(pattern_regex: str) -> bool:
+        depth = 0
+        in_class = False
+        escaped = False
+        for char in pattern_regex:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "|" and depth == 0:
+                return True
+        return False
+
+    def _build_scanner(self, entities: Tuple[str, ...]) -> tuple:
+        """Return the combined regex of the patterns of these entities, and the patterns scanned on their own."""
+        groups = {}
+        anchored_branches = []
+        branches = []
+        standalone = []
+        for index, (entity, pattern) in enumerate(self.entity_patterns):
+            if entity not in entities:
+                continue
+            if entity in self.standalone_entities or UNCOMBINABLE_REGEX.search(
+                pattern.regex
+            ):
+                standalone.append(
+                    (
+                        entity,
+                        pattern,
+                        regex.compile(pattern.regex, self.global_regex_flags),
+                    )
+                )
+                continue
+            group = f"_pattern{index}"
+            groups[group] = (entity, pattern)
+            scoped_regex = self._scoped_regex(pattern.regex)
+            if scoped_regex.startswith(r"\b") and not self._has_top_level_alternation(
+                scoped_regex
+            ):
+                anchored_branches.append(f"(?P<{group}>{scoped_regex[2:]})")
+            else:
+                branches.append(f"(?P<{group}>{scoped_regex})")
+        # Patterns starting at a word boundary share it, so that they are only tried at word boundaries
+        if anchored_branches:
+            branches.insert(0, r"\b(?:" + "|".join(anchored_branches) + ")")
+        combined = (
+            regex.compile("|".join(branches), self.global_regex_flags)
+            if branches
+            else None
+        )
+        return combined, groups, standalone
+
+    def _get_scanner(self, entities: Tuple[str, ...]) -> tuple:
+        with self.scanners_lock:
+            scanner = self.scanners.get(entities)
+            if scanner is None:
+                scanner = self._build_scanner(entities)
+                self.scanners[entities] = scanner
+                while len(self.scanners) > MAX_SCANNERS:
+                    self.scanners.popitem(last=False)
+            else:
+                self.scanners.move_to_end(entities)
+            return scanner
+
+    def _result(
+        self, entity: str, pattern: Pattern, start: int, end: int
+    ) -> RecognizerResult:
+        return RecognizerResult(
+            entity_type=entity,
+            start=start,
+            end=end,
+            score=pattern.score,
+            analysis_explanation=AnalysisExplanation(
+                recognizer=self.name,
+                original_score=pattern.score,
+                pattern_name=pattern.name,
+                pattern=pattern.regex,
+            ),
+            recognition_metadata={
+                RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+            },
+        )
+
+    def analyze(
+        self,
+        text: str,
+        entities: List[str] = [],
+        nlp_artifacts: Optional[NlpArtifacts] = None,
+    ) -> List[RecognizerResult]:
+        """
+        Analyzes text to detect secrets with all patterns in one scan.
+
+        :param text: Text to be analyzed
+        :param entities: Entities to detect, all supported entities if empty
+        :param nlp_artifacts: Output values from the NLP engine
+        :return:
+        """
+        entities = tuple(
+            sorted(
+                set(entities or self.supported_entities) & set(self.supported_entities)
+            )
+        )
+        if not entities:
+            return []
+        combined, groups, standalone = self._get_scanner(entities)
+        timeout = get_regex_timeout()
+        results = []
+        if combined is not None:
+            for match in finditer(
+                combined, text, timeout, self.name, "combined secret patterns"
+            ):
+                start, end = match.span()
+                if start == end:
+                    continue
+                entity, pattern = groups[match.lastgroup]
+                results.append(self._result(entity, pattern, start, end))
+        for entity, pattern, compiled_regex in standalone:
+            for match in finditer(
+                compiled_regex, text, timeout, self.name, pattern.name
+            ):
+                start, end = match.span()
+                if start != end:
+                    results.append(self._result(entity, pattern, start, end))
+        # Matches of the combined regex do not overlap each other, but may overlap those of the standalone
+        # patterns, the analyzer engine removes duplicates of all results
+        return results
+
+    def enhance_using_context(
+        self,
+        text: str,
+        raw_recognizer_results: List[RecognizerResult],
+        other_raw_recognizer_results: List[RecognizerResult],
+        nlp_artifacts: NlpArtifacts,
+        context: Optional[List[str]] = None,
+    ) -> List[RecognizerResult]:
+        """
+        Raise the score of results near context words of their pattern.
+        """
+        results_by_pattern = {}
+        for result in raw_recognizer_results:
+            results_by_pattern.setdefault(
+                result.analysis_explanation.pattern_name, []
+            ).append(result)
+        results = []
+        for pattern_name, pattern_results in results_by_pattern.items():
+            if not self.contexts.get(pattern_name):
+                results.extend(pattern_results)
+                continue
+            # Stand-in recognizer holding the context words of this pattern
+            recognizer = SimpleNamespace(
+                id=self.id, name=self.name, context=self.contexts[pattern_name]
+            )
+            results.extend(
+                self.context_aware_enhancer.enhance_using_context(
+                    text, pattern_results, nlp_artifacts, [recognizer], context
+                )
+            )
+        return results
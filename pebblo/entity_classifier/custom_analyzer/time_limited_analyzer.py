@@ -0,0 +1,86 @@
+from typing import List, Optional
+
+import regex
+from presidio_analyzer import EntityRecognizer, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+from pebblo.entity_classifier.utils.regex_guard import finditer, get_regex_timeout
+
+
+class TimeLimitedPatternMixin:
+    """Run the patterns of a PatternRecognizer with a time budget per pattern and text.
+
+    Matches are evaluated as by Presidio's PatternRecognizer, with validation and invalidation of the
+    matched text, but a pattern scan exceeding the classifier regexTimeout is abandoned with the matches
+    found so far.
+    """
+
+    def analyze(
+        self,
+        text: str,
+        entities: List[str],
+        nlp_artifacts: Optional[NlpArtifacts] = None,
+        regex_flags: Optional[int] = None,
+    ) -> List[RecognizerResult]:
+        results = []
+        if self.patterns:
+            results.extend(self._analyze_patterns_with_timeout(text, regex_flags))
+        return results
+
+    def _analyze_patterns_with_timeout(
+        self, text: str, flags: Optional[int] = None
+    ) -> List[RecognizerResult]:
+        flags = flags if flags else self.global_regex_flags
+        timeout = get_regex_timeout()
+        results = []
+        for pattern in self.patterns:
+            # Compiled patterns are cached by the regex module
+            compiled_regex = regex.compile(pattern.regex, flags)
+            for match in finditer(
+                compiled_regex, text, timeout, self.name, pattern.name
+            ):
+                start, end = match.span()
+                current_match = text[start:end]
+
+                # Skip empty results
+                if current_match == "":
+                    continue
+
+                validation_result = self.validate_result(current_match)
+                description = self.build_regex_explanation(
+                    self.name,
+                    pattern.name,
+                    pattern.regex,
+                    pattern.score,
+                    validation_result,
+                    flags,
+                )
+                pattern_result = RecognizerResult(
+                    entity_type=self.supported_entities[0],
+                    start=start,
+                    end=end,
+                    score=pattern.score,
+                    analysis_explanation=description,
+                    recognition_metadata={
+                        RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                        RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+                    },
+                )
+
+                if validation_result is not None:
+                    if validation_result:
+                        pattern_result.score = EntityRecognizer.MAX_SCORE
+                    else:
+                        pattern_result.score = EntityRecognizer.MIN_SCORE
+
+                invalidation_result = self.invalidate_result(current_match)
+                if invalidation_result is not None and invalidation_result:
+                    pattern_result.score = EntityRecognizer.MIN_SCORE
+
+                if pattern_result.score > EntityRecognizer.MIN_SCORE:
+                    results.append(pattern_result)
+
+                # Update analysis explanation score following validation or invalidation
+                description.score = pattern_result.score
+
+        return EntityRecognizer.remove_duplicates(results)
@@ -1,22 +1,55 @@
-from presidio_analyzer import AnalyzerEngine
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
 from presidio_analyzer.context_aware_enhancers import LemmaContextAwareEnhancer
-from presidio_anonymizer import AnonymizerEngine
+from presidio_analyzer.predefined_recognizers import SpacyRecognizer
 
 from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.classification_cache import (
+    get_cache_key,
+    get_classification_cache,
+    get_fingerprint,
+    track_degradation,
+)
+from pebblo.app.libs.model_bundle import (
+    SPACY_LANG_CODE,
+    get_nlp_profile,
+    get_offline_bundle,
+    load_spacy_nlp_engine,
+)
+from pebblo.app.libs.recognizer_timings import instrument_analyzer
+from pebblo.app.libs.text_windows import WHITESPACE, chunked, split_windows
+from pebblo.app.utils.version import get_pebblo_version
 from pebblo.entity_classifier.custom_analyzer.cerdit_card_analyzer import (
     ExtendedCreditCardRecognizer,
 )
+from pebblo.entity_classifier.custom_analyzer.high_entropy_analyzer import (
+    HighEntropySecretRecognizer,
+)
 from pebblo.entity_classifier.custom_analyzer.llm_analyzer import LLMRecognizer
 from pebblo.entity_classifier.custom_analyzer.private_key_analyzer import (
     PrivateKeyRecognizer,
 )
+from pebblo.entity_classifier.utils.anonymizer import SpanAnonymizer
+from pebblo.entity_classifier.utils.checksum_validation import (
+    filter_checksum_failures,
+)
 from pebblo.entity_classifier.utils.config import (
     ConfidenceScore,
     Entities,
     SecretEntities,
     entity_group_conf_mapping,
+    secrets_mode_entities,
 )
 from pebblo.entity_classifier.utils.judge_entity import judge_results
+from pebblo.entity_classifier.utils.regex_guard import (
+    audit_recognizers,
+    get_regex_timeout,
+)
+from pebblo.entity_classifier.utils.regex_nlp_engine import RegexNlpEngine
 from pebblo.entity_classifier.utils.result_validation import (
     is_not_part_of_decimal,
     validate_extracted_data,
@@ -32,30 +65,68 @@ logger = get_logger(__name__)
 
 config_details = var_server_config_dict.get()
 
+DEFAULT_NLP_BATCH_SIZE = 32
+MAX_PRUNED_ANALYZERS = 64
+DEFAULT_WINDOW_SIZE = 20000
+DEFAULT_WINDOW_OVERLAP = 4096
+# Number of windows of a large text run through the NLP pipeline at once, bounds the memory in use
+WINDOW_BATCH_SIZE = 4
+# Document the per-document cost of the NLP pipeline is measured on at warm-up
+NLP_COST_SAMPLE = (
+    "Jonathan Miller from Acme Corp called on March 3rd about the invoice sent to 456 Oak Avenue, "
+    "Springfield. His colleague Maria Garcia will follow up with the bank in New York next week."
+)
+NLP_COST_SAMPLE_RUNS = 16
+# Layout of cached results, (entities, total_count, entity_details, replaced spans) without the text
+CACHE_ENTRY_FORMAT = 2
+
 
 class EntityClassifier:
     def __init__(self):
-        self.analyzer = AnalyzerEngine()
-        self.anonymizer = AnonymizerEngine()
+        # Analyzer engine is built once by custom_analyze() with the custom recognizer registry
+        self.analyzer = None
+        # Analyzer engines restricted to an entity subset, built on demand by _get_analyzer()
+        self.pruned_analyzers = OrderedDict()
+        self.pruned_analyzers_lock = threading.Lock()
+        self.anonymizer = SpanAnonymizer()
         self.entities = list(Entities.__members__.keys())
         self.entities.extend(list(SecretEntities.__members__.keys()))
         self.text_gen_obj = TextGeneration()
+        # Texts longer than window_size characters are analyzed in overlapping windows
+        classifier_config = config_details.get("classifier", {})
+        self.window_size = classifier_config.get("windowSize", DEFAULT_WINDOW_SIZE)
+        self.window_overlap = classifier_config.get(
+            "windowOverlap", DEFAULT_WINDOW_OVERLAP
+        )
+        self.secret_patterns = classifier_config.get("secretPatterns") or []
+        self.recognizer_timings = classifier_config.get("recognizerTimings", False)
         self.custom_analyze()
+        self.cache = get_classification_cache()
+        self.cache_fingerprint = self._get_fingerprint()
+        if self.cache is not None:
+            self.cache.register_fingerprint("entity", self.cache_fingerprint)
+
+    @staticmethod
+    def _get_context_aware_enhancer() -> LemmaContextAwareEnhancer:
+        return LemmaContextAwareEnhancer(
+            context_similarity_factor=float(
+                ConfidenceScore.EntityContextSimilarityFactor.value
+            ),
+            min_score_with_context_similarity=float(
+                ConfidenceScore.EntityMinScoreWithContext.value
+            ),
+        )
 
     def custom_analyze(self):
         # Adding custom analyzer
-        custom_registry = add_custom_regex_analyzer_registry()
+        custom_registry = add_custom_regex_analyzer_registry(self.secret_patterns)
         custom_registry.load_predefined_recognizers()
+        # spaCy pipeline of the configured NLP profile, in offline mode it comes from the model bundle
+        nlp_engine = load_spacy_nlp_engine(get_offline_bundle())
         self.analyzer = AnalyzerEngine(
             registry=custom_registry,
-            context_aware_enhancer=LemmaContextAwareEnhancer(
-                context_similarity_factor=float(
-                    ConfidenceScore.EntityContextSimilarityFactor.value
-                ),
-                min_score_with_context_similarity=float(
-                    ConfidenceScore.EntityMinScoreWithContext.value
-                ),
-            ),
+            nlp_engine=nlp_engine,
+            context_aware_enhancer=self._get_context_aware_enhancer(),
         )
         pk_recognizer = PrivateKeyRecognizer()
         # Add the private key recognizer to the Presidio Analyzer
@@ -64,9 +135,104 @@ class EntityClassifier:
         cc_recognizer = ExtendedCreditCardRecognizer()
         # Add the credit card recognizer to the Presidio Analyzer
         self.analyzer.registry.add_recognizer(cc_recognizer)
+
+        high_entropy_recognizer = HighEntropySecretRecognizer()
+        # Add the high entropy token recognizer to the Presidio Analyzer
+        self.analyzer.registry.add_recognizer(high_entropy_recognizer)
+        self.llm_recognizer = None
         if config_details.get("classifier", {}).get("use_llm", False):
-            llm_recognizer = LLMRecognizer()
-            self.analyzer.registry.add_recognizer(llm_recognizer)
+            self.llm_recognizer = LLMRecognizer()
+            self.analyzer.registry.add_recognizer(self.llm_recognizer)
+        # Flag patterns prone to catastrophic backtracking, they still run with a time budget
+        audit_recognizers(self.analyzer.registry.recognizers)
+        if self.recognizer_timings:
+            instrument_analyzer(self.analyzer)
+
+    def report_nlp_profile(self) -> None:
+        """
+        Log the NLP profile in use with the cost of its pipeline per document, measured on a sample document.
+        Called once per process by the classifier registry warm-up, not per replica.
+        """
+        nlp_engine = self.analyzer.nlp_engine
+        start_time = time.perf_counter()
+        for _ in nlp_engine.process_batch(
+            [NLP_COST_SAMPLE] * NLP_COST_SAMPLE_RUNS, language=SPACY_LANG_CODE
+        ):
+            pass
+        document_cost = (time.perf_counter() - start_time) / NLP_COST_SAMPLE_RUNS
+        nlp = (getattr(nlp_engine, "nlp", None) or {}).get(SPACY_LANG_CODE)
+        pipeline = (
+            f"{nlp.meta.get('lang')}_{nlp.meta.get('name')} {nlp.meta.get('version')} "
+            f"with components {nlp.pipe_names}"
+            if nlp is not None
+            else type(nlp_engine).__name__
+        )
+        logger.info(
+            f"NLP profile '{get_nlp_profile()}': {pipeline}, "
+            f"{document_cost * 1000:.1f} ms per document"
+        )
+
+    @staticmethod
+    def _needs_nlp(recognizer) -> bool:
+        # NER based recognizers read the entities found by the NLP pipeline, the others only match patterns
+        return isinstance(recognizer, SpacyRecognizer)
+
+    def _build_pruned_analyzer(self, entities: List[str]) -> Optional[AnalyzerEngine]:
+        recognizers = [
+            recognizer
+            for recognizer in self.analyzer.registry.recognizers
+            if set(recognizer.supported_entities) & set(entities)
+        ]
+        if not recognizers:
+            return None
+        # Without NER based recognizer, tokens for context words come from a regex instead of spaCy
+        if any(self._needs_nlp(recognizer) for recognizer in recognizers):
+            nlp_engine = self.analyzer.nlp_engine
+        else:
+            nlp_engine = RegexNlpEngine()
+        logger.debug(
+            f"Built analyzer with {len(recognizers)} recognizers for entities {entities}, "
+            f"NLP engine: {type(nlp_engine).__name__}"
+        )
+        analyzer = AnalyzerEngine(
+            registry=RecognizerRegistry(recognizers=recognizers),
+            nlp_engine=nlp_engine,
+            supported_languages=self.analyzer.supported_languages,
+            context_aware_enhancer=self.analyzer.context_aware_enhancer,
+        )
+        if self.recognizer_timings:
+            instrument_analyzer(analyzer)
+        return analyzer
+
+    def _get_analyzer(
+        self, entity_types: Optional[Tuple[str, ...]] = None, secrets_only: bool = False
+    ) -> Tuple[Optional[AnalyzerEngine], List[str]]:
+        """
+        Return the analyzer engine and the entities to detect for an entity allow-list.
+
+        Without allow-list the full analyzer detects all entities. Otherwise only the recognizers of the
+        requested entities are kept, and the pruned analyzer is cached per distinct entity subset.
+        The analyzer is None if no recognizer detects the requested entities.
+        """
+        if entity_types is None and not secrets_only:
+            return self.analyzer, self.entities
+        entities = [
+            entity
+            for entity in self.entities
+            if (entity_types is None or entity in entity_types)
+            and (not secrets_only or entity in secrets_mode_entities)
+        ]
+        key = frozenset(entities)
+        with self.pruned_analyzers_lock:
+            if key in self.pruned_analyzers:
+                self.pruned_analyzers.move_to_end(key)
+                return self.pruned_analyzers[key], entities
+        analyzer = self._build_pruned_analyzer(entities) if entities else None
+        with self.pruned_analyzers_lock:
+            self.pruned_analyzers[key] = analyzer
+            while len(self.pruned_analyzers) > MAX_PRUNED_ANALYZERS:
+                self.pruned_analyzers.popitem(last=False)
+        return analyzer, entities
 
     # Function to check if two entities overlap based on their start and end positions
     def entities_overlap(self, entity1, entity2):
@@ -77,7 +243,11 @@ class EntityClassifier:
         )
 
     def analyze_response(
-        self, input_text: str, anonymize_all_entities: bool = True
+        self,
+        input_text: str,
+        anonymize_all_entities: bool = True,
+        secrets_only: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
     ) -> tuple:
         """
         Analyze the given input text to detect and classify entities based on predefined criteria.
@@ -86,6 +256,8 @@ class EntityClassifier:
             input_text (str): The text to be analyzed for detecting entities.
             anonymize_all_entities (bool): Flag to determine if all detected entities should be anonymized.
                                         (Currently not used in the function logic.)
+            secrets_only (bool): Flag to detect secrets with the pattern recognizers only, without spaCy.
+            entity_types (Optional[Tuple[str, ...]]): Entity types to detect, all entities if None.
 
         Returns:
             tuple: A tuple containing two lists:
@@ -93,9 +265,174 @@ class EntityClassifier:
                 2. A list of tuples where each tuple contains a group of overlapping entities.
         """
         # Analyze the text to detect entities using the Presidio analyzer
-        analyzer_results = self.analyzer.analyze(
-            text=input_text, entities=self.entities, language="en"
+        analyzer, entities = self._get_analyzer(entity_types, secrets_only)
+        if analyzer is None:
+            return []
+        if len(input_text) > self.window_size:
+            return self._analyze_windows(analyzer, entities, input_text)
+        analyzer_results = analyzer.analyze(
+            text=input_text, entities=entities, language="en"
+        )
+        return self._filter_analyzer_results(input_text, analyzer_results)
+
+    def analyze_batch(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        secrets_only: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
+    ) -> List[list]:
+        """
+        Same as analyze_response() for many texts. The texts are run through the spaCy pipeline
+        in batches of `batch_size` with nlp.pipe, instead of one by one. Texts longer than the
+        window size are analyzed in windows, see _analyze_windows().
+
+        Args:
+            texts (List[str]): The texts to be analyzed for detecting entities.
+            batch_size (int): Number of texts processed by the NLP engine at once.
+            secrets_only (bool): Flag to detect secrets with the pattern recognizers only, without spaCy.
+            entity_types (Optional[Tuple[str, ...]]): Entity types to detect, all entities if None.
+
+        Returns:
+            List[list]: Detected entities of every text, in input order.
+        """
+        results, _ = self._analyze_batch(texts, batch_size, secrets_only, entity_types)
+        return results
+
+    def _analyze_batch(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        secrets_only: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[List[list], List[bool]]:
+        """
+        Same as analyze_batch(), also returns whether the analysis of every text is degraded, e.g. used
+        fallbacks after an LLM call or a regex scan timed out.
+        """
+        analyzer, entities = self._get_analyzer(entity_types, secrets_only)
+        if analyzer is None:
+            return [[] for _ in texts], [False] * len(texts)
+        results = [None] * len(texts)
+        degraded = [False] * len(texts)
+        indexes = [
+            index for index, text in enumerate(texts) if len(text) <= self.window_size
+        ]
+        batch_results = self._analyze_texts(
+            analyzer, entities, [texts[index] for index in indexes], batch_size
+        )
+        for index in indexes:
+            # Every text is analyzed when its results are pulled from the generator
+            with track_degradation() as degradations:
+                results[index] = next(batch_results)
+            degraded[index] = bool(degradations)
+        for index, text in enumerate(texts):
+            if results[index] is None:
+                with track_degradation() as degradations:
+                    results[index] = self._analyze_windows(analyzer, entities, text)
+                degraded[index] = bool(degradations)
+        return results, degraded
+
+    def _analyze_texts(
+        self,
+        analyzer: AnalyzerEngine,
+        entities: List[str],
+        texts: List[str],
+        batch_size: int = None,
+    ) -> Iterator[list]:
+        """
+        Yield the filtered analyzer results of every text, the NLP engine processes `batch_size` texts at once.
+        """
+        for text, analyzer_results in zip(
+            texts, self._run_analyzer(analyzer, entities, texts, batch_size)
+        ):
+            yield self._filter_analyzer_results(text, analyzer_results)
+
+    def _run_analyzer(
+        self,
+        analyzer: AnalyzerEngine,
+        entities: List[str],
+        texts: List[str],
+        batch_size: int = None,
+    ) -> Iterator[list]:
+        """
+        Yield the raw analyzer results of every text, the NLP engine processes `batch_size` texts at once.
+        """
+        batch_size = max(1, int(batch_size or DEFAULT_NLP_BATCH_SIZE))
+        llm_recognizer = (
+            self.llm_recognizer
+            if self.llm_recognizer in analyzer.registry.recognizers
+            else None
         )
+        for batch in chunked(texts, batch_size):
+            if llm_recognizer is not None:
+                # Short texts of the batch share LLM calls, which run while spaCy processes the batch
+                llm_recognizer.prefetch(batch)
+            # Same steps as Presidio's BatchAnalyzerEngine, with a bounded number of docs in memory
+            nlp_artifacts_batch = analyzer.nlp_engine.process_batch(
+                texts=batch, language="en"
+            )
+            for text, (_, nlp_artifacts) in zip(batch, nlp_artifacts_batch):
+                yield analyzer.analyze(
+                    text=text,
+                    entities=entities,
+                    language="en",
+                    nlp_artifacts=nlp_artifacts,
+                )
+
+    def _analyze_windows(
+        self, analyzer: AnalyzerEngine, entities: List[str], input_text: str
+    ) -> list:
+        """
+        Analyze a text longer than the window size in overlapping windows, so that the memory used by the
+        NLP pipeline does not grow with the size of the text.
+
+        Windows are cut at whitespace where possible. Where a window had to be cut inside a word, entities
+        touching that edge may be truncated, they are dropped and found whole in the neighbouring window as
+        long as they are shorter than the window overlap. Entity locations are mapped
+        back to the input text, entities found in several windows are kept once, and the results of all
+        windows are filtered together, so that overlapping entities of neighbouring windows are resolved
+        against each other.
+        """
+        windows = split_windows(input_text, self.window_size, self.window_overlap)
+        merged_results = {}
+        for batch in chunked(windows, WINDOW_BATCH_SIZE):
+            window_texts = [window_text for _, window_text in batch]
+            batch_results = self._run_analyzer(
+                analyzer, entities, window_texts, WINDOW_BATCH_SIZE
+            )
+            for (offset, window_text), window_results in zip(batch, batch_results):
+                window_end = offset + len(window_text)
+                # An edge is only forced when the window could not be cut at whitespace
+                start_forced = offset > 0 and input_text[offset - 1] not in WHITESPACE
+                end_forced = (
+                    window_end < len(input_text)
+                    and input_text[window_end] not in WHITESPACE
+                )
+                for result in window_results:
+                    if (start_forced and result.start == 0) or (
+                        end_forced and result.end == len(window_text)
+                    ):
+                        continue
+                    result.start += offset
+                    result.end += offset
+                    key = (result.entity_type, result.start, result.end)
+                    if (
+                        key not in merged_results
+                        or merged_results[key].score < result.score
+                    ):
+                        merged_results[key] = result
+        logger.debug(
+            f"Analyzed text of {len(input_text)} characters in windows of {self.window_size} characters"
+        )
+        return self._filter_analyzer_results(input_text, list(merged_results.values()))
+
+    def _filter_analyzer_results(self, input_text: str, analyzer_results: list) -> list:
+        """
+        Keep the analyzer results meeting the confidence and validation criteria, and resolve overlapping entities.
+        """
+        # Entities failing the checksum of their type are dropped before they can overlap others
+        analyzer_results = filter_checksum_failures(input_text, analyzer_results)
 
         # Initialize the list to hold the final classified entities
         non_overlapping_results = []
@@ -176,18 +513,8 @@ class EntityClassifier:
         # Return both non-overlapping entities and overlapping groups
         return list(set(non_overlapping_results))
 
-    def anonymize_response(
-        self, analyzer_results: list, input_text: str
-    ) -> (list, str):
-        # Returns anonymized output
-        anonymized_text = self.anonymizer.anonymize(
-            text=input_text, analyzer_results=analyzer_results
-        )
-
-        return anonymized_text.items, anonymized_text.text
-
     @staticmethod
-    def _sort_analyzed_data(data: list) -> list:
+    def _sort_analyzed_data(data: list, locations: list = None) -> list:
         """
         This function sort analyzed response data based on its start position
         """
@@ -198,53 +525,24 @@ class EntityClassifier:
                 "start": entry.start,
                 "end": entry.end,
                 "score": entry.score,
+                "location": locations[index] if locations else (entry.start, entry.end),
             }
-            for entry in data
+            for index, entry in enumerate(data)
         ]
         analyzed_data.sort(key=lambda x: x["start"])
         return analyzed_data
 
-    @staticmethod
-    def _sort_anonymized_data(data: list) -> list:
-        """
-        This function sort anonymized response data based on its start position
-        """
-        # Convert input data into dictionary structure
-        anonymized_data = [
-            {"entity_type": entry.entity_type, "start": entry.start, "end": entry.end}
-            for entry in data
-        ]
-
-        # Sort data based on start
-        anonymized_data.sort(key=lambda x: x["start"])
-        return anonymized_data
-
-    @staticmethod
-    def update_anonymized_location(
-        start: int, end: int, location_count: int
-    ) -> (str, int):
-        """
-        As we are replacing < with &lt; and > with &gt; respectively in the anonymized text, to make we need to
-        adjust the location to match the updated text. Since the length difference between &lt; and <, as well as
-        between &gt; and > is 3 characters each, we add a total of 6 i.e., (3 + 3) to the end_location to account for
-        the increased length after the replacements.
-        """
-        location = f"{start + location_count}_{end + location_count + 6}"
-        location_count += 6
-        return location, location_count
-
     def get_analyzed_entities_response(
-        self, data: list, anonymized_response: list = None
+        self, data: list, anonymized_locations: list = None
     ) -> list:
-        # Returns entities with its location i.e. start to end and confidence score
-
-        analyzed_data = self._sort_analyzed_data(data)
-        if anonymized_response:
-            anonymized_response = self._sort_anonymized_data(anonymized_response)
+        """
+        Returns entities with its location i.e. start to end and confidence score. The location of an entity is
+        taken from anonymized_locations, in the order of data, when the text is anonymized.
+        """
+        analyzed_data = self._sort_analyzed_data(data, anonymized_locations)
 
         response = []
-        location_count = 0
-        for index, value in enumerate(analyzed_data):
+        for value in analyzed_data:
             try:
                 mapped_entity = None
                 if value["entity_type"] in Entities.__members__:
@@ -252,19 +550,11 @@ class EntityClassifier:
                 elif value["entity_type"] in SecretEntities.__members__:
                     mapped_entity = SecretEntities[value["entity_type"]].value
 
-                location = f"{value['start']}_{value['end']}"
-                if anonymized_response:
-                    anonymized_data = anonymized_response[index]
-                    if anonymized_data["entity_type"] == value["entity_type"]:
-                        location, location_count = self.update_anonymized_location(
-                            anonymized_data["start"],
-                            anonymized_data["end"],
-                            location_count,
-                        )
+                start, end = value["location"]
                 response.append(
                     {
                         "entity_type": value["entity_type"],
-                        "location": location,
+                        "location": f"{start}_{end}",
                         "confidence_score": value["score"],
                         "entity_group": entity_group_conf_mapping[mapped_entity][1],
                     }
@@ -273,14 +563,103 @@ class EntityClassifier:
                 pass
         return response
 
+    def _get_fingerprint(self) -> str:
+        """
+        Fingerprint of everything the classification result depends on, i.e. models, recognizers and thresholds.
+        """
+        recognizers = [
+            {
+                "class": type(recognizer).__name__,
+                "name": recognizer.name,
+                "entities": recognizer.supported_entities,
+                "language": recognizer.supported_language,
+                "context": getattr(recognizer, "context", None),
+                "contexts": getattr(recognizer, "contexts", None),
+                "patterns": [
+                    (pattern.name, pattern.regex, pattern.score)
+                    for pattern in getattr(recognizer, "patterns", None) or []
+                ],
+                "deny_list": getattr(recognizer, "deny_list", None),
+            }
+            for recognizer in self.analyzer.registry.recognizers
+        ]
+        nlp_models = {
+            language: (nlp.meta.get("name"), nlp.meta.get("version"))
+            for language, nlp in (
+                getattr(self.analyzer.nlp_engine, "nlp", None) or {}
+            ).items()
+        }
+        return get_fingerprint(
+            get_pebblo_version(),
+            nlp_models,
+            recognizers,
+            self.entities,
+            entity_group_conf_mapping,
+            {score.name: score.value for score in ConfidenceScore},
+            config_details.get("classifier", {}).get("use_llm", False),
+            # Windows and regex time budget change the entities found in large or pathological texts
+            (self.window_size, self.window_overlap, get_regex_timeout()),
+            CACHE_ENTRY_FORMAT,
+        )
+
+    def _get_cache_key(
+        self,
+        input_text: str,
+        anonymize_snippets: bool,
+        secrets_only: bool,
+        entity_types: Optional[Tuple[str, ...]],
+    ):
+        if self.cache is None or not isinstance(input_text, str):
+            return None
+        return get_cache_key(
+            self.cache_fingerprint,
+            input_text,
+            anonymize_snippets,
+            secrets_only,
+            sorted(entity_types) if entity_types is not None else None,
+        )
+
+    def _get_cached_result(self, cache_key, input_text: str):
+        if cache_key is None:
+            return None
+        cached_result = self.cache.get("entity", cache_key)
+        if cached_result is None:
+            return None
+        # The text is not cached, the anonymized text is rebuilt from the input and the replaced spans
+        entities, total_count, entity_details, replacements = cached_result
+        if replacements is not None:
+            input_text, _ = self.anonymizer.replace(input_text, replacements)
+        return entities, total_count, input_text, entity_details
+
+    def _cache_result(
+        self, cache_key, result: tuple, replacements, degraded: bool = False
+    ) -> None:
+        # Failed classifications return only three values and are not cached, nor degraded ones
+        if cache_key is not None and len(result) == 4 and not degraded:
+            entities, total_count, _, entity_details = result
+            self.cache.set(
+                "entity",
+                self.cache_fingerprint,
+                cache_key,
+                (entities, total_count, entity_details, replacements),
+            )
+
     def presidio_entity_classifier_and_anonymizer(
-        self, input_text: str, anonymize_snippets: bool = False
+        self,
+        input_text: str,
+        anonymize_snippets: bool = False,
+        use_cache: bool = True,
+        secrets_only: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
     ) -> (dict, int, str, dict):
         """
         Perform classification on the input data and return a dictionary with the count of each entity group.
         And also returns plain input text as anonymized text output
         :param input_text: Input string / document snippet
         :param anonymize_snippets: Flag whether to anonymize snippets in report.
+        :param use_cache: Flag whether to serve and store the result in the classification cache.
+        :param secrets_only: Flag to detect secrets with the pattern recognizers only, without spaCy.
+        :param entity_types: Entity types to detect, all entities if None.
         :return: entities: containing the entity group Name as key and its count as value.
                  total_count: Total count of entity groupsInput text in anonymized form.
                  anonymized_text: Input text in anonymized form.
@@ -298,19 +677,146 @@ class EntityClassifier:
         And AWS Access Key is: &lt;AWS_ACCESS_KEY&gt;."
         My phone number is +91 8087611243
         """
-        entities = {}
-        total_count = 0
+        cache_key = (
+            self._get_cache_key(
+                input_text, anonymize_snippets, secrets_only, entity_types
+            )
+            if use_cache
+            else None
+        )
+        cached_result = self._get_cached_result(cache_key, input_text)
+        if cached_result is not None:
+            return cached_result
+        result, replacements, degraded = self._classify_text(
+            input_text, anonymize_snippets, secrets_only, entity_types
+        )
+        self._cache_result(cache_key, result, replacements, degraded=degraded)
+        return result
+
+    def _classify_text(
+        self,
+        input_text: str,
+        anonymize_snippets: bool,
+        secrets_only: bool,
+        entity_types: Optional[Tuple[str, ...]],
+    ) -> (tuple, Optional[list], bool):
+        """
+        Classify one text without the cache. Returns the classification result, the spans replaced in
+        the anonymized text and whether the result is degraded.
+        """
         try:
             logger.debug("Presidio Entity Classifier and Anonymizer Started.")
+            with track_degradation() as degradations:
+                analyzer_results = self.analyze_response(
+                    input_text, secrets_only=secrets_only, entity_types=entity_types
+                )
+        except Exception as e:
+            logger.error(
+                f"Presidio Entity Classifier and Anonymizer Failed, Exception: {e}"
+            )
+            return ({}, 0, input_text), None, False
+        result, replacements = self._classify_analyzer_results(
+            input_text, analyzer_results, anonymize_snippets
+        )
+        return result, replacements, bool(degradations)
+
+    def classify_batch(
+        self,
+        texts: List[str],
+        anonymize_snippets: bool = False,
+        batch_size: int = None,
+        use_cache: bool = True,
+        secrets_only: bool = False,
+        entity_types: Optional[Tuple[str, ...]] = None,
+    ) -> List[tuple]:
+        """
+        Batch version of presidio_entity_classifier_and_anonymizer(), returns its result for every text in
+        input order. NLP artifacts are computed for `batch_size` texts at once with spaCy's nlp.pipe.
+        :param texts: Input strings / document snippets
+        :param anonymize_snippets: Flag whether to anonymize snippets in report.
+        :param batch_size: Number of texts processed by the NLP engine at once.
+        :param use_cache: Flag whether to serve and store results in the classification cache.
+        :param secrets_only: Flag to detect secrets with the pattern recognizers only, without spaCy.
+        :param entity_types: Entity types to detect, all entities if None.
+        :return: List of (entities, total_count, anonymized_text, entity_details) tuples.
+        """
+        cache_keys = [
+            self._get_cache_key(
+                input_text, anonymize_snippets, secrets_only, entity_types
+            )
+            if use_cache
+            else None
+            for input_text in texts
+        ]
+        results = [
+            self._get_cached_result(cache_key, input_text)
+            for cache_key, input_text in zip(cache_keys, texts)
+        ]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results
 
-            analyzer_results = self.analyze_response(input_text)
+        pending_texts = [texts[index] for index in pending]
+        try:
+            logger.debug(
+                f"Presidio Entity Classifier and Anonymizer Started for {len(pending_texts)} texts."
+            )
+            analyzer_results_batch, degraded = self._analyze_batch(
+                pending_texts, batch_size, secrets_only, entity_types
+            )
+            classified = [
+                self._classify_analyzer_results(
+                    input_text, analyzer_results, anonymize_snippets
+                )
+                for input_text, analyzer_results in zip(
+                    pending_texts, analyzer_results_batch
+                )
+            ]
+            pending_results = [result for result, _ in classified]
+            pending_replacements = [replacements for _, replacements in classified]
+        except Exception as e:
+            # Classify the texts one by one, so that a failing text only loses its own result
+            logger.warning(
+                f"Batch entity classification failed, classifying texts one by one. Exception: {e}"
+            )
+            pending_results = []
+            pending_replacements = []
+            degraded = []
+            for input_text in pending_texts:
+                result, replacements, result_degraded = self._classify_text(
+                    input_text, anonymize_snippets, secrets_only, entity_types
+                )
+                pending_results.append(result)
+                pending_replacements.append(replacements)
+                degraded.append(result_degraded)
+        for index, result, replacements, result_degraded in zip(
+            pending, pending_results, pending_replacements, degraded
+        ):
+            results[index] = result
+            self._cache_result(
+                cache_keys[index], result, replacements, degraded=result_degraded
+            )
+        return results
+
+    def _classify_analyzer_results(
+        self, input_text: str, analyzer_results: list, anonymize_snippets: bool
+    ) -> (tuple, Optional[list]):
+        """
+        Returns the classification result of the analyzer results, and the [start, end, entity_type]
+        spans replaced in the anonymized text, None when the text is not anonymized.
+        """
+        entities = {}
+        total_count = 0
+        replacements = None
+        try:
             if anonymize_snippets:  # If Document snippet needs to be anonymized
-                anonymized_response, anonymized_text = self.anonymize_response(
-                    analyzer_results, input_text
+                spans = self.anonymizer.merge_spans(input_text, analyzer_results)
+                input_text, anonymized_locations = self.anonymizer.anonymize(
+                    input_text, analyzer_results, spans
                 )
-                input_text = anonymized_text.replace("<", "&lt;").replace(">", "&gt;")
+                replacements = [span[:3] for span in spans]
                 entities_response = self.get_analyzed_entities_response(
-                    analyzer_results, anonymized_response
+                    analyzer_results, anonymized_locations
                 )
             else:
                 entities_response = self.get_analyzed_entities_response(
@@ -322,9 +828,9 @@ class EntityClassifier:
             logger.debug("Presidio Entity Classifier and Anonymizer Finished")
             logger.debug(f"Entities: {entities}")
             logger.debug(f"Entity Total count: {total_count}")
-            return entities, total_count, input_text, entity_details
+            return (entities, total_count, input_text, entity_details), replacements
         except Exception as e:
             logger.error(
                 f"Presidio Entity Classifier and Anonymizer Failed, Exception: {e}"
             )
-            return entities, total_count, input_text
+            return (entities, total_count, input_text), None
@@ -0,0 +1,94 @@
+"""
+Single pass anonymizer of detected entity spans.
+
+Entities are replaced with `&lt;ENTITY_TYPE&gt;` placeholders and the `<` and `>` characters of
+the text are escaped, so that snippets can be rendered in HTML reports. Locations of the
+placeholders in the escaped text are computed while the text is built, in one walk over the
+spans sorted by position.
+"""
+
+from typing import List, Optional, Tuple
+
+PLACEHOLDER_FORMAT = "&lt;{}&gt;"
+ESCAPE_TABLE = str.maketrans({"<": "&lt;", ">": "&gt;"})
+
+
+class SpanAnonymizer:
+    """
+    Replace entity spans with placeholders, like Presidio's AnonymizerEngine with its default replace operator.
+
+    Overlapping spans and spans of the same entity type separated by spaces only are merged and
+    replaced by one placeholder, named after the type of the first and longest span of the merge.
+    """
+
+    @staticmethod
+    def merge_spans(text: str, analyzer_results: list) -> List[list]:
+        """Return [start, end, entity_type, result indexes] of the spans to replace, sorted by position."""
+        order = sorted(
+            range(len(analyzer_results)),
+            key=lambda index: (
+                analyzer_results[index].start,
+                -analyzer_results[index].end,
+                -analyzer_results[index].score,
+            ),
+        )
+        spans: List[list] = []
+        for index in order:
+            result = analyzer_results[index]
+            if spans:
+                span = spans[-1]
+                overlaps = result.start < span[1]
+                separated_by_spaces = (
+                    result.entity_type == span[2]
+                    and result.start > span[1]
+                    and text[span[1] : result.start].strip(" ") == ""
+                )
+                if overlaps or separated_by_spaces:
+                    span[1] = max(span[1], result.end)
+                    span[3].append(index)
+                    continue
+            spans.append([result.start, result.end, result.entity_type, [index]])
+        return spans
+
+    @staticmethod
+    def replace(text: str, spans: List[list]) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Replace spans, [start, end, entity_type, ...] sorted by position as returned by merge_spans(),
+        with placeholders and escape the text.
+
+        Returns the anonymized text and the start and end location of the placeholder of every span.
+        """
+        parts = []
+        span_locations: List[Tuple[int, int]] = []
+        position = 0
+        length = 0
+        for start, end, entity_type, *_ in spans:
+            escaped = text[position:start].translate(ESCAPE_TABLE)
+            placeholder = PLACEHOLDER_FORMAT.format(entity_type)
+            parts.append(escaped)
+            parts.append(placeholder)
+            length += len(escaped)
+            span_locations.append((length, length + len(placeholder)))
+            length += len(placeholder)
+            position = end
+        parts.append(text[position:].translate(ESCAPE_TABLE))
+        return "".join(parts), span_locations
+
+    def anonymize(
+        self, text: str, analyzer_results: list, spans: Optional[List[list]] = None
+    ) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Anonymize and escape the text.
+
+        Returns the anonymized text, and for every analyzer result in input order the start and end
+        location of the placeholder that replaced it in the anonymized text. `spans` are the merged
+        spans of the analyzer results when already computed with merge_spans().
+        """
+        if spans is None:
+            spans = self.merge_spans(text, analyzer_results)
+        anonymized_text, span_locations = self.replace(text, spans)
+        locations: List[Tuple[int, int]] = [(0, 0)] * len(analyzer_results)
+        for span, location in zip(spans, span_locations):
+            for index in span[3]:
+                locations[index] = location
+        return anonymized_text, locations
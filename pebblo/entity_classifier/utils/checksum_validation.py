@@ -0,0 +1,45 @@
+"""
+Checksum validation of the entities found in a document.
+
+Credit card, routing, IBAN, SSN and ITIN numbers have check digits or numbering rules. Entities of these types
+failing their checksum are dropped before overlapping entities are grouped, so that they neither create
+overlap groups for the LLM judge nor end up in reports.
+"""
+
+from typing import List
+
+from presidio_analyzer import RecognizerResult
+
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.entity_classifier.utils.config import entity_checksum_validators
+from pebblo.entity_classifier.utils.precedence import precedence_validators
+
+rejections_counter = metrics_registry.counter(
+    "pebblo_entity_checksum_rejections_total",
+    "Entities dropped because they failed the checksum of their type, by entity type.",
+)
+
+
+def filter_checksum_failures(
+    text: str, results: List[RecognizerResult]
+) -> List[RecognizerResult]:
+    """
+    Drop the results of a document failing the checksum of their entity type.
+
+    Each distinct value is validated once per document, even if several recognizers found it.
+    """
+    validations = {}
+    valid_results = []
+    for result in results:
+        validator = entity_checksum_validators.get(result.entity_type)
+        if validator is None:
+            valid_results.append(result)
+            continue
+        key = (validator, text[result.start : result.end])
+        if key not in validations:
+            validations[key] = precedence_validators[validator](key[1])
+        if validations[key]:
+            valid_results.append(result)
+        else:
+            rejections_counter.inc(entity=result.entity_type)
+    return valid_results
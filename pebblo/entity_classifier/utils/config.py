@@ -3,6 +3,7 @@ Copyright (c) 2024 Cloud Defense, Inc. All rights reserved.
 """
 
 from enum import Enum
+from typing import List, Optional, Tuple
 
 secret_entities_context_mapping = {
     "github-token": ["github", "github_token", "git"],
@@ -52,6 +53,9 @@ class Entities(Enum):
     RSA_PRIVATE_KEY = "rsa-private-key"
     GOOGLE_PRIVATE_KEY = "google-private-key"
     API_KEY = "api-key"
+    HIGH_ENTROPY_SECRET = "high-entropy-secret"
+    # Secrets matched by the user-defined patterns of the classifier config
+    CUSTOM_SECRET = "custom-secret"
 
 
 class SecretEntities(Enum):
@@ -65,6 +69,22 @@ class SecretEntities(Enum):
     GITHUB_FINEGRAINED_TOKEN = "github-finegrained-token"
 
 
+# Entities detected by the pattern recognizers alone, classified in the regex-only secrets mode
+secrets_mode_entities = [entity.name for entity in SecretEntities] + [
+    Entities.PRIVATE_KEY.name,
+    Entities.DSA_PRIVATE_KEY.name,
+    Entities.ENCRYPTED_PRIVATE_KEY.name,
+    Entities.ELLIPTIC_CURVE_PRIVATE_KEY.name,
+    Entities.OPENSSH_PRIVATE_KEY.name,
+    Entities.RSA_PRIVATE_KEY.name,
+    Entities.GOOGLE_PRIVATE_KEY.name,
+    Entities.API_KEY.name,
+    Entities.HIGH_ENTROPY_SECRET.name,
+    Entities.CUSTOM_SECRET.name,
+    Entities.CREDIT_CARD.name,
+]
+
+
 class PIIGroups(Enum):
     Identification = "pii-identification"
     Financial = "pii-financial"
@@ -112,11 +132,45 @@ entity_group_conf_mapping = {
     Entities.RSA_PRIVATE_KEY.value: (0.4, PIIGroups.Secrets.value),
     Entities.GOOGLE_PRIVATE_KEY.value: (0.4, PIIGroups.Secrets.value),
     Entities.API_KEY.value: (0.4, PIIGroups.Secrets.value),
+    # Reported only with context words nearby
+    Entities.HIGH_ENTROPY_SECRET.value: (0.8, PIIGroups.Secrets.value),
+    Entities.CUSTOM_SECRET.value: (0.4, PIIGroups.Secrets.value),
     # Network
     Entities.IP_ADDRESS.value: (0.4, PIIGroups.Network.value),
 }
 
 
+# Checksum validators of entity types with a check digit or numbering rules. Entities failing their checksum are
+# dropped before overlapping entities are grouped. Validators are defined in pebblo.entity_classifier.utils.precedence.
+entity_checksum_validators = {
+    Entities.CREDIT_CARD.name: "luhn",
+    Entities.ROUTING_NUMBER.name: "aba",
+    Entities.IBAN_CODE.name: "iban",
+    Entities.US_SSN.name: "ssn",
+    Entities.US_ITIN.name: "itin",
+}
+
+
+# Precedence rules resolving overlapping entities of different types without the LLM judge, applied in order.
+# (preferred, other, validator): when entities of both types overlap, entities of the `other` type are dropped
+# if the validator accepts the text of the `preferred` entity, or always if the validator is None.
+# Validators are defined in pebblo.entity_classifier.utils.precedence.
+entity_precedence_rules = [
+    (Entities.CREDIT_CARD.name, Entities.US_BANK_NUMBER.name, "luhn"),
+    (Entities.CREDIT_CARD.name, Entities.PHONE_NUMBER.name, "luhn"),
+    (Entities.US_ITIN.name, Entities.US_SSN.name, "itin"),
+    (Entities.US_SSN.name, Entities.US_ITIN.name, "ssn"),
+    (Entities.ROUTING_NUMBER.name, Entities.US_BANK_NUMBER.name, "aba"),
+    (Entities.IBAN_CODE.name, Entities.BBAN_CODE.name, "iban"),
+    # Known secrets and private keys win over the generic high entropy token
+    *[
+        (entity, Entities.HIGH_ENTROPY_SECRET.name, None)
+        for entity in secrets_mode_entities
+        if entity not in (Entities.HIGH_ENTROPY_SECRET.name, Entities.CREDIT_CARD.name)
+    ],
+]
+
+
 class ConfidenceScore(Enum):
     Entity = "0.8"  # based on this score entity output is finalized
     EntityMinScore = "0.45"  # It denotes the pattern's strength
@@ -124,3 +178,27 @@ class ConfidenceScore(Enum):
         "0.35"  # It denotes how much to enhance confidence of match entity
     )
     EntityMinScoreWithContext = "0.4"  # It denotes minimum confidence score
+
+
+def get_entity_types(names: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    Resolve an entity allow-list to the sorted entity types to classify.
+
+    Entries can be entity types (e.g. `US_SSN`), entity names as reported (e.g. `us-ssn`) or
+    entity groups (e.g. `pii-financial`). An empty or missing allow-list means all entities.
+    Raises ValueError for unknown entries.
+    """
+    if not names:
+        return None
+    entity_types = set()
+    for name in names:
+        members = [
+            member
+            for member in list(Entities) + list(SecretEntities)
+            if name in (member.name, member.value)
+            or name == entity_group_conf_mapping.get(member.value, (None, None))[1]
+        ]
+        if not members:
+            raise ValueError(f"Unknown entity '{name}'")
+        entity_types.update(member.name for member in members)
+    return tuple(sorted(entity_types))
@@ -1,50 +1,192 @@
-import ast
-import logging
+"""
+LLM adjudication of overlapping entities of different types, e.g. a number detected both as
+passport number and as driver license number.
 
+All overlap groups of a document are judged concurrently, on a thread pool shared by the
+process that bounds the number of LLM calls in flight. A document waits at most
+JUDGE_TIME_BUDGET seconds for its judgements, and judgements of identical text windows and
+candidates are memoized. Groups without judgement keep their highest scoring entities, and the
+result of the document is flagged as degraded so that it is not cached.
+Groups decided by the precedence rules are not sent to the LLM.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional, Set, Tuple
+
+from pebblo.app.libs.classification_cache import mark_degraded
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.entity_classifier.utils.precedence import resolutions_counter, resolve_group
 from pebblo.entity_classifier.utils.prompt_lib import get_judge_prompt
+from pebblo.log import get_logger
 
-logger = logging.getLogger()
+logger = get_logger(__name__)
 
+# Maximum number of judge LLM calls in flight per process
+JUDGE_MAX_CONCURRENCY = 4
+# Seconds a document waits for the judgements of its overlap groups
+JUDGE_TIME_BUDGET = 10.0
+# Characters of text before and after an overlap group sent to the LLM
+JUDGE_CONTEXT_SIZE = 1000
+JUDGE_MEMO_SIZE = 1024
 
-def process_group(group, text, text_generation_obj):
-    """
-    Process a group of overlapping entities. Replace this with your actual processing logic.
+judgements_counter = metrics_registry.counter(
+    "pebblo_entity_judgements_total",
+    "Overlapping entity groups adjudicated, by outcome.",
+)
 
-    Args:
-    group (list): List of overlapping entities.
-    """
-    group_dict = []
-    for g in group:
-        group_dict.append(
-            {"entity_type": g.entity_type, "entity_value": text[g.start : g.end]}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_memo: OrderedDict = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=JUDGE_MAX_CONCURRENCY, thread_name_prefix="pebblo-judge"
+                )
+    return _executor
+
+
+def _get_memo(key) -> Optional[Set[str]]:
+    with _memo_lock:
+        judgement = _memo.get(key)
+        if judgement is not None:
+            _memo.move_to_end(key)
+        return judgement
+
+
+def _set_memo(key, judgement: Set[str]) -> None:
+    with _memo_lock:
+        _memo[key] = judgement
+        _memo.move_to_end(key)
+        while len(_memo) > JUDGE_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def _get_group_key(group, text) -> Tuple[str, tuple]:
+    """Memo key of a group, i.e. the text window around it and its candidate entities."""
+    start = max(0, min(entity.start for entity in group) - JUDGE_CONTEXT_SIZE)
+    end = max(entity.end for entity in group) + JUDGE_CONTEXT_SIZE
+    candidates = tuple(
+        sorted(
+            (entity.entity_type, text[entity.start : entity.end]) for entity in group
         )
-    final_prompt = get_judge_prompt(text, group_dict)
-    judgement = text_generation_obj.generate(final_prompt)
-    judgement = ast.literal_eval(judgement)
+    )
+    return text[start:end], candidates
+
+
+def _judge(key, text_generation_obj) -> Set[str]:
+    """Ask the LLM which candidate entity types are correct in the text window."""
+    text_window, candidates = key
+    group_dict = [
+        {"entity_type": entity_type, "entity_value": entity_value}
+        for entity_type, entity_value in candidates
+    ]
+    judgement = text_generation_obj.generate(
+        get_judge_prompt(text_window, group_dict), timeout=JUDGE_TIME_BUDGET
+    )
+    judgement = json.loads(judgement)
     if isinstance(judgement, list):
         judge_dict = {}
         for judge in judgement:
             judge_dict.update(judge)
         judgement = judge_dict
+    correct_judgement = {
+        key for key, value in judgement.items() if str(value).lower() == "correct"
+    }
+    _set_memo(key, correct_judgement)
+    return correct_judgement
 
-    correct_judgement = [
-        key for key, value in judgement.items() if value.lower() == "correct"
-    ]
-    filtered_group = [
-        entity for entity in group if entity.entity_type in correct_judgement
-    ]
-    return filtered_group
 
+def _select(group, correct_judgement: Optional[Set[str]]) -> list:
+    """
+    Entities of a group judged correct. Groups that could not be judged keep their highest scoring entities.
+    """
+    if correct_judgement is None:
+        max_score = max(entity.score for entity in group)
+        return [entity for entity in group if entity.score == max_score]
+    return [entity for entity in group if entity.entity_type in correct_judgement]
+
+
+def process_group(group, text, text_generation_obj):
+    """
+    Judge a group of overlapping entities and return the entities judged correct.
+
+    Args:
+    group (list): List of overlapping entities.
+    """
+    key = _get_group_key(group, text)
+    correct_judgement = _get_memo(key)
+    if correct_judgement is None:
+        correct_judgement = _judge(key, text_generation_obj)
+    return _select(group, correct_judgement)
 
-def judge_results(text, grouped_entities, text_generation_obj):
-    # Group overlapping entities
+
+def judge_results(text, grouped_entities, text_generation_obj) -> List:
+    """
+    Resolve groups of overlapping entities with the precedence rules, groups the rules can not decide are
+    judged by the LLM.
+    """
     final_entities = []
-    # Process each group
+    pending = {}
     for group in grouped_entities:
-        if len(group) > 1:
-            filtered_grp = process_group(group, text, text_generation_obj)
-            for ent in filtered_grp:
-                final_entities.extend(filtered_grp)
-        else:
+        if len(group) <= 1:
+            final_entities.extend(group)
+            continue
+        group, resolved = resolve_group(group, text)
+        if resolved:
+            resolutions_counter.inc(resolver="rules")
             final_entities.extend(group)
+            continue
+        resolutions_counter.inc(resolver="judge")
+        key = _get_group_key(group, text)
+        correct_judgement = _get_memo(key)
+        if correct_judgement is not None:
+            judgements_counter.inc(outcome="memo")
+            final_entities.extend(_select(group, correct_judgement))
+        else:
+            pending.setdefault(key, []).append(group)
+    if not pending:
+        return final_entities
+
+    start_time = time.perf_counter()
+    executor = _get_executor()
+    futures = {
+        executor.submit(_judge, key, text_generation_obj): key for key in pending
+    }
+    done, not_done = wait(futures, timeout=JUDGE_TIME_BUDGET)
+    for future in not_done:
+        # Judgements already running complete in the background and still fill the memo
+        future.cancel()
+    for future, key in futures.items():
+        correct_judgement = None
+        if future in done:
+            try:
+                correct_judgement = future.result()
+                judgements_counter.inc(outcome="llm")
+            except Exception as ex:
+                judgements_counter.inc(outcome="error")
+                mark_degraded("judge_error")
+                logger.warning(f"Overlapping entities judgement failed. {ex}")
+        else:
+            judgements_counter.inc(outcome="timeout")
+            mark_degraded("judge_timeout")
+        for group in pending[key]:
+            final_entities.extend(_select(group, correct_judgement))
+    if not_done:
+        logger.warning(
+            f"{len(not_done)} of {len(futures)} overlapping entity groups not judged "
+            f"within {JUDGE_TIME_BUDGET}s, keeping their highest scoring entities"
+        )
+    logger.debug(
+        f"Judged {len(futures)} overlapping entity groups in {time.perf_counter() - start_time:.2f}s"
+    )
     return final_entities
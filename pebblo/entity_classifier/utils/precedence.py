@@ -0,0 +1,60 @@
+"""
+Deterministic resolution of overlapping entities of different types.
+
+Many overlaps have an obvious answer, e.g. a Luhn valid credit card number also matching the
+bank account number pattern. Such groups are resolved with the precedence rules of
+`entity_precedence_rules`, only groups the rules can not decide are escalated to the LLM judge.
+"""
+
+import re
+from typing import Callable, Dict, Tuple
+
+from stdnum import iban, luhn
+from stdnum.us import itin, rtn, ssn
+
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.entity_classifier.utils.config import entity_precedence_rules
+
+resolutions_counter = metrics_registry.counter(
+    "pebblo_entity_overlaps_resolved_total",
+    "Groups of overlapping entities resolved, by resolver i.e. precedence rules or LLM judge.",
+)
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def _digits(value: str) -> str:
+    return NON_DIGITS.sub("", value)
+
+
+precedence_validators: Dict[str, Callable[[str], bool]] = {
+    "luhn": lambda value: luhn.is_valid(_digits(value)),
+    "ssn": lambda value: ssn.is_valid(_digits(value)),
+    "itin": lambda value: itin.is_valid(_digits(value)),
+    "aba": lambda value: rtn.is_valid(_digits(value)),
+    "iban": iban.is_valid,
+}
+
+
+def resolve_group(group: tuple, text: str) -> Tuple[tuple, bool]:
+    """
+    Apply the precedence rules to a group of overlapping entities.
+
+    Returns the remaining entities of the group, and whether the group is resolved, i.e. all its
+    remaining entities have the same type.
+    """
+    for preferred, other, validator in entity_precedence_rules:
+        entity_types = {entity.entity_type for entity in group}
+        if preferred not in entity_types or other not in entity_types:
+            continue
+        if validator is not None:
+            validate = precedence_validators[validator]
+            if not any(
+                entity.entity_type == preferred
+                and validate(text[entity.start : entity.end])
+                for entity in group
+            ):
+                continue
+        group = tuple(entity for entity in group if entity.entity_type != other)
+    resolved = len({entity.entity_type for entity in group}) <= 1
+    return group, resolved
@@ -1,4 +1,4 @@
-def get_entity_detection_prompt(text):
+def _get_entity_detection_messages(task_prompt):
     SYSTEM_PROMPT = """You are a smart and intelligent Named Entity Recognition (NER) system.
     I will provide you the definition of the entities you need to extract,
     the sentence from where your extract the entities and the output format with examples
@@ -49,10 +49,8 @@ def get_entity_detection_prompt(text):
         "\n"
         "5. Sentence: My bank account number is 1234567890, and the routing number is 021000021.\n"
         "Output: {{'PERSON': [''], 'STREET_ADDRESS': [''], 'COMPANY_NAME': [''], 'DATE_OF_BIRTH': [''], 'EMAIL': [''], 'SSN': [''], 'BBAN': [''], 'PHONE_NUMBER': [''], 'API_KEY': [''], 'SWIFT_BIC_CODE': [''], 'DRIVER_LICENSE_NUMBER': [''], 'CREDIT_CARD_NUMBER': [''], 'IBAN': [''], 'PASSPORT_NUMBER': [''], 'BANK_ROUTING_NUMBER': ['021000021'], 'BANK_ACCOUNT_NUMBER': ['1234567890'], 'ITIN': ['']}}\n"
-        "Sentence: {}\n"
-        "Output: "
     )
-    GUIDELINES_PROMPT = GUIDELINES_PROMPT.format(text)
+    GUIDELINES_PROMPT = GUIDELINES_PROMPT.format() + task_prompt
     messages = [
         # This line is commented because Gemma does not support system prompts
         # {"role": "assistant", "content": SYSTEM_PROMPT},
@@ -63,6 +61,25 @@ def get_entity_detection_prompt(text):
     return messages
 
 
+def get_entity_detection_prompt(text):
+    return _get_entity_detection_messages(f"Sentence: {text}\nOutput: ")
+
+
+def get_packed_entity_detection_prompt(texts):
+    """
+    Prompt detecting the entities of several texts at once, the entities of every text are returned
+    under its number so that a value found in one text is not reported in the others.
+    """
+    task_prompt = (
+        "\nThe following sentences are numbered, detect the entities of every sentence separately.\n"
+        "Output Format: one output per sentence number, only with the entities present in that sentence, "
+        "e.g. {'1': {'PERSON': ['John Doe'], ...}, '2': {'PERSON': [''], ...}}\n"
+    )
+    for sentence_id, text in enumerate(texts, start=1):
+        task_prompt += f"Sentence {sentence_id}: {text}\n"
+    return _get_entity_detection_messages(task_prompt + "Output: ")
+
+
 def get_judge_prompt(text, results):
     SYSTEM_PROMPT = """You are an expert in Named Entity Recognition (NER) evaluation.
     Your task is to assess the correctness of identified entities by comparing them with the given text.
@@ -0,0 +1,174 @@
+"""
+Protection of the classification workers against slow regular expressions.
+
+Patterns of the recognizers run on arbitrary documents. At startup, audit_recognizers() flags
+patterns prone to catastrophic backtracking, i.e. nested unbounded quantifiers, or slow on probe
+texts. At runtime, every pattern scan of a text has a time budget, scans exceeding it are
+abandoned with the matches found so far and counted in the pebblo_regex_timeouts_total metric.
+"""
+
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import regex
+
+from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.libs.classification_cache import mark_degraded
+from pebblo.app.libs.metrics import metrics_registry
+from pebblo.log import get_logger
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = get_logger(__name__)
+
+# Seconds a single pattern may spend scanning a text
+DEFAULT_REGEX_TIMEOUT = 1.0
+# Seconds a pattern may spend on one probe text of the startup audit
+AUDIT_PROBE_TIMEOUT = 0.1
+AUDIT_PROBE_LENGTH = 5000
+AUDIT_PROBE_UNITS = ("a", "A", "0", " ", "\n", "-", "aA0+/", "a ", "0-", "a.")
+AUDIT_PROBE_SUFFIX = "!"
+
+# Audit result of every (pattern, flags) audited by this process
+_audited = {}
+
+regex_timeouts_counter = metrics_registry.counter(
+    "pebblo_regex_timeouts_total",
+    "Regex pattern scans abandoned after exceeding their time budget, by recognizer and pattern.",
+)
+
+
+def get_regex_timeout() -> float:
+    """Time budget of a pattern scan, the classifier regexTimeout config."""
+    config_details = var_server_config_dict.get() or {}
+    return float(
+        config_details.get("classifier", {}).get("regexTimeout", DEFAULT_REGEX_TIMEOUT)
+    )
+
+
+def finditer(
+    compiled_regex,
+    text: str,
+    timeout: float,
+    recognizer_name: str,
+    pattern_name: str,
+) -> Iterator:
+    """
+    Yield the matches of a regex compiled with the `regex` module, until its time budget is exhausted.
+    """
+    try:
+        yield from compiled_regex.finditer(text, timeout=timeout)
+    except TimeoutError:
+        regex_timeouts_counter.inc(recognizer=recognizer_name, pattern=pattern_name)
+        mark_degraded("regex_timeout")
+        logger.warning(
+            f"Pattern '{pattern_name}' of {recognizer_name} abandoned after {timeout}s "
+            f"on a text of {len(text)} characters"
+        )
+
+
+def search(
+    compiled_regex,
+    text: str,
+    position: int,
+    deadline: float,
+    recognizer_name: str,
+    pattern_name: str,
+):
+    """
+    Search a regex compiled with the `regex` module from a position, None once the deadline has passed.
+    """
+    timeout = deadline - time.monotonic()
+    try:
+        if timeout <= 0:
+            raise TimeoutError("regex timed out")
+        return compiled_regex.search(text, position, timeout=timeout)
+    except TimeoutError:
+        regex_timeouts_counter.inc(recognizer=recognizer_name, pattern=pattern_name)
+        mark_degraded("regex_timeout")
+        logger.warning(
+            f"Pattern '{pattern_name}' of {recognizer_name} abandoned at position {position} "
+            f"of a text of {len(text)} characters"
+        )
+        return None
+
+
+def _is_unbounded(max_repeat: int) -> bool:
+    return max_repeat == sre_parse.MAXREPEAT
+
+
+def _has_nested_quantifier(subpattern, inside_repeat: bool = False) -> bool:
+    for op, av in subpattern:
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            _, max_repeat, item = av
+            if inside_repeat and _is_unbounded(max_repeat):
+                return True
+            if _has_nested_quantifier(
+                item, inside_repeat or _is_unbounded(max_repeat) or max_repeat > 1
+            ):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _has_nested_quantifier(av[-1], inside_repeat):
+                return True
+        elif op == sre_parse.BRANCH:
+            if any(_has_nested_quantifier(item, inside_repeat) for item in av[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _has_nested_quantifier(av[1], inside_repeat):
+                return True
+    return False
+
+
+def audit_regex(pattern: str, flags: int = 0) -> Optional[str]:
+    """
+    Return why a pattern is prone to catastrophic backtracking, None if it looks safe.
+
+    Patterns are checked statically for unbounded quantifiers nested in other quantifiers, e.g. (a+)+,
+    then timed on probe texts made of repeated characters without a match at their end.
+    """
+    try:
+        if _has_nested_quantifier(sre_parse.parse(pattern, flags)):
+            return "nested unbounded quantifiers"
+    except Exception as ex:
+        # Syntax specific to the regex module, left to the probe texts
+        logger.debug(f"Regex audit could not parse pattern {pattern}. {ex}")
+    compiled_regex = regex.compile(pattern, flags)
+    for unit in AUDIT_PROBE_UNITS:
+        probe = unit * (AUDIT_PROBE_LENGTH // len(unit)) + AUDIT_PROBE_SUFFIX
+        try:
+            for _ in compiled_regex.finditer(probe, timeout=AUDIT_PROBE_TIMEOUT):
+                pass
+        except TimeoutError:
+            return f"slower than {AUDIT_PROBE_TIMEOUT}s on a probe text of repeated {unit!r}"
+    return None
+
+
+def audit_recognizers(recognizers: list) -> List[Tuple[str, str, str]]:
+    """
+    Audit the patterns of recognizers at startup, log and return the (recognizer, pattern, reason) of flagged patterns.
+    """
+    findings = []
+    start_time = time.perf_counter()
+    for recognizer in recognizers:
+        flags = getattr(recognizer, "global_regex_flags", 0) or 0
+        for pattern in getattr(recognizer, "patterns", None) or []:
+            key = (pattern.regex, flags)
+            if key in _audited:
+                # Already audited and logged, e.g. by another classifier replica
+                reason = _audited[key]
+                if reason is not None:
+                    findings.append((recognizer.name, pattern.name, reason))
+                continue
+            reason = _audited[key] = audit_regex(pattern.regex, flags)
+            if reason is not None:
+                findings.append((recognizer.name, pattern.name, reason))
+                logger.warning(
+                    f"Pattern '{pattern.name}' of {recognizer.name} may backtrack catastrophically: {reason}"
+                )
+    logger.debug(
+        f"Audited recognizer patterns in {time.perf_counter() - start_time:.2f}s, {len(findings)} flagged"
+    )
+    return findings
@@ -1,10 +1,10 @@
 import re
 import traceback
-from itertools import combinations
 
 from dateutil.parser import ParserError, parse
 from stdnum.us import ssn
 
+from pebblo.entity_classifier.utils.token_matcher import SpanIndex, TokenMatcher
 from pebblo.log import get_logger
 
 logger = get_logger(__name__)
@@ -55,45 +55,6 @@ ENTITY_LABELS = {
 # Helper Functions
 
 
-def is_overlapping(start, end, label, used_spans):
-    """
-    Check if the current match overlaps with any previously matched spans for a given label.
-
-    Args:
-    - start (int): The start position of the current match.
-    - end (int): The end position of the current match.
-    - label (str): The entity label of the current match.
-    - used_spans (dict): Dictionary of used spans by label.
-
-    Returns:
-    - bool: True if the current match overlaps with any existing spans, False otherwise.
-    """
-    for s, e in used_spans[label]:
-        if max(start, s) < min(end, e):
-            return True
-    return False
-
-
-def generate_permutations(phrase):
-    """
-    Generate subsequences that preserve the word order from a given phrase.
-
-    Args:
-    - phrase (str): The input phrase to generate subsequences from.
-
-    Returns:
-    - list: List of subsequences in descending order of length.
-    """
-    words = phrase.split()
-    subsequences = [
-        " ".join(combo)
-        for length in range(1, len(words) + 1)
-        for combo in combinations(words, length)
-    ]
-    subsequences.sort(key=len, reverse=True)
-    return subsequences
-
-
 def is_valid_email(email):
     """
     Validate if the input is a proper email address.
@@ -327,6 +288,10 @@ def prepare_results(entity_patterns, text):
     """
     Match entity patterns to text and prepare the results.
 
+    The text is tokenized once, all patterns are looked up with a single pass over its tokens, names
+    also match partially, e.g. 'John Smith' for 'John A. Smith'. Matches overlapping an earlier match
+    of the same label are skipped.
+
     Args:
     - entity_patterns (dict): A dictionary of entity patterns.
     - text (str): The text in which to search for entity patterns.
@@ -334,34 +299,41 @@ def prepare_results(entity_patterns, text):
     Returns:
     - list: A list of matched entities with start, end, and extracted text.
     """
-    used_spans = {label: [] for label in ENTITY_LABELS.values()}
+    matcher = TokenMatcher(text)
+    name_patterns = entity_patterns.get("name", [])
+    name_matches = iter(matcher.find_names(name_patterns))
+    value_matches = iter(
+        matcher.find_values(
+            [
+                pattern
+                for key, patterns in entity_patterns.items()
+                if key != "name"
+                for pattern in patterns
+            ]
+        )
+    )
+    used_spans = {label: SpanIndex() for label in ENTITY_LABELS.values()}
     results = []
 
     for key, patterns in entity_patterns.items():
-        for pattern in patterns:
-            combined_pattern = (
-                "|".join(map(re.escape, generate_permutations(pattern)))
-                if key == "name"
-                else re.escape(str(pattern))
-            )
-
-            for match in re.finditer(
-                combined_pattern, text, re.IGNORECASE | re.MULTILINE
-            ):
-                start, end = match.span()
+        label = ENTITY_LABELS.get(key.lower(), "")
+        for _ in patterns:
+            spans = next(name_matches) if key == "name" else next(value_matches)
+            if not label:
+                continue
+            for start, end in spans:
+                if used_spans[label].overlaps(start, end):
+                    continue
                 extracted_text = text[start:end]
-                label = ENTITY_LABELS.get(key.lower(), "")
-
-                if label and not is_overlapping(start, end, label, used_spans):
-                    if validate_extracted_data(label, extracted_text):
-                        res_dict = {
-                            "start": start,
-                            "end": end,
-                            "label": label,
-                            "extracted_text": extracted_text,
-                        }
-                        results.append(res_dict)
-                        used_spans[label].append((start, end))
+                if validate_extracted_data(label, extracted_text):
+                    res_dict = {
+                        "start": start,
+                        "end": end,
+                        "label": label,
+                        "extracted_text": extracted_text,
+                    }
+                    results.append(res_dict)
+                    used_spans[label].add(start, end)
     return results
 
 
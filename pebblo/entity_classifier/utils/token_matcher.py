@@ -0,0 +1,156 @@
+"""
+Lookup of entity values extracted by the LLM in the text they were extracted from.
+
+The text is tokenized once, in words and punctuation characters compared case insensitively. Values
+are found with one pass of an Aho-Corasick automaton over the tokens. Names are also found partially,
+as runs of consecutive tokens that appear in the same order in the name, e.g. 'John Smith' for the
+name 'John A. Smith', without enumerating the subsequences of the name. Tokens not separated by
+whitespace only extend a run when they are adjacent in the name as well, so that 'john.smith' in an
+email address is not taken for the name.
+"""
+
+import re
+from bisect import bisect_right, insort
+from collections import deque
+from typing import Dict, List, Sequence, Tuple
+
+TOKEN_REGEX = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_REGEX.findall(text)]
+
+
+def get_glued(spans: Sequence[Tuple[int, int]]) -> List[bool]:
+    """Whether every token directly follows the previous one, without whitespace in between."""
+    return [
+        index > 0 and start == spans[index - 1][1]
+        for index, (start, _) in enumerate(spans)
+    ]
+
+
+class TokenMatcher:
+    """
+    Find values in a text, matches of a value do not overlap each other and are ordered by position.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = []
+        self.spans = []
+        for match in TOKEN_REGEX.finditer(text):
+            self.tokens.append(match.group().lower())
+            self.spans.append(match.span())
+        self.glued = get_glued(self.spans)
+
+    def _span(self, start: int, end: int) -> Tuple[int, int]:
+        """Character span of the tokens from start to end, end excluded."""
+        return self.spans[start][0], self.spans[end - 1][1]
+
+    def find_values(self, values: Sequence[str]) -> List[List[Tuple[int, int]]]:
+        """Return the character spans of every value, found in one pass over the tokens."""
+        matches = [[] for _ in values]
+        # Trie of the token sequences of the values, node 0 is the root
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, int]]] = [[]]
+        for index, value in enumerate(values):
+            value_tokens = tokenize(str(value))
+            if not value_tokens:
+                continue
+            node = 0
+            for token in value_tokens:
+                if token not in goto[node]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[node][token] = len(goto) - 1
+                node = goto[node][token]
+            outputs[node].append((index, len(value_tokens)))
+        if len(goto) == 1:
+            return matches
+
+        # Failure links, computed breadth first, with the outputs of the nodes they link to
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                queue.append(child)
+                link = fail[node]
+                while link and token not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(token, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        next_start = [0] * len(values)
+        node = 0
+        for position, token in enumerate(self.tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for index, length in outputs[node]:
+                start = position + 1 - length
+                # Matches are reported by end position, those of a value by start position too
+                if start >= next_start[index]:
+                    matches[index].append(self._span(start, position + 1))
+                    next_start[index] = position + 1
+        return matches
+
+    def find_names(self, names: Sequence[str]) -> List[List[Tuple[int, int]]]:
+        """
+        Return the character spans of the longest runs of tokens appearing in the same order in every name.
+        """
+        matches = [[] for _ in names]
+        name_tokens = []
+        name_glued = []
+        for name in names:
+            name_matches = list(TOKEN_REGEX.finditer(str(name)))
+            name_tokens.append([match.group().lower() for match in name_matches])
+            name_glued.append(get_glued([match.span() for match in name_matches]))
+        # Names by word token, to only try the names sharing a word with the text, runs start with a word
+        names_by_token: Dict[str, List[int]] = {}
+        for index, tokens in enumerate(name_tokens):
+            for token in dict.fromkeys(tokens):
+                if token[0].isalnum() or token[0] == "_":
+                    names_by_token.setdefault(token, []).append(index)
+
+        next_start = [0] * len(names)
+        for position, token in enumerate(self.tokens):
+            for index in names_by_token.get(token, ()):
+                if position < next_start[index]:
+                    continue
+                # Matching every token with its first occurrence in the rest of the name gives the longest run
+                tokens = name_tokens[index]
+                name_position = 0
+                end = position
+                while end < len(self.tokens):
+                    try:
+                        match = tokens.index(self.tokens[end], name_position)
+                    except ValueError:
+                        break
+                    # Tokens glued in the text must be the next token of the name, glued to it as well
+                    if (
+                        end > position
+                        and self.glued[end]
+                        and not (match == name_position and name_glued[index][match])
+                    ):
+                        break
+                    name_position = match + 1
+                    end += 1
+                matches[index].append(self._span(position, end))
+                next_start[index] = end
+        return matches
+
+
+class SpanIndex:
+    """Non-overlapping character spans, sorted by start for overlap checks in logarithmic time."""
+
+    def __init__(self):
+        self.spans: List[Tuple[int, int]] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        index = bisect_right(self.spans, (start, end))
+        if index > 0 and self.spans[index - 1][1] > start:
+            return True
+        return index < len(self.spans) and self.spans[index][0] < end
+
+    def add(self, start: int, end: int) -> None:
+        insort(self.spans, (start, end))
@@ -2,8 +2,13 @@
 Copyright (c) 2024 Cloud Defense, Inc. All rights reserved.
 """
 
-from presidio_analyzer import Pattern, PatternRecognizer, RecognizerRegistry
+from typing import Optional
 
+from presidio_analyzer import Pattern, RecognizerRegistry
+
+from pebblo.entity_classifier.custom_analyzer.secret_pattern_analyzer import (
+    SecretPatternRecognizer,
+)
 from pebblo.entity_classifier.utils.config import (
     ConfidenceScore,
     Entities,
@@ -47,31 +52,47 @@ def get_entities(entities_list: list, response: list) -> (dict, dict, int):
     return entity_groups, entity_details, total_count
 
 
-def add_custom_regex_analyzer_registry():
+def add_custom_regex_analyzer_registry(secret_patterns: Optional[list] = None):
     """
     Using context word enhancer
-    :return: Recognizer Registry with patterns and contexts
+    :param secret_patterns: User-defined secret patterns of the classifier config, reported as custom secrets
+    :return: Recognizer Registry with one recognizer scanning all secret patterns and their contexts
     """
     recognizer_registry = RecognizerRegistry()
 
-    # Creating custom regex recognizer
+    patterns = []
+    contexts = {}
     for entity, regex_pattern in regex_secrets_patterns.items():
-        # Define regex pattern
-        pattern = [
-            Pattern(
-                name=SecretEntities(entity).value,
-                regex=regex_pattern,
-                score=float(ConfidenceScore.EntityMinScore.value),
-            ),
+        patterns.append(
+            (
+                SecretEntities(entity).name,
+                Pattern(
+                    name=SecretEntities(entity).value,
+                    regex=regex_pattern,
+                    score=float(ConfidenceScore.EntityMinScore.value),
+                ),
+            )
+        )
+        contexts[SecretEntities(entity).value] = secret_entities_context_mapping[
+            SecretEntities(entity).value
         ]
-
-        # Define recognizer with the defined pattern
-        recognizer = PatternRecognizer(
-            supported_entity=SecretEntities(entity).name,
-            name=f"{'_'.join(entity.split(' '))}_recognizer",
-            patterns=pattern,
-            context=secret_entities_context_mapping[SecretEntities(entity).value],
+    for secret_pattern in secret_patterns or []:
+        patterns.append(
+            (
+                Entities.CUSTOM_SECRET.name,
+                Pattern(
+                    name=secret_pattern["name"],
+                    regex=secret_pattern["regex"],
+                    score=float(secret_pattern.get("score", 0.8)),
+                ),
+            )
         )
-        recognizer_registry.add_recognizer(recognizer)
+        contexts[secret_pattern["name"]] = secret_pattern.get("context", [])
 
+    # User-defined patterns are scanned on their own, an overlapping built-in pattern never hides their matches
+    recognizer_registry.add_recognizer(
+        SecretPatternRecognizer(
+            patterns, contexts, standalone_entities=[Entities.CUSTOM_SECRET.name]
+        )
+    )
     return recognizer_registry
@@ -52,6 +52,8 @@ topic_entity_mapping = {
     "azure-client-secret": "Azure Client Secret",
     "google-api-key": "Google API Key",
     "api-key": "Api Key",
+    "high-entropy-secret": "High Entropy Secret",
+    "custom-secret": "Custom Secret",
     "harmful": "Harmful",
     "medical": "Medical",
     "financial": "Financial",
@@ -5,12 +5,10 @@ Defines the TopicClassifier class with methods for predicting topics and extract
 
 import os
 import re
+import threading
 from typing import Any, Dict, List, Optional, Union
 
-from boto3 import client as boto3_client
-from huggingface_hub import login
 from json_repair import repair_json
-from litellm import completion
 
 from pebblo.log import get_logger
 
@@ -25,15 +23,28 @@ AWS_ACCESS_KEY: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
 
 
-# Bedrock client initialization if using Bedrock backend
+# Bedrock client, created on first use when using the Bedrock backend
 bedrock_client: Optional[Any] = None
-if BACKEND.lower() == "bedrock":
-    bedrock_client = boto3_client(
-        service_name="bedrock-runtime",
-        region_name=AWS_REGION,
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-    )
+_bedrock_client_lock = threading.Lock()
+
+
+def get_bedrock_client() -> Any:
+    """
+    Return the Bedrock runtime client, boto3 is only imported when the Bedrock backend is used.
+    """
+    global bedrock_client
+    if bedrock_client is None:
+        with _bedrock_client_lock:
+            if bedrock_client is None:
+                from boto3 import client as boto3_client
+
+                bedrock_client = boto3_client(
+                    service_name="bedrock-runtime",
+                    region_name=AWS_REGION,
+                    aws_access_key_id=AWS_ACCESS_KEY,
+                    aws_secret_access_key=AWS_SECRET_KEY,
+                )
+    return bedrock_client
 
 
 class SingletonMeta(type):
@@ -42,11 +53,14 @@ class SingletonMeta(type):
     """
 
     _instances: Dict[type, Any] = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args: Any, **kwargs: Any) -> Any:
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with SingletonMeta._lock:
+                if cls not in cls._instances:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
         return cls._instances[cls]
 
 
@@ -56,58 +70,79 @@ class TextGeneration(metaclass=SingletonMeta):
     """
 
     def __init__(self) -> None:
-        # Hugging Face login if token is provided
+        # Hugging Face login if token is provided, skipped when the hub is switched offline
         huggingface_token: Optional[str] = os.getenv("HF_TOKEN")
-        if huggingface_token:
+        if huggingface_token and os.getenv("HF_HUB_OFFLINE") != "1":
+            from huggingface_hub import login
+
             login(token=huggingface_token)
 
-    def _call_vllm(self, message: List[Dict[str, Union[str, Any]]]) -> Dict[str, Any]:
+    def _call_vllm(
+        self,
+        message: List[Dict[str, Union[str, Any]]],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
         Args:
            message (List[Dict[str, Union[str, Any]]]): List of messages for the LLM.
+           timeout (Optional[float]): Seconds to wait for the response, no limit if None.
         Returns:
            Dict[str, Any]: Response from the vLLM API.
         """
+        # litellm takes seconds to import, it is only loaded once an LLM is actually called
+        from litellm import completion
+
         response = completion(
             model=f"hosted_vllm/{MODEL_NAME}",
             messages=message,
             temperature=0,
             api_base=API_BASE_URL,
+            timeout=timeout,
         )
         return response.json()
 
     def _call_bedrock(
-        self, message: List[Dict[str, Union[str, Any]]]
+        self,
+        message: List[Dict[str, Union[str, Any]]],
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Args:
             message (List[Dict[str, Union[str, Any]]]): List of messages for the LLM.
+            timeout (Optional[float]): Seconds to wait for the response, no limit if None.
         Returns:
             Dict[str, Any]: Response from the Bedrock API.
         """
+        from litellm import completion
+
         response = completion(
             model=f"{os.environ.get('MODEL_NAME')}",
             messages=message,
             temperature=0,
             custom_llm_provider="bedrock",
-            aws_bedrock_client=bedrock_client,
+            aws_bedrock_client=get_bedrock_client(),
+            timeout=timeout,
         )
         return response.json()
 
     def generate(
-        self, message: List[Dict[str, Union[str, Any]]], bool_return_json: bool = True
+        self,
+        message: List[Dict[str, Union[str, Any]]],
+        bool_return_json: bool = True,
+        timeout: Optional[float] = None,
     ) -> Union[str, None]:
         """
         Args:
             message (List[Dict[str, Union[str, Any]]]): List of messages for the LLM.-            bool_return_json (bool): Whether to return repaired JSON.
+            timeout (Optional[float]): Seconds to wait for the response, no limit if None.
         Returns:
             Union[str, None]: Generated text or error message.
         """
         try:
             if BACKEND.lower() == "bedrock":
-                response = self._call_bedrock(message)
+                response = self._call_bedrock(message, timeout)
             else:
-                response = self._call_vllm(message)
+                response = self._call_vllm(message, timeout)
             # Extract text from the response
             text: str = (
                 response.get("choices", [{}])[0].get("message", {}).get("content", "")
@@ -7,8 +7,6 @@ from typing import List, Tuple
 
 from fastapi import APIRouter, Form, Response, UploadFile
 from fastapi.responses import JSONResponse
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from unstructured.partition.auto import partition
 
 from pebblo.app.api.api import App
 from pebblo.app.api.req_models import Framework, ReqDiscover, ReqLoaderDoc, Runtime
@@ -116,6 +114,9 @@ def extract_text(file_path: str) -> str:
     Returns:
         str: Extracted text content.
     """
+    # unstructured is heavy and only needed by this endpoint, import it on first use
+    from unstructured.partition.auto import partition
+
     # Use Unstructured for files
     elements = partition(file_path, infer_table_structure=True, strategy="hi_res")
     return " ".join(element.text for element in elements if element.text)
@@ -158,6 +159,8 @@ def parse_files(file_paths: List[str]) -> Tuple[str, str]:
     )
     app.discover_direct(data=app_discover)
 
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50)
 
     for idx, file_path in enumerate(file_paths):
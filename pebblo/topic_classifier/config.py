@@ -9,6 +9,17 @@ TOPIC_CONFIDENCE_SCORE = 0.60
 # Minimum length of input text in characters
 TOPIC_MIN_TEXT_LENGTH = 16
 
+# Texts longer than this many characters, i.e. more than the 512 tokens seen by the model,
+# are classified in overlapping windows and the topic scores of the windows are aggregated
+TOPIC_WINDOW_SIZE = 2000
+TOPIC_WINDOW_OVERLAP = 200
+
+# Maximum number of windows classified per text, evenly spread over longer texts
+TOPIC_MAX_WINDOWS = 64
+
+# Number of windows classified by the model at once
+TOPIC_WINDOW_BATCH_SIZE = 8
+
 # Topics to exclude from the classification results
 TOPICS_TO_EXCLUDE = ["NORMAL_TEXT"]
 
@@ -0,0 +1,125 @@
+"""
+ONNX Runtime inference backend of the topic classifier, enabled by `classifier.topicBackend: onnx`.
+
+The pinned model revision is exported to ONNX once, optionally quantized to int8 with dynamic
+quantization, and kept in `<bundleDir>/onnx/<revision>/`, later starts load the exported model directly.
+`pebblo models prefetch` exports it into the versioned bundle instead, for offline and read-only deployments.
+Needs the `onnx` extra, i.e. `pip install pebblo[onnx]`.
+"""
+
+import contextlib
+import fcntl
+import os
+import platform
+import shutil
+import tempfile
+from typing import Iterator, Optional
+
+ONNX_DIR = "onnx"
+ONNX_FILE_NAME = "model.onnx"
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def get_export_path(export_root: str, revision: str, quantize: bool) -> str:
+    """Directory of the ONNX export of a model revision."""
+    return os.path.join(export_root, ONNX_DIR, revision, "int8" if quantize else "fp32")
+
+
+def _get_quantization_config():
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    # Dynamic quantization needs no calibration data, weights are int8 and activations quantized on the fly
+    if platform.machine().lower() in ["arm64", "aarch64"]:
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+
+def export_onnx_model(
+    model_path: str,
+    export_path: str,
+    revision: Optional[str] = None,
+    quantize: bool = False,
+) -> str:
+    """
+    Export a sequence classification model to ONNX, unless it was exported before.
+
+    :param model_path: Hugging Face repository or local directory of the model
+    :param export_path: Directory the ONNX model is written to
+    :param revision: Model revision to export, for a Hugging Face repository
+    :param quantize: Quantize the exported model to int8
+    :return: File name of the ONNX model in export_path
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+
+    file_name = QUANTIZED_FILE_NAME if quantize else ONNX_FILE_NAME
+    if os.path.exists(os.path.join(export_path, file_name)):
+        return file_name
+
+    os.makedirs(os.path.dirname(export_path), exist_ok=True)
+    with _export_lock(export_path):
+        # Another process may have finished the export while this one waited for the lock
+        if os.path.exists(os.path.join(export_path, file_name)):
+            return file_name
+
+        # Export into a staging directory of its own so an interrupted export is never loaded
+        staging_path = tempfile.mkdtemp(
+            prefix=f"{os.path.basename(export_path)}.",
+            suffix=".partial",
+            dir=os.path.dirname(export_path),
+        )
+        try:
+            model = ORTModelForSequenceClassification.from_pretrained(
+                model_path, revision=revision, export=True
+            )
+            model.save_pretrained(staging_path)
+            if quantize:
+                quantizer = ORTQuantizer.from_pretrained(
+                    staging_path, file_name=ONNX_FILE_NAME
+                )
+                quantizer.quantize(
+                    save_dir=staging_path,
+                    quantization_config=_get_quantization_config(),
+                )
+            shutil.rmtree(export_path, ignore_errors=True)
+            os.replace(staging_path, export_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+    return file_name
+
+
+@contextlib.contextmanager
+def _export_lock(export_path: str) -> Iterator[None]:
+    """Exclusive lock serializing the export of one model across processes."""
+    with open(f"{export_path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_onnx_model(
+    model_path: str,
+    export_path: str,
+    revision: Optional[str] = None,
+    quantize: bool = False,
+    intra_op_threads: int = 0,
+):
+    """
+    Return the ONNX Runtime model of a sequence classification model, exported first if needed.
+
+    :param intra_op_threads: Threads used by one inference, 0 lets ONNX Runtime use one per physical core
+    """
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    file_name = export_onnx_model(model_path, export_path, revision, quantize)
+    session_options = onnxruntime.SessionOptions()
+    if intra_op_threads > 0:
+        session_options.intra_op_num_threads = intra_op_threads
+    return ORTModelForSequenceClassification.from_pretrained(
+        export_path,
+        file_name=file_name,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+    )
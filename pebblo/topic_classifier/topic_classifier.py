@@ -5,20 +5,32 @@ Defines the TopicClassifier class with methods for predicting topics and extract
 
 import os
 import re
-
-from huggingface_hub import login
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+from itertools import islice
 
 from pebblo.app.config.config import var_server_config_dict
+from pebblo.app.config.utils import DEFAULT_MODEL_BUNDLE_DIR, expand_path
+from pebblo.app.enums.common import TopicBackend
+from pebblo.app.libs.classification_cache import (
+    get_cache_key,
+    get_classification_cache,
+    get_fingerprint,
+)
+from pebblo.app.libs.model_bundle import get_offline_bundle
+from pebblo.app.libs.text_windows import chunked, count_windows, split_windows
+from pebblo.app.utils.version import get_pebblo_version
 from pebblo.log import get_logger
-from pebblo.text_generation.text_generation import TextGeneration
+from pebblo.text_generation.text_generation import MODEL_NAME, TextGeneration
 from pebblo.topic_classifier.config import (
     CLASSIFIER_PATH,
     MODEL_REVISION,
     TOKENIZER_PATH,
     TOPIC_CLASS_REGEX_STR,
     TOPIC_CONFIDENCE_SCORE,
+    TOPIC_MAX_WINDOWS,
     TOPIC_MIN_TEXT_LENGTH,
+    TOPIC_WINDOW_BATCH_SIZE,
+    TOPIC_WINDOW_OVERLAP,
+    TOPIC_WINDOW_SIZE,
     TOPICS_TO_EXCLUDE,
 )
 from pebblo.topic_classifier.enums.constants import topic_display_names
@@ -39,21 +51,47 @@ class TopicClassifier:
 
     def __init__(self):
         # Use os.environ.get() to retrieve the value of the environment variable
-        self.use_llm = config_details.get("classifier", {}).get("use_llm", False)
+        classifier_config = config_details.get("classifier", {})
+        self.use_llm = classifier_config.get("use_llm", False)
+        self.backend = classifier_config.get("topicBackend", TopicBackend.PYTORCH.value)
+        self.quantize = classifier_config.get("topicQuantize", False)
         self.txt_gen = TextGeneration()
+        offline_bundle = get_offline_bundle()
         huggingface_token = os.environ.get("HF_TOKEN")
 
-        # Check if the environment variable exists
-        if huggingface_token is not None:
+        # Check if the environment variable exists, no login is needed when models come from the offline bundle
+        if huggingface_token is not None and offline_bundle is None:
+            from huggingface_hub import login
+
             login(token=huggingface_token)
-        if self.use_llm is False:
-            # Load the model and tokenizer from the specified paths and revision
-            _tokenizer = AutoTokenizer.from_pretrained(
-                TOKENIZER_PATH, revision=MODEL_REVISION
+        if self.use_llm is False and self.backend == TopicBackend.ONNX.value:
+            self.classifier = self._get_onnx_classifier(
+                offline_bundle, classifier_config
             )
-            _model = AutoModelForSequenceClassification.from_pretrained(
-                CLASSIFIER_PATH, revision=MODEL_REVISION
+        elif self.use_llm is False:
+            # transformers is only needed for the local model, not in LLM mode
+            from transformers import (
+                AutoModelForSequenceClassification,
+                AutoTokenizer,
+                pipeline,
             )
+
+            if offline_bundle:
+                # Load the model and tokenizer from the prefetched bundle snapshot
+                _tokenizer = AutoTokenizer.from_pretrained(
+                    offline_bundle.topic_tokenizer_path, local_files_only=True
+                )
+                _model = AutoModelForSequenceClassification.from_pretrained(
+                    offline_bundle.topic_classifier_path, local_files_only=True
+                )
+            else:
+                # Load the model and tokenizer from the specified paths and revision
+                _tokenizer = AutoTokenizer.from_pretrained(
+                    TOKENIZER_PATH, revision=MODEL_REVISION
+                )
+                _model = AutoModelForSequenceClassification.from_pretrained(
+                    CLASSIFIER_PATH, revision=MODEL_REVISION
+                )
             self.classifier = pipeline(
                 "text-classification",
                 model=_model,
@@ -62,14 +100,87 @@ class TopicClassifier:
                 max_length=512,
                 return_all_scores=True,
             )
+        self.cache = get_classification_cache()
+        self.cache_fingerprint = self._get_fingerprint()
+        if self.cache is not None:
+            self.cache.register_fingerprint("topic", self.cache_fingerprint)
+
+    def _get_onnx_classifier(self, offline_bundle, classifier_config: dict):
+        """
+        Text classification pipeline running the pinned model revision with ONNX Runtime.
+        """
+        from optimum.pipelines import pipeline
+        from transformers import AutoTokenizer
+
+        from pebblo.topic_classifier.onnx_backend import (
+            get_export_path,
+            load_onnx_model,
+        )
+
+        if offline_bundle:
+            # The model is exported from the prefetched bundle snapshot, without network access,
+            # into the bundle itself unless `pebblo models prefetch` already did
+            _tokenizer = AutoTokenizer.from_pretrained(
+                offline_bundle.topic_tokenizer_path, local_files_only=True
+            )
+            model_path, revision = offline_bundle.topic_classifier_path, None
+            export_root = offline_bundle.path
+        else:
+            _tokenizer = AutoTokenizer.from_pretrained(
+                TOKENIZER_PATH, revision=MODEL_REVISION
+            )
+            model_path, revision = CLASSIFIER_PATH, MODEL_REVISION
+            export_root = expand_path(
+                classifier_config.get("bundleDir") or DEFAULT_MODEL_BUNDLE_DIR
+            )
+        export_path = get_export_path(export_root, MODEL_REVISION, self.quantize)
+        _model = load_onnx_model(
+            model_path,
+            export_path,
+            revision=revision,
+            quantize=self.quantize,
+            intra_op_threads=classifier_config.get("topicThreads", 0),
+        )
+        logger.info(
+            f"Topic classifier running with ONNX Runtime, {'int8' if self.quantize else 'fp32'} model "
+            f"from {export_path}"
+        )
+        return pipeline(
+            "text-classification",
+            model=_model,
+            tokenizer=_tokenizer,
+            accelerator="ort",
+            truncation=True,
+            max_length=512,
+            return_all_scores=True,
+        )
+
+    def _get_fingerprint(self) -> str:
+        """
+        Fingerprint of everything the classification result depends on, i.e. model and thresholds.
+        """
+        model = (CLASSIFIER_PATH, MODEL_REVISION)
+        if self.backend == TopicBackend.ONNX.value:
+            # ONNX Runtime scores differ slightly from PyTorch ones, int8 scores more so
+            model += (self.backend, self.quantize)
+        return get_fingerprint(
+            get_pebblo_version(),
+            MODEL_NAME if self.use_llm else model,
+            TOPIC_CONFIDENCE_SCORE,
+            TOPIC_MIN_TEXT_LENGTH,
+            TOPICS_TO_EXCLUDE,
+            topic_display_names,
+            (TOPIC_WINDOW_SIZE, TOPIC_WINDOW_OVERLAP, TOPIC_MAX_WINDOWS),
+        )
 
     def clean_class_name(self, label):
         match = re.search(TOPIC_CLASS_REGEX_STR, label, re.IGNORECASE)
         return match.group(0) if match else None
 
-    def predict(self, input_text):
+    def predict(self, input_text, use_cache: bool = True):
         """
         Perform topic classification on the input data.
+        Results are served from the classification cache when the same text was classified before.
         """
         try:
             # Check if the input text meets the minimum length requirement
@@ -80,60 +191,94 @@ class TopicClassifier:
                 )
                 return {}, 0, {}
 
-            if self.use_llm is False:
-                topic_model_response = self.classifier(input_text)
-                topics, total_count, topic_details = self._get_topics(
-                    topic_model_response
-                )
-                logger.debug(f"Topics: {topics}")
-                return topics, total_count, topic_details
-            else:
-                message = self.get_message(input_text)
-
-                op_classes = self.txt_gen.generate_classification(message)
-                if isinstance(op_classes, str):
-                    op_classes = self.clean_class_name(op_classes)
-                    if op_classes is None or op_classes.lower() == "other":
-                        return {}, 0, {}
-                    else:
-                        return (
-                            {op_classes.upper(): 1},
-                            1,
-                            {
-                                op_classes.upper(): [
-                                    {
-                                        "confidence_score": ConfidenceScoreLabel.MEDIUM.value
-                                    }
-                                ]
-                            },
-                        )
-                elif isinstance(op_classes, list):
-                    op_dict = {}
-                    op_conf = {}
-                    cnt_classes = 0
-                    for op_cls in op_classes:
-                        op_cls = self.clean_class_name(op_cls)
-                        if op_cls is not None and op_cls.lower() != "other":
-                            cnt_classes += 1
-                            op_dict[op_cls.upper()] = op_dict.get(op_cls.upper(), 0) + 1
-                            if op_cls not in op_conf.keys():
-                                op_conf[op_cls.upper()] = [
-                                    {
-                                        "confidence_score": ConfidenceScoreLabel.MEDIUM.value
-                                    }
-                                ]
-                            else:
-                                op_conf[op_cls.upper()].append(
-                                    {
-                                        "confidence_score": ConfidenceScoreLabel.MEDIUM.value
-                                    }
-                                )
-                    return op_dict, cnt_classes, op_conf
-                else:
-                    return {}, 0, {}
+            cache_key = None
+            if use_cache and self.cache is not None:
+                cache_key = get_cache_key(self.cache_fingerprint, input_text)
+                cached_result = self.cache.get("topic", cache_key)
+                if cached_result is not None:
+                    return tuple(cached_result)
+
+            result = self._predict(input_text)
         except Exception as e:
             logger.error(f"Error in topic_classifier. Exception: {e}")
             return {}, 0, {}
+        # Errors are not cached, a later request classifies the text again
+        if cache_key is not None:
+            self.cache.set("topic", self.cache_fingerprint, cache_key, result)
+        return result
+
+    def _predict(self, input_text):
+        if self.use_llm is False:
+            if len(input_text) > TOPIC_WINDOW_SIZE:
+                topic_model_response = self._classify_windows(input_text)
+            else:
+                topic_model_response = self.classifier(input_text)
+            topics, total_count, topic_details = self._get_topics(topic_model_response)
+            logger.debug(f"Topics: {topics}")
+            return topics, total_count, topic_details
+        else:
+            message = self.get_message(input_text)
+
+            op_classes = self.txt_gen.generate_classification(message)
+            if isinstance(op_classes, str):
+                op_classes = self.clean_class_name(op_classes)
+                if op_classes is None or op_classes.lower() == "other":
+                    return {}, 0, {}
+                else:
+                    return (
+                        {op_classes.upper(): 1},
+                        1,
+                        {
+                            op_classes.upper(): [
+                                {"confidence_score": ConfidenceScoreLabel.MEDIUM.value}
+                            ]
+                        },
+                    )
+            elif isinstance(op_classes, list):
+                op_dict = {}
+                op_conf = {}
+                cnt_classes = 0
+                for op_cls in op_classes:
+                    op_cls = self.clean_class_name(op_cls)
+                    if op_cls is not None and op_cls.lower() != "other":
+                        cnt_classes += 1
+                        op_dict[op_cls.upper()] = op_dict.get(op_cls.upper(), 0) + 1
+                        if op_cls not in op_conf.keys():
+                            op_conf[op_cls.upper()] = [
+                                {"confidence_score": ConfidenceScoreLabel.MEDIUM.value}
+                            ]
+                        else:
+                            op_conf[op_cls.upper()].append(
+                                {"confidence_score": ConfidenceScoreLabel.MEDIUM.value}
+                            )
+                return op_dict, cnt_classes, op_conf
+            else:
+                return {}, 0, {}
+
+    def _classify_windows(self, input_text):
+        """
+        Classify a text longer than the model input in overlapping windows, at most TOPIC_MAX_WINDOWS of them
+        evenly spread over the text. Returns the highest score of every topic across the windows, in the
+        response format of the model pipeline, so that a topic found in any part of the text is reported.
+        """
+        window_count = count_windows(
+            len(input_text), TOPIC_WINDOW_SIZE, TOPIC_WINDOW_OVERLAP
+        )
+        step = -(-window_count // TOPIC_MAX_WINDOWS)
+        windows = islice(
+            split_windows(input_text, TOPIC_WINDOW_SIZE, TOPIC_WINDOW_OVERLAP),
+            0,
+            None,
+            step,
+        )
+        scores = {}
+        for batch in chunked(windows, TOPIC_WINDOW_BATCH_SIZE):
+            for window_response in self.classifier([text for _, text in batch]):
+                for topic in window_response:
+                    scores[topic["label"]] = max(
+                        scores.get(topic["label"], 0.0), topic["score"]
+                    )
+        return [[{"label": label, "score": score} for label, score in scores.items()]]
 
     @staticmethod
     def _get_topics(topic_model_response):
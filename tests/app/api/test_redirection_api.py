@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from pebblo.app.routers.redirection_router import redirect_router_instance
+
+app = FastAPI()
+app.include_router(redirect_router_instance.router)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def mock_classification_engine():
+    with patch(
+        "pebblo.app.api.redirection_api.get_classification_engine"
+    ) as mock_engine:
+        yield mock_engine.return_value
+
+
+def test_health_endpoint():
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert "is running" in response.text
+
+
+def test_ready_endpoint_while_warming_up(mock_classification_engine):
+    mock_classification_engine.is_ready = False
+    response = client.get("/ready")
+    assert response.status_code == 503
+
+
+def test_ready_endpoint_after_warm_up(mock_classification_engine):
+    mock_classification_engine.is_ready = True
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert "is ready" in response.text
+
+
+def test_metrics_endpoint():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
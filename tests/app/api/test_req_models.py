@@ -0,0 +1,38 @@
+import pytest
+from pydantic import ValidationError
+
+from pebblo.app.api.req_models import ReqClassifier, ReqLoaderDoc, ReqPromptGov
+
+loader_doc = {
+    "name": "UnitTestApp",
+    "owner": "AppOwner",
+    "docs": [],
+    "plugin_version": "0.1.0",
+    "load_id": "a4f79ee7-42a7-48b5-9ab2-f7a9e0eab3b9",
+    "loader_details": {"loader": "CSVLoader", "source_type": "file"},
+    "loading_end": True,
+    "source_owner": "SourceOwner",
+    "classifier_location": "local",
+}
+
+
+@pytest.mark.parametrize(
+    "model, data",
+    [
+        (ReqLoaderDoc, {**loader_doc, "classifier_entities": ["us-ssn", "shoe-size"]}),
+        (ReqPromptGov, {"prompt": "My SSN is 222-85-4836", "entities": ["shoe-size"]}),
+        (ReqClassifier, {"data": "My SSN is 222-85-4836", "entities": ["shoe-size"]}),
+    ],
+)
+def test_unknown_entity_is_rejected(model, data):
+    # Rejected at request validation, FastAPI answers with 422 instead of failing in the service
+    with pytest.raises(ValidationError) as err_msg:
+        model(**data)
+    assert "Unknown entity 'shoe-size'" in str(err_msg.value)
+
+
+def test_entity_allow_list_is_accepted():
+    assert ReqLoaderDoc(
+        **loader_doc, classifier_entities=["pii-financial", "US_SSN"]
+    ).classifier_entities == ["pii-financial", "US_SSN"]
+    assert ReqPromptGov(prompt="My SSN is 222-85-4836").entities is None
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+
 import pytest
 
 from pebblo.app.config.models import (
+    ClassifierConfig,
     Config,
 )
 
@@ -39,6 +42,15 @@ def test_daemon_config_validate_invalid_port():
     assert error_msg in str(err_msg.value)
 
 
+def test_daemon_config_validate_invalid_workers():
+    config_json.update({"daemon": {"host": "localhost", "port": 8000, "workers": 0}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """daemon.workers
+  Value error, Error: Invalid workers '0'. workers must be greater than or equal to 1."""
+    assert error_msg in str(err_msg.value)
+
+
 def test_daemon_config_validate_invalid_host():
     config_json.update({"daemon": {"host": 123, "port": "8000"}})
     with pytest.raises(Exception) as err_msg:
@@ -70,7 +82,7 @@ def test_classifier_config_validate_invalid_mode():
     config_json.update({"classifier": {"mode": "123"}})
     with pytest.raises(Exception) as err_msg:
         Config.parse_obj(config_json)
-    error_msg = """Value error, Error: Unsupported classifier mode '123' specified in the configuration. Valid values are ['all', 'entity', 'topic'] [type=value_error, input_value='123', input_type=str]"""
+    error_msg = """Value error, Error: Unsupported classifier mode '123' specified in the configuration. Valid values are ['all', 'entity', 'topic', 'secrets'] [type=value_error, input_value='123', input_type=str]"""
     assert error_msg in str(err_msg.value)
 
 
@@ -95,7 +107,159 @@ def test_classifier_config_validate_invalid_values():
     )
     with pytest.raises(Exception) as err_msg:
         Config.parse_obj(config_json)
-    error_msg = """Value error, Error: Unsupported classifier mode 'false_value' specified in the configuration. Valid values are ['all', 'entity', 'topic'] [type=value_error, input_value='false_value', input_type=str]"""
+    error_msg = """Value error, Error: Unsupported classifier mode 'false_value' specified in the configuration. Valid values are ['all', 'entity', 'topic', 'secrets'] [type=value_error, input_value='false_value', input_type=str]"""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_invalid_replicas():
+    config_json.update({"classifier": {"mode": "all", "replicas": 0}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid replicas '0'. replicas must be greater than or equal to 1."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_invalid_concurrency():
+    config_json.update({"classifier": {"mode": "all", "maxConcurrency": 0}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid maxConcurrency '0'. maxConcurrency must be greater than or equal to 1."""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update({"classifier": {"mode": "all", "maxQueueSize": -1}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid maxQueueSize '-1'. maxQueueSize must be greater than or equal to 0."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_invalid_processes():
+    config_json.update({"classifier": {"mode": "all", "processes": -1}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid processes '-1'. processes must be greater than or equal to 0."""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update({"classifier": {"mode": "all", "batchSize": 0}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid batchSize '0'. batchSize must be greater than or equal to 1."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_invalid_cache_size():
+    config_json.update({"classifier": {"mode": "all", "cacheSize": -1}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid cacheSize '-1'. cacheSize must be greater than or equal to 0."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_invalid_window_size():
+    config_json.update({"classifier": {"mode": "all", "windowSize": 2000000}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid windowSize '2000000'. windowSize must be between 1 and 1000000."""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update({"classifier": {"mode": "all", "windowOverlap": -1}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid windowOverlap '-1'. windowOverlap must be greater than or equal to 0."""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update(
+        {"classifier": {"mode": "all", "windowSize": 1000, "windowOverlap": 501}}
+    )
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid windowOverlap '501'. windowOverlap must be at most half of windowSize, 500."""
+    assert error_msg in str(err_msg.value)
+
+    # The default overlap is reduced to fit a small window
+    assert ClassifierConfig(mode="all", windowSize=1000).windowOverlap == 500
+
+
+def test_classifier_config_validate_invalid_nlp_profile():
+    config_json.update({"classifier": {"mode": "all", "nlpProfile": "xl"}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Unsupported nlpProfile 'xl' specified in the configuration. Valid values are ['sm', 'md', 'lg', 'trf']"""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update({"classifier": {"mode": "all", "nlpProfile": "trf"}})
+    with patch("importlib.util.find_spec", return_value=None):
+        with pytest.raises(Exception) as err_msg:
+            Config.parse_obj(config_json)
+    error_msg = """Value error, Error: `nlpProfile: trf` was specified, but spacy-transformers was not found."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_topic_backend():
+    config_json.update({"classifier": {"mode": "all", "topicBackend": "tensorrt"}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Unsupported topicBackend 'tensorrt' specified in the configuration. Valid values are ['pytorch', 'onnx']"""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update({"classifier": {"mode": "all", "topicThreads": -1}})
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid topicThreads '-1'. topicThreads must be greater than or equal to 0."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_classifier_config_validate_secret_patterns():
+    secret_patterns = [{"name": "acme-token", "regex": r"\bacme_[a-z0-9]{32}\b"}]
+    config = {
+        "daemon": {"host": "localhost", "port": 8000},
+        "logging": {"level": "info"},
+        "reports": {"format": "pdf", "renderer": "xhtml2pdf"},
+        "classifier": {"mode": "all", "secretPatterns": secret_patterns},
+        "storage": {"type": "db"},
+    }
+    assert Config.parse_obj(config).classifier.secretPatterns == secret_patterns
+
+    config_json.update(
+        {
+            "classifier": {
+                "mode": "all",
+                "secretPatterns": [{"name": "acme-token", "regex": "acme_[a-z"}],
+            }
+        }
+    )
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid regex of secret pattern 'acme-token'."""
+    assert error_msg in str(err_msg.value)
+
+    config_json.update(
+        {
+            "classifier": {
+                "mode": "all",
+                "secretPatterns": [
+                    {"name": "acme-token", "regex": "acme_[a-z]+", "score": 2}
+                ],
+            }
+        }
+    )
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config_json)
+    error_msg = """Value error, Error: Invalid score '2' of secret pattern 'acme-token'. score must be between 0 and 1."""
+    assert error_msg in str(err_msg.value)
+
+
+def test_config_validate_workers_with_processes():
+    config = {
+        "daemon": {"host": "localhost", "port": 8000, "workers": 2},
+        "logging": {"level": "info"},
+        "reports": {"format": "pdf", "renderer": "xhtml2pdf"},
+        "classifier": {"mode": "all", "processes": 2},
+        "storage": {"type": "db"},
+    }
+    with pytest.raises(Exception) as err_msg:
+        Config.parse_obj(config)
+    error_msg = """Value error, Error: 'daemon.workers' and 'classifier.processes' can not be used together."""
     assert error_msg in str(err_msg.value)
 
 
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pytest
+
+from pebblo.app.config import service
+from pebblo.app.config.service import Service
+
+
+@pytest.fixture
+def pebblo_service():
+    pebblo_service = Service({"daemon": {"workers": 2}})
+
+    def spawn_worker(worker_id, config, sock):
+        pebblo_service._worker_start_times[worker_id] = service.time.monotonic()
+
+    with patch.object(pebblo_service, "_spawn_worker", side_effect=spawn_worker):
+        yield pebblo_service
+
+
+def crash_and_restart(pebblo_service, worker_id, clock):
+    """Let the worker of a slot exit, then restart it once its backoff elapsed."""
+    with patch.object(service.time, "monotonic", return_value=clock):
+        pebblo_service._schedule_restart(worker_id, pid=100, status=256)
+    restart_time = pebblo_service._pending_restarts.get(worker_id)
+    if restart_time is None:
+        return None
+    with patch.object(service.time, "monotonic", return_value=restart_time):
+        pebblo_service._restart_due_workers(config=None, sock=None)
+    return restart_time - clock
+
+
+def test_worker_restart_backoff_and_limit(pebblo_service):
+    clock = 1000.0
+    delays = []
+    for _ in range(service.WORKER_MAX_RESTARTS + 1):
+        delay = crash_and_restart(pebblo_service, 1, clock)
+        delays.append(delay)
+        clock += delay or 0
+
+    # Exponential backoff, then the slot is given up
+    assert delays == [1, 2, 4, 8, 16, None]
+    assert pebblo_service._spawn_worker.call_count == service.WORKER_MAX_RESTARTS
+    assert 1 not in pebblo_service._pending_restarts
+
+
+def test_worker_restart_delay_is_capped(pebblo_service):
+    with patch.object(service, "WORKER_MAX_RESTARTS", 10):
+        delays = [crash_and_restart(pebblo_service, 1, 1000.0) for _ in range(8)]
+    assert max(delays) == service.WORKER_RESTART_MAX_DELAY
+
+
+def test_worker_restart_count_resets_after_stable_uptime(pebblo_service):
+    clock = 1000.0
+    for _ in range(3):
+        clock += crash_and_restart(pebblo_service, 1, clock)
+    assert pebblo_service._worker_restarts[1] == 3
+
+    # A worker that stayed up long enough restarts its slot's backoff from the start
+    clock += service.WORKER_STABLE_UPTIME
+    assert crash_and_restart(pebblo_service, 1, clock) == 1
+    # Other slots keep their own count
+    assert crash_and_restart(pebblo_service, 2, clock) == 1
+
+
+def test_no_restart_while_stopping(pebblo_service):
+    crash_and_restart(pebblo_service, 1, 1000.0)
+    pebblo_service._schedule_restart(1, pid=101, status=256)
+    pebblo_service._stopping = True
+    with patch.object(service.time, "monotonic", return_value=2000.0):
+        pebblo_service._restart_due_workers(config=None, sock=None)
+    assert pebblo_service._spawn_worker.call_count == 1
@@ -0,0 +1,83 @@
+from pebblo.app.libs.classification_cache import (
+    ClassificationCache,
+    evictions_counter,
+    get_cache_key,
+    get_fingerprint,
+    hits_counter,
+    mark_degraded,
+    misses_counter,
+    track_degradation,
+)
+
+ENTITY_RESULT = (
+    {"us-ssn": 1},
+    1,
+    "My SSN is &lt;US_SSN&gt;",
+    {"us-ssn": [{"location": "10_24", "confidence_score": "HIGH"}]},
+)
+
+
+def test_cache_key_depends_on_text_options_and_fingerprint():
+    fingerprint = get_fingerprint("model-v1", {"threshold": 0.8})
+    key = get_cache_key(fingerprint, "My SSN is 123-45-6789", True)
+
+    assert key == get_cache_key(fingerprint, "My SSN is 123-45-6789", True)
+    assert key != get_cache_key(fingerprint, "My SSN is 123-45-6789", False)
+    assert key != get_cache_key(fingerprint, "My SSN is 123-45-6780", True)
+    other_fingerprint = get_fingerprint("model-v1", {"threshold": 0.7})
+    assert key != get_cache_key(other_fingerprint, "My SSN is 123-45-6789", True)
+
+
+def test_track_degradation():
+    # Outside of a tracked classification degradations are ignored
+    mark_degraded("llm_timeout")
+
+    with track_degradation() as outer_degradations:
+        with track_degradation() as degradations:
+            mark_degraded("llm_timeout")
+        with track_degradation() as other_degradations:
+            pass
+
+    assert degradations == ["llm_timeout"]
+    assert other_degradations == []
+    assert outer_degradations == ["llm_timeout"]
+
+
+def test_memory_cache_returns_copies_and_evicts_least_recently_used():
+    cache = ClassificationCache(max_entries=2)
+    evictions = evictions_counter.value()
+    cache.set("entity", "fp", "a", ENTITY_RESULT)
+    cache.set("entity", "fp", "b", ENTITY_RESULT)
+
+    cached_result = cache.get("entity", "a")
+    assert tuple(cached_result) == ENTITY_RESULT
+    cached_result[0]["us-ssn"] = 5
+    assert cache.get("entity", "a")[0] == {"us-ssn": 1}
+
+    # "b" is the least recently used entry
+    cache.set("entity", "fp", "c", ENTITY_RESULT)
+    assert cache.get("entity", "b") is None
+    assert cache.get("entity", "a") is not None
+    assert evictions_counter.value() == evictions + 1
+
+
+def test_disk_cache_is_shared_and_invalidated(tmp_path):
+    db_path = str(tmp_path / "cache" / "classification_cache.db")
+    ClassificationCache(db_path=db_path).set("entity", "fp-1", "key", ENTITY_RESULT)
+
+    disk_hits = hits_counter.value(classifier="entity", tier="disk")
+    cache = ClassificationCache(db_path=db_path)
+    assert tuple(cache.get("entity", "key")) == ENTITY_RESULT
+    assert hits_counter.value(classifier="entity", tier="disk") == disk_hits + 1
+
+    # A new fingerprint drops results computed with the old configuration
+    cache = ClassificationCache(db_path=db_path)
+    cache.register_fingerprint("topic", "fp-2")
+    cache.register_fingerprint("entity", "fp-1")
+    assert cache.get("entity", "key") is not None
+
+    cache = ClassificationCache(db_path=db_path)
+    cache.register_fingerprint("entity", "fp-2")
+    misses = misses_counter.value(classifier="entity")
+    assert cache.get("entity", "key") is None
+    assert misses_counter.value(classifier="entity") == misses + 1
@@ -0,0 +1,191 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pebblo.app.libs.classification_engine import (
+    InProcessClassificationEngine,
+    ProcessPoolClassificationEngine,
+)
+from pebblo.app.libs.classification_worker import ClassificationTask
+
+
+def fake_initializer(*args):
+    pass
+
+
+def fake_classify_batch(tasks):
+    results = []
+    for task in tasks:
+        if task.data == "crash":
+            # Simulate a native crash of the worker process
+            os._exit(1)
+        results.append({"data": task.data.upper(), "pid": os.getpid()})
+    return results
+
+
+def create_engine(**kwargs):
+    return ProcessPoolClassificationEngine(
+        initializer=fake_initializer, batch_classifier=fake_classify_batch, **kwargs
+    )
+
+
+class DummyTopicClassifier:
+    def predict(self, text):
+        return {"FINANCE": 1}, 1, {"FINANCE": [{"confidence_score": "HIGH"}]}
+
+
+class DummyEntityClassifier:
+    batch_sizes = []
+
+    def report_nlp_profile(self):
+        pass
+
+    def presidio_entity_classifier_and_anonymizer(
+        self, text, anonymize_snippets, secrets_only=False, entity_types=None
+    ):
+        anonymized = text.replace("123-45-6789", "&lt;US_SSN&gt;")
+        return (
+            {"us-ssn": 1},
+            1,
+            anonymized if anonymize_snippets else text,
+            {"us-ssn": [{"location": "10_21", "confidence_score": "HIGH"}]},
+        )
+
+    def classify_batch(
+        self, texts, anonymize_snippets, batch_size, secrets_only, entity_types
+    ):
+        self.batch_sizes.append((len(texts), batch_size, secrets_only, entity_types))
+        return [
+            self.presidio_entity_classifier_and_anonymizer(text, anonymize_snippets)
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def dummy_registry():
+    with (
+        patch(
+            "pebblo.app.libs.classifier_registry.TopicClassifier", DummyTopicClassifier
+        ),
+        patch(
+            "pebblo.app.libs.classifier_registry.EntityClassifier",
+            DummyEntityClassifier,
+        ),
+        patch("pebblo.app.libs.classifier_registry.warm_up_topic_classifier"),
+        patch("pebblo.app.libs.classifier_registry.warm_up_entity_classifier"),
+        patch("pebblo.app.libs.classifier_registry._registry", None),
+    ):
+        yield
+
+
+def test_in_process_engine_classifies_tasks(dummy_registry):
+    DummyEntityClassifier.batch_sizes.clear()
+    engine = InProcessClassificationEngine(nlp_batch_size=16)
+    results = engine.classify(
+        [
+            ClassificationTask("My SSN is 123-45-6789", anonymize_snippets=True),
+            ClassificationTask("My SSN is 123-45-6789", topics=False),
+            ClassificationTask(None),
+            ClassificationTask("My SSN is 123-45-6789", secrets_only=True),
+            ClassificationTask("My SSN is 123-45-6789", entity_types=("US_SSN",)),
+        ]
+    )
+    assert results[0]["data"] == "My SSN is &lt;US_SSN&gt;"
+    assert results[0]["entities"] == {"us-ssn": 1}
+    assert results[0]["topics"] == {"FINANCE": 1}
+    assert results[1]["data"] == "My SSN is 123-45-6789"
+    assert results[1]["topics"] == {}
+    assert results[1]["entityCount"] == 1
+    # Empty docs are not classified
+    assert results[2]["entityCount"] == 0
+    # Entities are classified in one batch per anonymization, secrets mode and entity allow-list setting
+    assert DummyEntityClassifier.batch_sizes == [
+        (1, 16, False, None),
+        (1, 16, False, ("US_SSN",)),
+        (1, 16, True, None),
+        (1, 16, False, None),
+    ]
+
+    assert engine.is_ready is False
+    engine.warm_up()
+    assert engine.is_ready is True
+
+
+def test_process_pool_engine_keeps_order_across_batches():
+    engine = create_engine(processes=2, batch_size=2)
+    try:
+        texts = [f"doc {index}" for index in range(7)]
+        results = engine.classify([ClassificationTask(text) for text in texts])
+        assert [result["data"] for result in results] == [t.upper() for t in texts]
+        assert all(result["pid"] != os.getpid() for result in results)
+    finally:
+        engine.shutdown()
+
+
+def test_process_pool_engine_isolates_crashing_document():
+    engine = create_engine(processes=1, batch_size=4)
+    try:
+        tasks = [ClassificationTask(text) for text in ["a", "crash", "b", "c", "d"]]
+        results = engine.classify(tasks)
+        assert [result["data"] for result in results] == ["A", "crash", "B", "C", "D"]
+        # The crashing document gets an empty classification result
+        assert results[1]["entityCount"] == 0
+        # The pool is usable again afterwards
+        assert engine.classify([ClassificationTask("e")])[0]["data"] == "E"
+    finally:
+        engine.shutdown()
+
+
+def classify_until_recycled(engine, old_pids, timeout=60):
+    """Keep classifying while a replacement process warms up, return the pids that classified."""
+    pids = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pids.append(engine.classify([ClassificationTask("x")])[0]["pid"])
+        # Never more than one process is replaced at a time
+        assert sum(slot.replacement is not None for slot in engine._slots) <= 1
+        if pids[-1] not in old_pids:
+            return pids
+        time.sleep(0.05)
+    raise AssertionError(f"None of the processes {old_pids} was recycled")
+
+
+def test_process_pool_engine_recycles_workers():
+    engine = create_engine(processes=1, batch_size=1, max_tasks_per_process=2)
+    try:
+        results = engine.classify([ClassificationTask(text) for text in "ab"])
+        pids = [result["pid"] for result in results]
+        assert pids[0] == pids[1]
+
+        # The old process keeps classifying until its replacement is ready
+        recycled_pids = classify_until_recycled(engine, {pids[0]})
+        assert set(recycled_pids[:-1]) <= {pids[0]}
+    finally:
+        engine.shutdown()
+
+
+def test_process_pool_engine_recycles_one_worker_at_a_time():
+    engine = create_engine(processes=2, batch_size=1, max_tasks_per_process=2)
+    try:
+        engine.warm_up()
+        results = engine.classify([ClassificationTask(text) for text in "abcd"])
+        old_pids = {result["pid"] for result in results}
+        assert len(old_pids) == 2
+
+        classify_until_recycled(engine, old_pids)
+        assert len({slot.executor for slot in engine._slots}) == 2
+    finally:
+        engine.shutdown()
+
+
+def test_process_pool_engine_warm_up():
+    engine = create_engine(processes=2)
+    try:
+        assert engine.is_ready is False
+        timings = engine.warm_up()
+        assert engine.is_ready is True
+        assert "classification_processes.load" in timings
+    finally:
+        engine.shutdown()
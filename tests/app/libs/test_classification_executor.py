@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from starlette.testclient import TestClient
+
+from pebblo.app.libs import classification_executor
+from pebblo.app.libs.classification_executor import (
+    ClassificationExecutor,
+    ClassificationQueueFull,
+    run_classification,
+)
+
+
+def test_executor_runs_function():
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=1)
+    assert executor.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+
+
+def test_executor_limits_concurrency_and_rejects_when_full():
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(timeout=5)
+        return "done"
+
+    running = executor.submit(blocking_task)
+    assert started.wait(timeout=5)
+    queued = executor.submit(lambda: "queued")
+    assert executor.queue_depth == 1
+
+    rejected_before = classification_executor.rejected_counter.value()
+    with pytest.raises(ClassificationQueueFull) as err:
+        executor.submit(lambda: "rejected")
+    assert err.value.retry_after >= 1
+    assert classification_executor.rejected_counter.value() == rejected_before + 1
+
+    release.set()
+    assert running.result(timeout=5) == "done"
+    assert queued.result(timeout=5) == "queued"
+    assert executor.queue_depth == 0
+    # Slots are released once the work is done
+    assert executor.submit(lambda: "accepted").result(timeout=5) == "accepted"
+
+
+def test_executor_cancelled_queued_task_leaves_queue():
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(timeout=5)
+
+    running = executor.submit(blocking_task)
+    assert started.wait(timeout=5)
+    queued = executor.submit(lambda: "queued")
+    assert executor.queue_depth == 1
+
+    # e.g. cancelled by asyncio.wrap_future when the client disconnects
+    assert queued.cancel()
+    release.set()
+    running.result(timeout=5)
+
+    assert executor.queue_depth == 0
+    assert executor.submit(lambda: "accepted").result(timeout=5) == "accepted"
+
+
+def test_executor_releases_slot_on_error():
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=0)
+    with pytest.raises(ValueError):
+        executor.submit(int, "not a number").result(timeout=5)
+    assert executor.submit(int, "7").result(timeout=5) == 7
+
+
+def test_executor_records_queue_wait_and_duration():
+    wait_count = classification_executor.queue_wait_histogram.count()
+    duration_count = classification_executor.duration_histogram.count()
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=0)
+    executor.submit(lambda: None).result(timeout=5)
+    assert classification_executor.queue_wait_histogram.count() == wait_count + 1
+    assert classification_executor.duration_histogram.count() == duration_count + 1
+
+
+def test_run_classification_responds_503_when_full(monkeypatch):
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=0)
+    monkeypatch.setattr(classification_executor, "_executor", executor)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_task():
+        started.set()
+        release.wait(timeout=5)
+
+    app = FastAPI()
+
+    @app.post("/classify")
+    async def classify():
+        return await run_classification(lambda: {"status": "ok"})
+
+    client = TestClient(app)
+    running = executor.submit(blocking_task)
+    assert started.wait(timeout=5)
+    try:
+        response = client.post("/classify")
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+    finally:
+        release.set()
+        running.result(timeout=5)
+
+    response = client.post("/classify")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_run_classification_raises_http_exception(monkeypatch):
+    executor = ClassificationExecutor(max_concurrency=1, max_queue_size=0)
+    monkeypatch.setattr(classification_executor, "_executor", executor)
+    release = threading.Event()
+    running = executor.submit(release.wait, 5)
+    try:
+        with pytest.raises(HTTPException) as err:
+            asyncio.run(run_classification(lambda: None))
+        assert err.value.status_code == 503
+    finally:
+        release.set()
+        running.result(timeout=5)
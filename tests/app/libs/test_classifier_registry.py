@@ -0,0 +1,156 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pebblo.app.libs.classifier_registry import (
+    ClassifierPool,
+    ClassifierRegistry,
+    get_classifier_registry,
+)
+
+
+class DummyClassifier:
+    created = 0
+    reported = 0
+
+    def __init__(self):
+        DummyClassifier.created += 1
+
+    def report_nlp_profile(self):
+        DummyClassifier.reported += 1
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    DummyClassifier.created = 0
+    DummyClassifier.reported = 0
+
+
+def test_pool_creates_replicas_lazily():
+    pool = ClassifierPool("dummy", DummyClassifier, size=2)
+    assert DummyClassifier.created == 0
+    assert pool.is_warm is False
+
+    with pool.borrow() as first:
+        assert isinstance(first, DummyClassifier)
+    # Returned replica is reused instead of building a new one
+    with pool.borrow() as second:
+        assert second is first
+    assert DummyClassifier.created == 1
+
+
+def test_pool_warm_up_builds_all_replicas():
+    pool = ClassifierPool("dummy", DummyClassifier, size=3)
+    pool.warm_up()
+    assert DummyClassifier.created == 3
+    assert pool.is_warm is True
+
+    # Warm up is idempotent
+    pool.warm_up()
+    assert DummyClassifier.created == 3
+
+
+def test_pool_borrow_is_exclusive():
+    pool = ClassifierPool("dummy", DummyClassifier, size=2)
+    with pool.borrow() as first, pool.borrow() as second:
+        assert first is not second
+    assert DummyClassifier.created == 2
+
+
+def test_pool_never_exceeds_size_under_contention():
+    pool = ClassifierPool("dummy", DummyClassifier, size=2)
+    in_use = set()
+    max_in_use = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(20):
+            with pool.borrow() as replica:
+                with lock:
+                    in_use.add(id(replica))
+                    max_in_use.append(len(in_use))
+                with lock:
+                    in_use.discard(id(replica))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert DummyClassifier.created <= 2
+    assert max(max_in_use) <= 2
+
+
+def test_registry_shares_instances():
+    with (
+        patch("pebblo.app.libs.classifier_registry.EntityClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.TopicClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.warm_up_entity_classifier"),
+        patch("pebblo.app.libs.classifier_registry.warm_up_topic_classifier"),
+        patch("pebblo.app.libs.classifier_registry._registry", None),
+    ):
+        registry = get_classifier_registry()
+        assert get_classifier_registry() is registry
+        registry.warm_up()
+        with registry.entity_classifier() as entity_classifier:
+            pass
+        with registry.entity_classifier() as entity_classifier_again:
+            assert entity_classifier_again is entity_classifier
+        assert DummyClassifier.created == 2
+
+
+def test_registry_replicas_from_argument():
+    with (
+        patch("pebblo.app.libs.classifier_registry.EntityClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.TopicClassifier", DummyClassifier),
+    ):
+        registry = ClassifierRegistry(replicas=2)
+        assert registry.entity_pool.size == 2
+        assert registry.topic_pool.size == 2
+
+
+def test_pool_warm_up_runs_inference_and_reports_timings():
+    warmed_up = []
+    pool = ClassifierPool(
+        "dummy", DummyClassifier, size=2, warm_up_inference=warmed_up.append
+    )
+    timings = pool.warm_up()
+    assert len(warmed_up) == 2
+    assert set(timings.keys()) == {"load", "inference"}
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_registry_warm_up_sets_ready():
+    with (
+        patch("pebblo.app.libs.classifier_registry.EntityClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.TopicClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.warm_up_entity_classifier"),
+        patch("pebblo.app.libs.classifier_registry.warm_up_topic_classifier"),
+    ):
+        registry = ClassifierRegistry(replicas=1)
+        assert registry.is_ready is False
+        timings = registry.warm_up()
+        assert registry.is_ready is True
+        assert set(timings.keys()) == {
+            "topic_classifier.load",
+            "topic_classifier.inference",
+            "entity_classifier.load",
+            "entity_classifier.inference",
+        }
+
+
+def test_registry_warm_up_reports_nlp_profile_once():
+    with (
+        patch("pebblo.app.libs.classifier_registry.EntityClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.TopicClassifier", DummyClassifier),
+        patch("pebblo.app.libs.classifier_registry.warm_up_entity_classifier"),
+        patch("pebblo.app.libs.classifier_registry.warm_up_topic_classifier"),
+    ):
+        registry = ClassifierRegistry(replicas=3)
+        registry.warm_up()
+        with registry.entity_classifier():
+            pass
+    assert DummyClassifier.created == 6
+    assert DummyClassifier.reported == 1
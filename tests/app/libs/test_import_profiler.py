@@ -0,0 +1,58 @@
+import sys
+import textwrap
+
+import pytest
+
+from pebblo.app.libs.import_profiler import ImportProfiler
+
+
+@pytest.fixture
+def sample_package(tmp_path, monkeypatch):
+    package_dir = tmp_path / "profiled_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("from profiled_pkg import heavy\n")
+    (package_dir / "heavy.py").write_text(
+        textwrap.dedent(
+            """
+            import time
+
+            payload = bytearray(8 * 1024 * 1024)
+            time.sleep(0.05)
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "profiled_pkg"
+    for name in ["profiled_pkg", "profiled_pkg.heavy"]:
+        sys.modules.pop(name, None)
+
+
+def test_records_cumulative_and_self_time(sample_package):
+    with ImportProfiler() as profiler:
+        __import__(sample_package)
+
+    assert profiler not in sys.meta_path
+    package = profiler.records["profiled_pkg"]
+    heavy = profiler.records["profiled_pkg.heavy"]
+    assert heavy.cumulative_time >= 0.05
+    assert package.cumulative_time >= heavy.cumulative_time
+    assert package.self_time < heavy.self_time
+    assert heavy.self_rss >= 4 * 1024 * 1024
+    assert profiler.total_time >= package.cumulative_time
+
+
+def test_report(sample_package):
+    with ImportProfiler() as profiler:
+        __import__(sample_package)
+
+    assert [record.name for record in profiler.top_modules(2)] == [
+        "profiled_pkg",
+        "profiled_pkg.heavy",
+    ]
+    package_summary = profiler.top_packages(1)[0]
+    assert package_summary.name == "profiled_pkg"
+    assert package_summary.modules == 2
+
+    report = profiler.report()
+    assert "Top 30 modules by cumulative import time" in report
+    assert "profiled_pkg.heavy" in report
@@ -0,0 +1,47 @@
+from pebblo.app.libs.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.")
+    counter.inc()
+    counter.inc(2, endpoint="classify")
+    gauge = registry.gauge("queue_depth", "Queue depth.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert counter.value() == 1
+    assert counter.value(endpoint="classify") == 2
+    assert gauge.value() == 1
+    # Registering an existing name returns the same metric
+    assert registry.counter("requests_total", "Requests.") is counter
+
+    output = registry.render()
+    assert "# TYPE requests_total counter" in output
+    assert "requests_total 1.0" in output
+    assert 'requests_total{endpoint="classify"} 2.0' in output
+    assert "# TYPE queue_depth gauge" in output
+    assert "queue_depth 1.0" in output
+
+
+def test_histogram_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    assert histogram.count() == 3
+    assert histogram.sum() == 3.55
+    output = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="1.0"} 2' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+    assert "latency_seconds_count 3" in output
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors.").inc(reason='bad "input"')
+    assert 'errors_total{reason="bad \\"input\\""} 1.0' in registry.render()
@@ -0,0 +1,164 @@
+import json
+import os
+from unittest.mock import patch
+
+import nltk
+import pytest
+import spacy
+
+from pebblo.app.libs import model_bundle
+from pebblo.topic_classifier.config import CLASSIFIER_PATH, MODEL_REVISION
+
+
+def fake_prefetch_spacy(model_name, target_dir):
+    os.makedirs(target_dir)
+    return {"name": model_name, "version": "3.7.1"}
+
+
+def fake_prefetch_nltk(target_dir):
+    os.makedirs(target_dir)
+    return {"packages": model_bundle.NLTK_PACKAGES}
+
+
+def fake_prefetch_huggingface(repo_id, target_dir):
+    os.makedirs(target_dir)
+    return {"revision": MODEL_REVISION}
+
+
+@pytest.fixture
+def mocked_prefetch():
+    with (
+        patch.object(model_bundle, "_prefetch_spacy", side_effect=fake_prefetch_spacy),
+        patch.object(model_bundle, "_prefetch_nltk", side_effect=fake_prefetch_nltk),
+        patch.object(
+            model_bundle,
+            "_prefetch_huggingface",
+            side_effect=fake_prefetch_huggingface,
+        ) as prefetch_huggingface,
+    ):
+        yield prefetch_huggingface
+
+
+def test_prefetch_writes_versioned_bundle(tmp_path, mocked_prefetch):
+    bundle_path = model_bundle.prefetch_models(str(tmp_path))
+
+    assert bundle_path == model_bundle.get_bundle_path(str(tmp_path))
+    assert not os.path.exists(f"{bundle_path}.partial")
+    with open(os.path.join(bundle_path, model_bundle.MANIFEST_FILE_NAME)) as f:
+        manifest = json.load(f)
+    assert manifest["bundle_format_version"] == model_bundle.BUNDLE_FORMAT_VERSION
+    assert manifest["assets"]["huggingface"][CLASSIFIER_PATH]["revision"] == (
+        MODEL_REVISION
+    )
+
+    bundle = model_bundle.load_bundle(bundle_path)
+    assert bundle.topic_classifier_path == os.path.join(
+        bundle_path, "huggingface", CLASSIFIER_PATH.replace("/", "--")
+    )
+    assert bundle.spacy_model_path == os.path.join(
+        bundle_path, "spacy", "en_core_web_lg"
+    )
+
+
+def test_prefetch_skips_existing_bundle(tmp_path, mocked_prefetch):
+    model_bundle.prefetch_models(str(tmp_path))
+    model_bundle.prefetch_models(str(tmp_path))
+    assert mocked_prefetch.call_count == 1
+
+    model_bundle.prefetch_models(str(tmp_path), force=True)
+    assert mocked_prefetch.call_count == 2
+
+
+def test_prefetch_exports_onnx_model(tmp_path, mocked_prefetch):
+    onnx_config = {"classifier": {"topicBackend": "onnx", "topicQuantize": True}}
+    with (
+        patch.object(model_bundle, "config_details", onnx_config),
+        patch(
+            "pebblo.topic_classifier.onnx_backend.export_onnx_model"
+        ) as export_onnx_model,
+    ):
+        bundle_path = model_bundle.prefetch_models(str(tmp_path))
+        model_bundle.prefetch_models(str(tmp_path))
+
+    staging_path = f"{bundle_path}.partial"
+    # A second prefetch keeps the bundle and only completes a missing export
+    assert export_onnx_model.call_args_list[0].args == (
+        os.path.join(staging_path, "huggingface", CLASSIFIER_PATH.replace("/", "--")),
+        os.path.join(staging_path, "onnx", MODEL_REVISION, "int8"),
+    )
+    assert export_onnx_model.call_args_list[1].args == (
+        model_bundle.load_bundle(bundle_path).topic_classifier_path,
+        os.path.join(bundle_path, "onnx", MODEL_REVISION, "int8"),
+    )
+
+
+def test_load_bundle_from_bundle_root(tmp_path, mocked_prefetch):
+    bundle_path = model_bundle.prefetch_models(str(tmp_path))
+    assert model_bundle.load_bundle(str(tmp_path)).path == bundle_path
+
+
+def test_load_bundle_missing_manifest(tmp_path):
+    with pytest.raises(FileNotFoundError, match="pebblo models prefetch"):
+        model_bundle.load_bundle(str(tmp_path))
+
+
+def test_load_bundle_stale_revision(tmp_path, mocked_prefetch):
+    bundle_path = model_bundle.prefetch_models(str(tmp_path))
+    manifest_path = os.path.join(bundle_path, model_bundle.MANIFEST_FILE_NAME)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["assets"]["huggingface"][CLASSIFIER_PATH]["revision"] = "main"
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match=MODEL_REVISION):
+        model_bundle.load_bundle(bundle_path)
+
+
+def test_load_bundle_other_nlp_profile(tmp_path, mocked_prefetch):
+    bundle_path = model_bundle.prefetch_models(str(tmp_path))
+
+    with patch.object(
+        model_bundle, "config_details", {"classifier": {"nlpProfile": "sm"}}
+    ):
+        with pytest.raises(ValueError, match="en_core_web_sm"):
+            model_bundle.load_bundle(bundle_path)
+
+
+def test_load_spacy_nlp_engine(tmp_path, mocked_prefetch):
+    bundle = model_bundle.load_bundle(model_bundle.prefetch_models(str(tmp_path)))
+    nlp = spacy.blank("en")
+    nlp.add_pipe("attribute_ruler")
+    # Stands in for the sentence boundaries of the dependency parser
+    nlp.add_pipe("sentencizer", name="senter")
+    nlp.to_disk(bundle.spacy_model_path)
+
+    nlp_engine = model_bundle.load_spacy_nlp_engine(bundle)
+
+    assert nlp_engine.models == [{"lang_code": "en", "model_name": "en_core_web_lg"}]
+    assert nlp_engine.nlp["en"].pipe_names == ["attribute_ruler"]
+
+
+def test_get_offline_bundle(tmp_path, mocked_prefetch):
+    bundle_path = model_bundle.prefetch_models(str(tmp_path))
+    with patch.object(model_bundle, "config_details", {"classifier": {}}):
+        assert model_bundle.get_offline_bundle() is None
+
+    classifier_config = {"offline": True, "bundleDir": str(tmp_path)}
+    with patch.object(
+        model_bundle, "config_details", {"classifier": classifier_config}
+    ):
+        assert model_bundle.get_offline_bundle().path == bundle_path
+
+
+def test_enable_offline_mode(tmp_path, mocked_prefetch, monkeypatch):
+    bundle = model_bundle.load_bundle(model_bundle.prefetch_models(str(tmp_path)))
+    for env_var in model_bundle.OFFLINE_ENV_VARS:
+        monkeypatch.delenv(env_var, raising=False)
+    monkeypatch.setattr(nltk.data, "path", list(nltk.data.path))
+
+    model_bundle.enable_offline_mode(bundle)
+
+    assert os.environ["HF_HUB_OFFLINE"] == "1"
+    assert os.environ["TRANSFORMERS_OFFLINE"] == "1"
+    assert nltk.data.path[0] == bundle.nltk_data_path
@@ -0,0 +1,101 @@
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
+from starlette.testclient import TestClient
+
+from pebblo.app.libs import classification_executor, recognizer_timings
+from pebblo.app.libs.classification_executor import (
+    ClassificationExecutor,
+    run_classification,
+)
+from pebblo.app.libs.recognizer_timings import (
+    collect_timings,
+    format_server_timing,
+    instrument_analyzer,
+    recognizer_duration_histogram,
+)
+from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.regex_nlp_engine import RegexNlpEngine
+
+
+def _analyzer() -> AnalyzerEngine:
+    recognizer = PatternRecognizer(
+        supported_entity="TICKET",
+        name="TicketRecognizer",
+        patterns=[Pattern("ticket", r"\bTCK-\d{4}\b", 0.6)],
+        context=["ticket"],
+    )
+    analyzer = AnalyzerEngine(
+        nlp_engine=RegexNlpEngine(),
+        context_aware_enhancer=EntityClassifier._get_context_aware_enhancer(),
+    )
+    analyzer.registry.recognizers = [recognizer]
+    return analyzer
+
+
+def test_instrument_analyzer():
+    analyzer = _analyzer()
+    instrument_analyzer(analyzer)
+    # Components shared with another analyzer engine are timed once
+    instrument_analyzer(analyzer)
+    stages = [
+        ("TicketRecognizer", "analyze"),
+        ("TicketRecognizer", "context"),
+        ("RegexNlpEngine", "nlp"),
+        ("LemmaContextAwareEnhancer", "context"),
+    ]
+    counts = {
+        (component, stage): recognizer_duration_histogram.count(
+            component=component, stage=stage
+        )
+        for component, stage in stages
+    }
+
+    with collect_timings() as timings:
+        results = analyzer.analyze(
+            text="see ticket TCK-1234", entities=["TICKET"], language="en"
+        )
+
+    assert [(r.entity_type, r.start, r.end) for r in results] == [("TICKET", 11, 19)]
+    assert set(timings) == set(stages)
+    for component, stage in stages:
+        assert (
+            recognizer_duration_histogram.count(component=component, stage=stage)
+            == counts[(component, stage)] + 1
+        )
+
+
+def test_format_server_timing():
+    timings = {
+        ("EmailRecognizer", "analyze"): 0.0004,
+        ("SpacyNlpEngine", "nlp"): 0.0352,
+    }
+
+    assert (
+        format_server_timing(timings)
+        == "SpacyNlpEngine.nlp;dur=35.2, EmailRecognizer.analyze;dur=0.4"
+    )
+
+
+def test_run_classification_server_timing_header(monkeypatch):
+    monkeypatch.setattr(
+        classification_executor,
+        "_executor",
+        ClassificationExecutor(max_concurrency=1, max_queue_size=0),
+    )
+    monkeypatch.setattr(recognizer_timings, "is_enabled", lambda: True)
+
+    def classify_request():
+        recognizer_timings.record("TicketRecognizer", "analyze", 0.002)
+        return JSONResponse(content={"status": "ok"})
+
+    app = FastAPI()
+
+    @app.post("/classify")
+    async def classify():
+        return await run_classification(classify_request)
+
+    response = TestClient(app).post("/classify")
+
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"] == "TicketRecognizer.analyze;dur=2.0"
@@ -0,0 +1,35 @@
+from pebblo.app.libs.text_windows import chunked, count_windows, split_windows
+
+
+def test_split_windows_covers_text_with_overlap():
+    text = " ".join(f"word{index}" for index in range(500))
+    windows = list(split_windows(text, 200, 50))
+
+    assert len(windows) > 1
+    assert len(windows) <= count_windows(len(text), 200, 50)
+    for offset, window in windows:
+        assert len(window) <= 200
+        assert text[offset : offset + len(window)] == window
+        # Windows are cut between words
+        assert offset == 0 or text[offset - 1] == " "
+        assert offset + len(window) == len(text) or text[offset + len(window)] == " "
+    # Consecutive windows overlap, so that the whole text is covered
+    for (offset, window), (next_offset, _) in zip(windows, windows[1:]):
+        assert offset < next_offset < offset + len(window)
+    assert windows[-1][0] + len(windows[-1][1]) == len(text)
+
+
+def test_split_windows_short_and_unbroken_text():
+    assert list(split_windows("short text", 200, 50)) == [(0, "short text")]
+    # Texts without whitespace are cut at the window size
+    windows = list(split_windows("x" * 250, 100, 10))
+    assert [(offset, len(window)) for offset, window in windows] == [
+        (0, 100),
+        (90, 100),
+        (180, 70),
+    ]
+
+
+def test_chunked():
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
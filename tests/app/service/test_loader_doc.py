@@ -88,7 +88,7 @@ def mock_read_json_file():
 @pytest.fixture
 def mock_topic_classifier_obj():
     with patch(
-        "pebblo.app.service.doc_helper.topic_classifier_obj"
+        "pebblo.app.libs.classifier_registry.TopicClassifier"
     ) as mock_topic_classifier:
         yield mock_topic_classifier
 
@@ -96,7 +96,7 @@ def mock_topic_classifier_obj():
 @pytest.fixture
 def mock_entity_classifier_obj():
     with patch(
-        "pebblo.app.service.doc_helper.topic_classifier_obj"
+        "pebblo.app.libs.classifier_registry.EntityClassifier"
     ) as mock_entity_classifier:
         yield mock_entity_classifier
 
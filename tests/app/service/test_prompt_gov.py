@@ -10,7 +10,10 @@ from pebblo.app.service.prompt_gov import PromptGov
 
 @pytest.fixture
 def mock_entity_classifier():
-    with patch("pebblo.app.service.prompt_gov.EntityClassifier") as mock:
+    with (
+        patch("pebblo.app.libs.classifier_registry.EntityClassifier") as mock,
+        patch("pebblo.app.libs.classifier_registry._registry", None),
+    ):
         yield mock
 
 
@@ -46,5 +49,46 @@ def test_process_request_success(mock_entity_classifier):
     assert response.__dict__ == expected_response.__dict__
 
 
+def test_process_request_entity_allow_list(mock_entity_classifier):
+    mock_entity_classifier_instance = mock_entity_classifier.return_value
+    mock_entity_classifier_instance.presidio_entity_classifier_and_anonymizer.return_value = (
+        {},
+        0,
+        "Sachin's SSN is 222-85-4836",
+        {},
+    )
+
+    data = {"prompt": "Sachin's SSN is 222-85-4836", "entities": ["secrets_and_tokens"]}
+    response = PromptGov(data).process_request()
+    assert response.status_code == 200
+    _, kwargs = (
+        mock_entity_classifier_instance.presidio_entity_classifier_and_anonymizer.call_args
+    )
+    assert "AWS_ACCESS_KEY" in kwargs["entity_types"]
+    assert "US_SSN" not in kwargs["entity_types"]
+
+    response = PromptGov({**data, "entities": ["shoe-size"]}).process_request()
+    assert response.status_code == 400
+
+
+def test_process_request_uses_classification_engine(mock_entity_classifier):
+    with patch(
+        "pebblo.app.service.prompt_gov.get_classification_engine"
+    ) as mock_engine:
+        mock_engine.return_value.classify.return_value = [
+            {"data": "prompt", "entities": {"us-ssn": 1}, "entityCount": 1}
+        ]
+        response = PromptGov(
+            {"prompt": "Sachin's SSN is 222-85-4836"}
+        ).process_request()
+
+    assert response.status_code == 200
+    (task,) = mock_engine.return_value.classify.call_args.args[0]
+    assert task.data == "Sachin's SSN is 222-85-4836"
+    assert task.topics is False
+    # With a process pool engine no classifier is built in the server process
+    mock_entity_classifier.assert_not_called()
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -1,11 +1,15 @@
+import os
+import sys
 import tempfile
 
+import pytest
 import toml
 
 from pebblo.app.utils.utils import (
     delete_directory,
     get_full_path,
     get_pebblo_server_version,
+    get_process_memory_usage,
 )
 
 
@@ -38,3 +42,15 @@ def test_delete_directory_dir_not_exist():
         "message": f"Application {app_name} does not exist.",
         "status_code": 404,
     }
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="reads /proc")
+def test_get_process_memory_usage():
+    memory_usage = get_process_memory_usage(os.getpid())
+    assert memory_usage["rss"] > 0
+    assert 0 < memory_usage["pss"] <= memory_usage["rss"]
+    assert "shared" in memory_usage
+
+
+def test_get_process_memory_usage_unknown_process():
+    assert get_process_memory_usage(-1) == {}
@@ -18,10 +18,10 @@ His UK IBAN Code is &lt;IBAN_CODE&gt;.
 ITIN number &lt;US_ITIN&gt;.
 AWS Access Key is: &lt;AWS_ACCESS_KEY&gt;
 AWS Secret Key is : &lt;AWS_SECRET_KEY&gt;Github Token is: &lt;GITHUB_TOKEN&gt;
-Google API key: zaCELgL0imfnc8mVLWwsAawjYr4Rx-Af50DDqtlx
+Google API key: &lt;HIGH_ENTROPY_SECRET&gt;
 Slack Token is: &lt;SLACK_TOKEN&gt;
 Slack Token - &lt;SLACK_TOKEN&gt;
-Google API key- KLzaSyB_tWrbmfWx8g2bzL7Vhq7znuTUn0JPKmY"
+Google API key- &lt;HIGH_ENTROPY_SECRET&gt;"
 My IP Address - &lt;IP_ADDRESS&gt;
 Azure client_secret is &lt;AZURE_CLIENT_SECRET&gt;
 """
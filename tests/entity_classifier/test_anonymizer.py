@@ -0,0 +1,75 @@
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer import AnonymizerEngine
+
+from pebblo.entity_classifier.utils.anonymizer import SpanAnonymizer
+
+
+def test_anonymize_escapes_text_and_locates_placeholders():
+    text = "SSN 222-85-4836 <b>and</b> card 4111111111111111 > x"
+    ssn_start = text.index("222")
+    card_start = text.index("4111")
+    results = [
+        RecognizerResult("CREDIT_CARD", card_start, card_start + 16, 1.0),
+        RecognizerResult("US_SSN", ssn_start, ssn_start + 11, 0.85),
+    ]
+
+    anonymized_text, locations = SpanAnonymizer().anonymize(text, results)
+
+    assert anonymized_text == (
+        "SSN &lt;US_SSN&gt; &lt;b&gt;and&lt;/b&gt; card &lt;CREDIT_CARD&gt; &gt; x"
+    )
+    assert [anonymized_text[start:end] for start, end in locations] == [
+        "&lt;CREDIT_CARD&gt;",
+        "&lt;US_SSN&gt;",
+    ]
+
+
+def test_anonymize_merges_overlapping_and_adjacent_spans():
+    text = "Call John Smith at 555-0100 now"
+    results = [
+        RecognizerResult("PERSON", 5, 9, 0.85),
+        RecognizerResult("PERSON", 10, 15, 0.85),
+        RecognizerResult("PHONE_NUMBER", 19, 27, 0.75),
+        RecognizerResult("US_BANK_NUMBER", 23, 27, 0.4),
+    ]
+
+    anonymized_text, locations = SpanAnonymizer().anonymize(text, results)
+
+    assert anonymized_text == "Call &lt;PERSON&gt; at &lt;PHONE_NUMBER&gt; now"
+    assert locations[0] == locations[1]
+    assert locations[2] == locations[3]
+    assert anonymized_text[slice(*locations[2])] == "&lt;PHONE_NUMBER&gt;"
+
+
+def test_anonymize_matches_presidio_anonymizer():
+    text = "Mail john@example.com or jane@example.com, SSN 222-85-4836 222-85-4836."
+    results = []
+    for value, entity_type in [
+        ("john@example.com", "EMAIL_ADDRESS"),
+        ("jane@example.com", "EMAIL_ADDRESS"),
+        ("example.com", "URL"),
+        ("222-85-4836 222-85-4836", "US_SSN"),
+    ]:
+        start = text.index(value)
+        results.append(RecognizerResult(entity_type, start, start + len(value), 0.8))
+
+    anonymized_text, _ = SpanAnonymizer().anonymize(text, results)
+
+    expected = AnonymizerEngine().anonymize(text=text, analyzer_results=results).text
+    assert anonymized_text == expected.replace("<", "&lt;").replace(">", "&gt;")
+
+
+def test_replace_rebuilds_anonymized_text_from_spans():
+    text = "Call John Smith at 555-0100 <now>"
+    results = [
+        RecognizerResult("PERSON", 5, 9, 0.85),
+        RecognizerResult("PERSON", 10, 15, 0.85),
+        RecognizerResult("PHONE_NUMBER", 19, 27, 0.75),
+    ]
+    anonymizer = SpanAnonymizer()
+    anonymized_text, _ = anonymizer.anonymize(text, results)
+
+    spans = [span[:3] for span in anonymizer.merge_spans(text, results)]
+
+    assert spans == [[5, 15, "PERSON"], [19, 27, "PHONE_NUMBER"]]
+    assert anonymizer.replace(text, spans)[0] == anonymized_text
@@ -1,4 +1,8 @@
+import math
+
 from pebblo.entity_classifier.custom_analyzer.calculate_entropy import (
+    calculate_entropies,
+    calculate_entropy,
     is_high_entropy_secret,
 )
 
@@ -7,3 +11,13 @@ def test_is_high_entropy_secret():
     # Test for string with a single character (e.g., "a")
     assert is_high_entropy_secret("aaaaaaa") is False
     assert is_high_entropy_secret("a1b2c3d4e5ase456/AEQ=") is True
+
+
+def test_calculate_entropies_matches_calculate_entropy():
+    values = ["", "aaaaaaa", "a1b2c3d4e5ase456/AEQ=", "pässwörd€", "ab" * 50]
+    entropies = calculate_entropies(values)
+
+    assert entropies.shape == (len(values),)
+    for value, entropy in zip(values, entropies):
+        assert math.isclose(entropy, calculate_entropy(value), abs_tol=1e-9)
+    assert calculate_entropies([]).shape == (0,)
@@ -0,0 +1,41 @@
+from presidio_analyzer import RecognizerResult
+
+from pebblo.entity_classifier.utils.checksum_validation import (
+    filter_checksum_failures,
+    rejections_counter,
+)
+
+
+def get_result(text, value, entity_type):
+    start = text.index(value)
+    return RecognizerResult(entity_type, start, start + len(value), 0.85)
+
+
+def test_filter_checksum_failures():
+    text = (
+        "Card 4111 1111 1111 1111 or 4111 1111 1111 1112, SSN 222-85-4836 or 219-09-9999, "
+        "ITIN 993-77-0690, routing 021000021 or 021000022, IBAN GB82 WEST 1234 5698 7654 33, "
+        "account 12345678."
+    )
+    valid = [
+        get_result(text, "4111 1111 1111 1111", "CREDIT_CARD"),
+        get_result(text, "222-85-4836", "US_SSN"),
+        get_result(text, "993-77-0690", "US_ITIN"),
+        get_result(text, "021000021", "ROUTING_NUMBER"),
+        # No checksum for bank account numbers
+        get_result(text, "12345678", "US_BANK_NUMBER"),
+    ]
+    invalid = [
+        get_result(text, "4111 1111 1111 1112", "CREDIT_CARD"),
+        # Numbers reserved for advertising are not valid SSNs
+        get_result(text, "219-09-9999", "US_SSN"),
+        get_result(text, "993-77-0690", "US_SSN"),
+        get_result(text, "021000022", "ROUTING_NUMBER"),
+        get_result(text, "GB82 WEST 1234 5698 7654 33", "IBAN_CODE"),
+    ]
+    rejections = rejections_counter.value(entity="US_SSN")
+
+    results = filter_checksum_failures(text, valid + invalid)
+
+    assert results == valid
+    assert rejections_counter.value(entity="US_SSN") == rejections + 2
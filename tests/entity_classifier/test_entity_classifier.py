@@ -1,6 +1,11 @@
+from unittest.mock import patch
+
 import pytest
 
+from pebblo.app.libs.classification_cache import ClassificationCache, mark_degraded
 from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.config import get_entity_types
+from pebblo.entity_classifier.utils.regex_nlp_engine import RegexNlpEngine
 from tests.entity_classifier.mock_response import (
     mock_input_text1_anonymize_snippet_true,
     mock_input_text2_anonymize_snippet_true,
@@ -151,8 +156,9 @@ def test_entity_classifier_and_anonymizer2(entity_classifier):
         "slack-token": 2,
         "ip-address": 1,
         "azure-client-secret": 1,
+        "high-entropy-secret": 2,
     }
-    assert total_count == 13
+    assert total_count == 15
     assert anonymized_text == input_text2
     assert entity_details == {
         "us-ssn": [
@@ -244,6 +250,18 @@ def test_entity_classifier_and_anonymizer2(entity_classifier):
                 "entity_group": "secrets_and_tokens",
             }
         ],
+        "high-entropy-secret": [
+            {
+                "location": "1678_1718",
+                "confidence_score": "HIGH",
+                "entity_group": "secrets_and_tokens",
+            },
+            {
+                "location": "1847_1886",
+                "confidence_score": "HIGH",
+                "entity_group": "secrets_and_tokens",
+            },
+        ],
     }
 
     (
@@ -267,8 +285,9 @@ def test_entity_classifier_and_anonymizer2(entity_classifier):
         "slack-token": 2,
         "ip-address": 1,
         "azure-client-secret": 1,
+        "high-entropy-secret": 2,
     }
-    assert total_count == 13
+    assert total_count == 15
     assert anonymized_text == mock_input_text2_anonymize_snippet_true
     assert entity_details == {
         "us-ssn": [
@@ -336,30 +355,42 @@ def test_entity_classifier_and_anonymizer2(entity_classifier):
         ],
         "slack-token": [
             {
-                "location": "1670_1689",
+                "location": "1657_1676",
                 "confidence_score": "HIGH",
                 "entity_group": "secrets_and_tokens",
             },
             {
-                "location": "1704_1723",
+                "location": "1691_1710",
                 "confidence_score": "HIGH",
                 "entity_group": "secrets_and_tokens",
             },
         ],
         "ip-address": [
             {
-                "location": "1797_1815",
+                "location": "1772_1790",
                 "confidence_score": "HIGH",
                 "entity_group": "pii-network",
             }
         ],
         "azure-client-secret": [
             {
-                "location": "1839_1866",
+                "location": "1814_1841",
                 "confidence_score": "HIGH",
                 "entity_group": "secrets_and_tokens",
             }
         ],
+        "high-entropy-secret": [
+            {
+                "location": "1613_1640",
+                "confidence_score": "HIGH",
+                "entity_group": "secrets_and_tokens",
+            },
+            {
+                "location": "1727_1754",
+                "confidence_score": "HIGH",
+                "entity_group": "secrets_and_tokens",
+            },
+        ],
     }
 
 
@@ -428,9 +459,183 @@ def test_entity_classifier_and_anonymizer_azure_secret(entity_classifier):
     assert entity_details == {
         "azure-client-secret": [
             {
-                "location": "430_457",
+                "location": "433_460",
                 "confidence_score": "HIGH",
                 "entity_group": "secrets_and_tokens",
             }
         ]
     }
+
+
+@pytest.mark.parametrize("anonymize_snippets", [False, True])
+def test_entity_classifier_classify_batch(entity_classifier, anonymize_snippets):
+    """
+    UT for classify_batch function, results must match the single text path
+    """
+    # Disable the cache, batch results must be computed and not served from the single text path
+    entity_classifier.cache = None
+    texts = [input_text1, negative_data, input_text2, tf_test_data, ""]
+    expected = [
+        entity_classifier.presidio_entity_classifier_and_anonymizer(
+            text, anonymize_snippets=anonymize_snippets
+        )
+        for text in texts
+    ]
+
+    results = entity_classifier.classify_batch(
+        texts, anonymize_snippets=anonymize_snippets, batch_size=2
+    )
+    assert results == expected
+
+
+@pytest.mark.parametrize("anonymize_snippets", [True, False])
+def test_entity_classifier_uses_classification_cache(
+    entity_classifier, anonymize_snippets
+):
+    """
+    UT for the classification cache, the same text and options are analyzed once and the text is
+    rebuilt from the input, it is never stored in the cache
+    """
+    entity_classifier.cache = ClassificationCache()
+    expected = entity_classifier.presidio_entity_classifier_and_anonymizer(
+        input_text1, anonymize_snippets=anonymize_snippets
+    )
+    (cached_value,) = entity_classifier.cache._entries.values()
+    assert "222-85-4836" not in cached_value
+    assert "Sachin" not in cached_value
+
+    with patch.object(entity_classifier, "analyze_response") as analyze_response:
+        assert (
+            entity_classifier.presidio_entity_classifier_and_anonymizer(
+                input_text1, anonymize_snippets=anonymize_snippets
+            )
+            == expected
+        )
+        assert entity_classifier.classify_batch([input_text1], anonymize_snippets) == [
+            expected
+        ]
+        analyze_response.assert_not_called()
+    entity_classifier.cache = None
+
+
+def test_entity_classifier_does_not_cache_degraded_results(entity_classifier):
+    """
+    UT for degraded results, e.g. after an LLM judgement timed out, they are not cached
+    """
+    entity_classifier.cache = ClassificationCache()
+    filter_analyzer_results = entity_classifier._filter_analyzer_results
+
+    def degraded_filter_analyzer_results(input_text, analyzer_results):
+        mark_degraded("judge_timeout")
+        return filter_analyzer_results(input_text, analyzer_results)
+
+    with patch.object(
+        entity_classifier,
+        "_filter_analyzer_results",
+        side_effect=degraded_filter_analyzer_results,
+    ):
+        expected = entity_classifier.presidio_entity_classifier_and_anonymizer(
+            input_text1, anonymize_snippets=True
+        )
+        assert entity_classifier.classify_batch([input_text1], True) == [expected]
+    assert len(entity_classifier.cache._entries) == 0
+
+    assert entity_classifier.classify_batch([input_text1], True) == [expected]
+    assert len(entity_classifier.cache._entries) == 1
+    entity_classifier.cache = None
+
+
+def test_entity_classifier_entity_allow_list(entity_classifier):
+    """
+    UT for entity allow-lists, only the recognizers of the requested entities run and spaCy is skipped
+    """
+    entity_classifier.cache = None
+    entity_types = get_entity_types(["pii-financial"])
+    entities, _, _, _ = entity_classifier.presidio_entity_classifier_and_anonymizer(
+        input_text2, entity_types=entity_types
+    )
+    assert entities
+    assert set(entities) <= {
+        "credit-card-number",
+        "us-bank-account-number",
+        "iban-code",
+        "us-itin",
+        "bank-routing-number",
+        "swift-code",
+        "bban-code",
+    }
+
+    # The pruned analyzer is cached per entity subset and needs no NLP pipeline
+    analyzer, _ = entity_classifier._get_analyzer(entity_types)
+    assert analyzer is entity_classifier._get_analyzer(entity_types)[0]
+    assert isinstance(analyzer.nlp_engine, RegexNlpEngine)
+    assert len(analyzer.registry.recognizers) < len(
+        entity_classifier.analyzer.registry.recognizers
+    )
+
+
+def test_entity_classifier_windowed_analysis(entity_classifier):
+    """
+    UT for windowed analysis of large texts, results must match the analysis of the whole text
+    """
+    entity_classifier.cache = None
+    expected = entity_classifier.presidio_entity_classifier_and_anonymizer(
+        input_text2, anonymize_snippets=True
+    )
+
+    entity_classifier.window_size = 400
+    entity_classifier.window_overlap = 150
+    with (
+        patch.object(
+            entity_classifier,
+            "_analyze_windows",
+            wraps=entity_classifier._analyze_windows,
+        ) as analyze_windows,
+        patch.object(
+            entity_classifier,
+            "_filter_analyzer_results",
+            wraps=entity_classifier._filter_analyzer_results,
+        ) as filter_analyzer_results,
+    ):
+        result = entity_classifier.presidio_entity_classifier_and_anonymizer(
+            input_text2, anonymize_snippets=True
+        )
+        assert entity_classifier.classify_batch(
+            [input_text2], anonymize_snippets=True
+        ) == [expected]
+    assert result == expected
+    assert analyze_windows.call_count == 2
+    # Overlapping entities are resolved once on the whole text, not per window
+    assert filter_analyzer_results.call_count == 2
+
+
+@pytest.mark.parametrize("window_overlap", [0, 10])
+def test_entity_classifier_windowed_analysis_keeps_edge_entities(
+    entity_classifier, window_overlap
+):
+    """
+    UT for windowed analysis, entities ending at a window cut at whitespace are not dropped
+    """
+    entity_classifier.cache = None
+    entity_classifier.window_size = 20
+    entity_classifier.window_overlap = window_overlap
+    input_text = "mail john@acme.com now, and later call the front desk about it"
+
+    entities, entity_count, _, _ = (
+        entity_classifier.presidio_entity_classifier_and_anonymizer(input_text)
+    )
+
+    assert entities == {"email-address": 1}
+    assert entity_count == 1
+
+
+def test_entity_classifier_fingerprint_includes_windows(entity_classifier):
+    """
+    UT for the cache fingerprint, cached results of other window settings are not served
+    """
+    fingerprint = entity_classifier._get_fingerprint()
+    with patch.object(entity_classifier, "window_size", 400):
+        assert entity_classifier._get_fingerprint() != fingerprint
+    with patch.object(entity_classifier, "window_overlap", 150):
+        assert entity_classifier._get_fingerprint() != fingerprint
+    assert entity_classifier._get_fingerprint() == fingerprint
@@ -0,0 +1,26 @@
+from pebblo.entity_classifier.custom_analyzer.high_entropy_analyzer import (
+    HighEntropySecretRecognizer,
+)
+
+
+def test_high_entropy_recognizer_no_match():
+    recognizer = HighEntropySecretRecognizer()
+    text = (
+        "Installed in /usr/local/lib/python3.11/site-packages at commit "
+        "a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6, see ConfigurationManager2023Version."
+    )
+
+    assert recognizer.analyze(text) == []
+    assert recognizer.analyze("") == []
+
+
+def test_high_entropy_recognizer_match():
+    recognizer = HighEntropySecretRecognizer()
+    token = "sk-proj-4f9Ab8XcQ2mN7pLr1ZyT0vKe"
+    text = f"export OPENAI_TOKEN={token}\nexport HOME=/home/user1\n"
+
+    results = recognizer.analyze(text)
+
+    assert len(results) == 1
+    assert results[0].entity_type == "HIGH_ENTROPY_SECRET"
+    assert text[results[0].start : results[0].end] == token
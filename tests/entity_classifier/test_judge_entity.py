@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from presidio_analyzer import RecognizerResult
+
+from pebblo.app.libs.classification_cache import track_degradation
+from pebblo.entity_classifier.utils import judge_entity
+from pebblo.entity_classifier.utils.judge_entity import judge_results
+
+TEXT = "Passport ID: 331410736 and routing number 021000022 for the account."
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    judge_entity._memo.clear()
+    yield
+    judge_entity._memo.clear()
+
+
+def get_groups():
+    return [
+        (
+            RecognizerResult("US_PASSPORT", 13, 22, 0.6),
+            RecognizerResult("US_DRIVER_LICENSE", 13, 22, 0.65),
+        ),
+        (
+            RecognizerResult("ROUTING_NUMBER", 42, 51, 0.6),
+            RecognizerResult("US_BANK_NUMBER", 42, 51, 0.4),
+        ),
+        (RecognizerResult("EMAIL_ADDRESS", 60, 65, 0.9),),
+    ]
+
+
+def get_text_generation(judgements):
+    text_generation = MagicMock()
+
+    def generate(messages, timeout=None):
+        prompt = messages[-1]["content"]
+        return json.dumps(
+            {
+                entity_type: judgement
+                for entity_type, judgement in judgements.items()
+                if f'"entity_type": "{entity_type}"' in prompt
+                or f"'entity_type': '{entity_type}'" in prompt
+            }
+        )
+
+    text_generation.generate.side_effect = generate
+    return text_generation
+
+
+def test_judge_results_keeps_correct_entities_once():
+    text_generation = get_text_generation(
+        {
+            "US_PASSPORT": "Correct",
+            "US_DRIVER_LICENSE": "Incorrect",
+            "ROUTING_NUMBER": "Correct",
+            "US_BANK_NUMBER": "Correct",
+        }
+    )
+    results = judge_results(TEXT, get_groups(), text_generation)
+
+    assert sorted(result.entity_type for result in results) == [
+        "EMAIL_ADDRESS",
+        "ROUTING_NUMBER",
+        "US_BANK_NUMBER",
+        "US_PASSPORT",
+    ]
+    assert text_generation.generate.call_count == 2
+    # The LLM call itself is bounded by the time budget of the judgements
+    assert text_generation.generate.call_args.kwargs["timeout"] == (
+        judge_entity.JUDGE_TIME_BUDGET
+    )
+
+    # Judgements of the same text window and candidates are memoized
+    assert len(judge_results(TEXT, get_groups(), text_generation)) == 4
+    assert text_generation.generate.call_count == 2
+
+
+def test_judge_results_runs_groups_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    text_generation = MagicMock()
+
+    def generate(messages, timeout=None):
+        # Both groups must be judged at the same time to pass the barrier
+        barrier.wait()
+        return json.dumps({"US_PASSPORT": "Correct", "ROUTING_NUMBER": "Correct"})
+
+    text_generation.generate.side_effect = generate
+    results = judge_results(TEXT, get_groups()[:2], text_generation)
+    assert sorted(result.entity_type for result in results) == [
+        "ROUTING_NUMBER",
+        "US_PASSPORT",
+    ]
+
+
+def test_judge_results_falls_back_to_highest_score():
+    text_generation = MagicMock()
+    text_generation.generate.side_effect = lambda messages, timeout=None: time.sleep(
+        0.5
+    )
+    with (
+        patch.object(judge_entity, "JUDGE_TIME_BUDGET", 0.1),
+        track_degradation() as degradations,
+    ):
+        results = judge_results(TEXT, get_groups()[:1], text_generation)
+    assert [result.entity_type for result in results] == ["US_DRIVER_LICENSE"]
+    # The fallback result is not to be cached
+    assert degradations == ["judge_timeout"]
+
+    # Failed judgements, e.g. an unreachable LLM, keep the highest scoring entities too
+    judge_entity._memo.clear()
+    text_generation.generate.side_effect = None
+    text_generation.generate.return_value = None
+    with track_degradation() as degradations:
+        results = judge_results(TEXT, get_groups()[1:2], text_generation)
+    assert [result.entity_type for result in results] == ["ROUTING_NUMBER"]
+    assert degradations == ["judge_error"]
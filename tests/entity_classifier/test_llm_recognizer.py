@@ -0,0 +1,119 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from pebblo.entity_classifier.custom_analyzer import llm_analyzer
+from pebblo.entity_classifier.custom_analyzer.llm_analyzer import LLMRecognizer
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    llm_analyzer._cache.clear()
+    yield
+    llm_analyzer._cache.clear()
+
+
+def get_recognizer(response, release=None):
+    recognizer = LLMRecognizer()
+    recognizer.text_gen_obj = MagicMock()
+
+    def generate(messages, timeout=None):
+        if release is not None:
+            release.wait(timeout=5)
+        return json.dumps(response)
+
+    recognizer.text_gen_obj.generate.side_effect = generate
+    return recognizer
+
+
+def get_entities(text, results):
+    return sorted((r.entity_type, text[r.start : r.end]) for r in results)
+
+
+def test_llm_recognizer_caches_chunks():
+    text = "Contact Jonathan Miller, his SSN is 222-85-4836."
+    recognizer = get_recognizer({"PERSON": ["Jonathan Miller"], "SSN": ["222-85-4836"]})
+
+    results = recognizer.analyze(text)
+    cached_results = recognizer.analyze(text)
+
+    assert get_entities(text, results) == [
+        ("LLM_PERSON", "Jonathan Miller"),
+        ("US_SSN", "222-85-4836"),
+    ]
+    assert get_entities(text, cached_results) == get_entities(text, results)
+    assert recognizer.text_gen_obj.generate.call_count == 1
+
+
+def test_llm_recognizer_packs_short_texts():
+    texts = [
+        "Jonathan Miller joined in March, his account number is 12345678.",
+        "The SSN on file is 222-85-4836, order 12345678 shipped.",
+        "Nothing to report here.",
+    ]
+    # Entities of the packed texts are returned by sentence number
+    recognizer = get_recognizer(
+        {
+            "1": {"PERSON": ["Jonathan Miller"], "BANK_ACCOUNT_NUMBER": ["12345678"]},
+            "2": {"SSN": ["222-85-4836"]},
+            "3": {"PERSON": [""]},
+        }
+    )
+
+    recognizer.prefetch(texts)
+    results = [recognizer.analyze(text) for text in texts]
+
+    # One prompt for the three texts, a value tagged in a text is not reported in the others
+    assert recognizer.text_gen_obj.generate.call_count == 1
+    assert [get_entities(text, r) for text, r in zip(texts, results)] == [
+        [("LLM_PERSON", "Jonathan Miller"), ("US_BANK_NUMBER", "12345678")],
+        [("US_SSN", "222-85-4836")],
+        [],
+    ]
+
+
+def test_llm_recognizer_pack_without_numbers():
+    texts = ["Jonathan Miller joined in March.", "The SSN on file is 222-85-4836."]
+    recognizer = get_recognizer({"PERSON": ["Jonathan Miller"], "SSN": ["222-85-4836"]})
+
+    recognizer.prefetch(texts)
+    for future in list(llm_analyzer._in_flight.values()):
+        future.result(timeout=5)
+
+    # An answer that can not be attributed to the packed texts is not cached
+    assert recognizer.text_gen_obj.generate.call_count == 1
+    assert len(llm_analyzer._cache) == 0
+
+
+def test_llm_recognizer_long_text_offsets():
+    text = "lorem ipsum " * 300 + "Contact Jonathan Miller today."
+    recognizer = get_recognizer({"PERSON": ["Jonathan Miller"]})
+
+    results = recognizer.analyze(text)
+
+    assert recognizer.text_gen_obj.generate.call_count == 2
+    assert get_entities(text, results) == [("LLM_PERSON", "Jonathan Miller")]
+
+
+def test_llm_recognizer_deadline(monkeypatch):
+    monkeypatch.setattr(llm_analyzer, "LLM_TIME_BUDGET", 0.1)
+    text = "Slow model server, Jonathan Miller."
+    release = threading.Event()
+    recognizer = get_recognizer({"PERSON": ["Jonathan Miller"]}, release)
+    timeouts = llm_analyzer.detections_counter.value(outcome="timeout")
+
+    try:
+        # Presidio results only once the deadline has passed
+        assert recognizer.analyze(text) == []
+        assert llm_analyzer.detections_counter.value(outcome="timeout") == timeouts + 1
+        in_flight = list(llm_analyzer._in_flight.values())
+    finally:
+        release.set()
+    # The call completes in the background and fills the cache
+    for future in in_flight:
+        future.result(timeout=5)
+    assert get_entities(text, recognizer.analyze(text)) == [
+        ("LLM_PERSON", "Jonathan Miller")
+    ]
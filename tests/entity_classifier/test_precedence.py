@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+from presidio_analyzer import RecognizerResult
+
+from pebblo.entity_classifier.utils.judge_entity import judge_results
+from pebblo.entity_classifier.utils.precedence import resolve_group
+
+
+def get_group(text, value, *entity_types):
+    start = text.index(value)
+    return tuple(
+        RecognizerResult(entity_type, start, start + len(value), 0.6)
+        for entity_type in entity_types
+    )
+
+
+def test_resolve_group_with_validators():
+    text = "Card 4111 1111 1111 1111, SSN 222-85-4836 and ITIN 993-77-0690."
+
+    group, resolved = resolve_group(
+        get_group(text, "4111 1111 1111 1111", "CREDIT_CARD", "US_BANK_NUMBER"), text
+    )
+    assert resolved
+    assert [entity.entity_type for entity in group] == ["CREDIT_CARD"]
+
+    group, resolved = resolve_group(
+        get_group(text, "993-77-0690", "US_SSN", "US_ITIN"), text
+    )
+    assert resolved
+    assert [entity.entity_type for entity in group] == ["US_ITIN"]
+
+    group, resolved = resolve_group(
+        get_group(text, "222-85-4836", "US_ITIN", "US_SSN"), text
+    )
+    assert resolved
+    assert [entity.entity_type for entity in group] == ["US_SSN"]
+
+
+def test_resolve_group_undecided():
+    # A number that is not Luhn valid may be a bank account number
+    text = "Account 4111 1111 1111 1112"
+    group = get_group(text, "4111 1111 1111 1112", "CREDIT_CARD", "US_BANK_NUMBER")
+    assert resolve_group(group, text) == (group, False)
+
+    # No rule for these types
+    text = "Passport ID: 331410736"
+    group = get_group(text, "331410736", "US_PASSPORT", "US_DRIVER_LICENSE")
+    assert resolve_group(group, text) == (group, False)
+
+
+def test_judge_results_skips_llm_for_resolved_groups():
+    text = "Card 4111 1111 1111 1111 and passport ID: 331410736"
+    text_generation = MagicMock()
+    text_generation.generate.return_value = '{"US_PASSPORT": "Correct"}'
+
+    results = judge_results(
+        text,
+        [
+            get_group(text, "4111 1111 1111 1111", "CREDIT_CARD", "US_BANK_NUMBER"),
+            get_group(text, "331410736", "US_PASSPORT", "US_DRIVER_LICENSE"),
+        ],
+        text_generation,
+    )
+    assert sorted(entity.entity_type for entity in results) == [
+        "CREDIT_CARD",
+        "US_PASSPORT",
+    ]
+    # Only the group the rules can not decide is sent to the LLM
+    assert text_generation.generate.call_count == 1
+    assert "331410736" in str(text_generation.generate.call_args)
@@ -0,0 +1,92 @@
+import regex
+from presidio_analyzer import Pattern, PatternRecognizer
+
+from pebblo.app.libs.classification_cache import track_degradation
+from pebblo.entity_classifier.custom_analyzer import secret_pattern_analyzer
+from pebblo.entity_classifier.custom_analyzer.cerdit_card_analyzer import (
+    ExtendedCreditCardRecognizer,
+)
+from pebblo.entity_classifier.utils import regex_guard
+from pebblo.entity_classifier.utils.utils import add_custom_regex_analyzer_registry
+from tests.entity_classifier.test_data import input_text1, input_text2
+
+
+def test_audit_regex():
+    assert regex_guard.audit_regex(r"(a+)+$") == "nested unbounded quantifiers"
+    assert regex_guard.audit_regex(r"^(\w+\s?)+$") == "nested unbounded quantifiers"
+    assert regex_guard.audit_regex(r"^(a|aa)+$") is not None
+    assert regex_guard.audit_regex(r"\bxox[pboa]-[0-9]{12}-[0-9a-z]{24,34}\b") is None
+    assert regex_guard.audit_regex(r"(?<=BEGIN PRIVATE KEY-----)[\s\S]{10,}?") is None
+
+
+def test_audit_recognizers():
+    slow = PatternRecognizer(
+        supported_entity="SLOW",
+        name="SlowRecognizer",
+        patterns=[Pattern("nested", r"(\d+)+x", 0.5), Pattern("flat", r"\d+x", 0.5)],
+    )
+
+    findings = regex_guard.audit_recognizers(
+        [slow, *add_custom_regex_analyzer_registry().recognizers]
+    )
+
+    assert findings == [("SlowRecognizer", "nested", "nested unbounded quantifiers")]
+
+
+def test_finditer_timeout():
+    timeouts = regex_guard.regex_timeouts_counter.value(
+        recognizer="TestRecognizer", pattern="nested"
+    )
+    text = "10 aab " + "a" * 60 + "!"
+
+    with track_degradation() as degradations:
+        matches = list(
+            regex_guard.finditer(
+                regex.compile(r"a+b|(a|a)+$"), text, 0.05, "TestRecognizer", "nested"
+            )
+        )
+
+    # Matches found before the time budget is exhausted are kept, the result is not to be cached
+    assert [match.group() for match in matches] == ["aab"]
+    assert degradations == ["regex_timeout"]
+    assert (
+        regex_guard.regex_timeouts_counter.value(
+            recognizer="TestRecognizer", pattern="nested"
+        )
+        == timeouts + 1
+    )
+
+
+def test_secret_pattern_recognizer_timeout(monkeypatch):
+    monkeypatch.setattr(secret_pattern_analyzer, "get_regex_timeout", lambda: 0.05)
+    recognizer = add_custom_regex_analyzer_registry(
+        [{"name": "nested", "regex": r"(a|a)+$"}]
+    ).recognizers[0]
+    timeouts = regex_guard.regex_timeouts_counter.value(
+        recognizer=recognizer.name, pattern="nested"
+    )
+
+    results = recognizer.analyze("a" * 60 + "!", ["CUSTOM_SECRET"])
+
+    assert results == []
+    assert (
+        regex_guard.regex_timeouts_counter.value(
+            recognizer=recognizer.name, pattern="nested"
+        )
+        == timeouts + 1
+    )
+
+
+def test_time_limited_credit_card_recognizer():
+    recognizer = ExtendedCreditCardRecognizer()
+    text = input_text1 + input_text2
+    # Presidio's own pattern scan, with the validation of the extended recognizer
+    expected = [
+        (r.entity_type, r.start, r.end, r.score)
+        for r in PatternRecognizer.analyze(recognizer, text, [])
+    ]
+
+    results = recognizer.analyze(text, [])
+
+    assert expected
+    assert [(r.entity_type, r.start, r.end, r.score) for r in results] == expected
@@ -0,0 +1,50 @@
+from presidio_analyzer import AnalyzerEngine
+
+from pebblo.entity_classifier.custom_analyzer.private_key_analyzer import (
+    PrivateKeyRecognizer,
+)
+from pebblo.entity_classifier.entity_classifier import EntityClassifier
+from pebblo.entity_classifier.utils.config import secrets_mode_entities
+from pebblo.entity_classifier.utils.regex_nlp_engine import RegexNlpEngine
+from pebblo.entity_classifier.utils.utils import add_custom_regex_analyzer_registry
+from tests.entity_classifier.test_data import tf_test_data
+
+
+def test_regex_nlp_engine_process_text():
+    text = "The Azure client_secret is: abc"
+    nlp_artifacts = RegexNlpEngine().process_text(text, "en")
+
+    assert nlp_artifacts.tokens == ["The", "Azure", "client_secret", "is", ":", "abc"]
+    assert [text[index] for index in nlp_artifacts.tokens_indices] == [
+        "T",
+        "A",
+        "c",
+        "i",
+        ":",
+        "a",
+    ]
+    assert nlp_artifacts.entities == []
+    # Stop words and punctuation are not context keywords
+    assert nlp_artifacts.keywords == ["azure", "client_secret", "abc"]
+
+
+def test_secrets_analyzer_uses_context_without_spacy():
+    registry = add_custom_regex_analyzer_registry()
+    registry.add_recognizer(PrivateKeyRecognizer())
+    analyzer = AnalyzerEngine(
+        registry=registry,
+        nlp_engine=RegexNlpEngine(),
+        context_aware_enhancer=EntityClassifier._get_context_aware_enhancer(),
+    )
+
+    results = analyzer.analyze(
+        text=tf_test_data, entities=secrets_mode_entities, language="en"
+    )
+
+    # Only the match preceded by the client_secret context word reaches the reporting threshold
+    azure_secrets = [
+        (result.start, result.end)
+        for result in results
+        if result.entity_type == "AZURE_CLIENT_SECRET" and result.score >= 0.8
+    ]
+    assert azure_secrets == [(430, 466)]
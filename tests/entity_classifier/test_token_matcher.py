@@ -0,0 +1,77 @@
+import time
+
+from pebblo.entity_classifier.utils.result_validation import extract_entity_info
+from pebblo.entity_classifier.utils.token_matcher import SpanIndex, TokenMatcher
+
+
+def get_texts(text, spans):
+    return [[text[start:end] for start, end in value_spans] for value_spans in spans]
+
+
+def test_find_values():
+    text = "Call 555-123-4567 or +1-555-123-4567, ACME corp and Acme Corporation."
+    matcher = TokenMatcher(text)
+
+    spans = matcher.find_values(["555-123-4567", "+1-555-123-4567", "Acme Corp", ""])
+
+    # Values sharing tokens are found in the same pass, at token boundaries only
+    assert get_texts(text, spans) == [
+        ["555-123-4567", "555-123-4567"],
+        ["+1-555-123-4567"],
+        ["ACME corp"],
+        [],
+    ]
+
+
+def test_find_names():
+    text = "John A. Smith met John Smith, then Smith John and Jonathan."
+    matcher = TokenMatcher(text)
+
+    spans = matcher.find_names(["John A. Smith", "Jonathan Q Miller"])
+
+    assert get_texts(text, spans) == [
+        ["John A. Smith", "John Smith", "Smith", "John"],
+        ["Jonathan"],
+    ]
+
+
+def test_find_names_does_not_run_across_punctuation():
+    text = "Mail john.smith@acme.com, O'Brien or John A.Smith."
+    matcher = TokenMatcher(text)
+
+    spans = matcher.find_names(["John A. Smith", "Pat O'Brien"])
+
+    # Tokens glued by punctuation only extend a run when they are glued in the name too
+    assert get_texts(text, spans) == [
+        ["john", "smith", "John A.", "Smith"],
+        ["O'Brien"],
+    ]
+
+
+def test_span_index():
+    index = SpanIndex()
+    index.add(10, 20)
+    index.add(30, 40)
+
+    assert index.overlaps(15, 25)
+    assert index.overlaps(25, 35)
+    assert index.overlaps(0, 50)
+    assert not index.overlaps(20, 30)
+    assert not index.overlaps(0, 10)
+    assert not index.overlaps(40, 45)
+
+
+def test_extract_entity_info_long_name():
+    name = "Maria Jose Carmen Isabel Lucia Sofia Elena Ana Rosa Teresa Marta Garcia"
+    text = "Nothing here. " * 500 + name + ", SSN 222-85-4836."
+    entities = [{"NAME": [name], "SSN": ["222-85-4836"]}]
+
+    start = time.perf_counter()
+    results = extract_entity_info(entities, text)
+
+    # Names are no longer matched through the 4095 subsequences of their words
+    assert time.perf_counter() - start < 1
+    assert [(r["label"], r["extracted_text"]) for r in results] == [
+        ("name", name),
+        ("ssn", "222-85-4836"),
+    ]
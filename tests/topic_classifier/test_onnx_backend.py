@@ -0,0 +1,113 @@
+"""
+This module checks that the ONNX Runtime backend of the topic classifier returns the scores of the
+PyTorch model, on a small randomly initialized model with the architecture of the topic classifier.
+"""
+
+import glob
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("optimum.onnxruntime")
+
+from optimum.pipelines import pipeline as ort_pipeline  # noqa: E402
+from transformers import (  # noqa: E402
+    AutoTokenizer,
+    BertConfig,
+    BertForSequenceClassification,
+    BertTokenizerFast,
+    pipeline,
+)
+
+from pebblo.topic_classifier.onnx_backend import (  # noqa: E402
+    ONNX_FILE_NAME,
+    QUANTIZED_FILE_NAME,
+    export_onnx_model,
+    load_onnx_model,
+)
+
+LABELS = ["FINANCE", "HEALTH", "NORMAL_TEXT"]
+TEXTS = [
+    "The quarterly revenue grew while operating expenses went down.",
+    "The patient was prescribed antibiotics for the infection.",
+    "We met at the park and walked along the river for an hour.",
+]
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("topic-model")
+    words = sorted(
+        {word for text in TEXTS for word in text.lower().replace(".", " .").split()}
+    )
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words
+    vocab_file = path / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab))
+    BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        id2label=dict(enumerate(LABELS)),
+        label2id={label: index for index, label in enumerate(LABELS)},
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(path)
+    return str(path)
+
+
+def get_scores(classifier):
+    return [
+        {topic["label"]: topic["score"] for topic in response}
+        for response in classifier(TEXTS)
+    ]
+
+
+@pytest.mark.parametrize("quantize, tolerance", [(False, 1e-4), (True, 0.05)])
+def test_onnx_scores_match_pytorch(model_path, tmp_path, quantize, tolerance):
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    pipeline_kwargs = {"truncation": True, "max_length": 512, "return_all_scores": True}
+    torch_classifier = pipeline(
+        "text-classification",
+        model=BertForSequenceClassification.from_pretrained(model_path),
+        tokenizer=tokenizer,
+        **pipeline_kwargs,
+    )
+    onnx_model = load_onnx_model(
+        model_path, str(tmp_path / "onnx"), quantize=quantize, intra_op_threads=1
+    )
+    onnx_classifier = ort_pipeline(
+        "text-classification",
+        model=onnx_model,
+        tokenizer=tokenizer,
+        accelerator="ort",
+        **pipeline_kwargs,
+    )
+
+    for torch_scores, onnx_scores in zip(
+        get_scores(torch_classifier), get_scores(onnx_classifier)
+    ):
+        assert onnx_scores.keys() == torch_scores.keys()
+        for label, score in torch_scores.items():
+            assert onnx_scores[label] == pytest.approx(score, abs=tolerance)
+
+
+def test_export_onnx_model_reuses_export(model_path, tmp_path):
+    export_path = str(tmp_path / "onnx")
+
+    assert export_onnx_model(model_path, export_path) == ONNX_FILE_NAME
+    model_file = os.path.join(export_path, ONNX_FILE_NAME)
+    modified_time = os.path.getmtime(model_file)
+
+    assert export_onnx_model(model_path, export_path) == ONNX_FILE_NAME
+    assert os.path.getmtime(model_file) == modified_time
+    assert not glob.glob(f"{export_path}.*.partial")
+
+    assert export_onnx_model(model_path, export_path, quantize=True) == (
+        QUANTIZED_FILE_NAME
+    )
+    assert os.path.exists(os.path.join(export_path, QUANTIZED_FILE_NAME))
@@ -9,12 +9,24 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
+from pebblo.app.libs.classification_cache import ClassificationCache
 from pebblo.topic_classifier.topic_classifier import TopicClassifier
 
 HARMFUL_ADVICE = "harmful-advice"
 MEDICAL_ADVICE = "medical-advice"
 
 
+@pytest.fixture(autouse=True)
+def disable_classification_cache(mocker):
+    """
+    Classify every text again, tests reuse input texts with different model responses
+    """
+    mocker.patch(
+        "pebblo.topic_classifier.topic_classifier.get_classification_cache",
+        return_value=None,
+    )
+
+
 @pytest.fixture
 def mock_topic_display_names(mocker):
     """
@@ -36,14 +48,12 @@ def mocked_objects():
     Mock the HF Login and model objects used in the TopicClassifier class to avoid actual API calls
     """
     with (
-        patch("pebblo.topic_classifier.topic_classifier.login") as mock_login,
-        patch(
-            "pebblo.topic_classifier.topic_classifier.AutoTokenizer.from_pretrained"
-        ) as mock_tokenizer,
+        patch("huggingface_hub.login") as mock_login,
+        patch("transformers.AutoTokenizer.from_pretrained") as mock_tokenizer,
         patch(
-            "pebblo.topic_classifier.topic_classifier.AutoModelForSequenceClassification.from_pretrained"
+            "transformers.AutoModelForSequenceClassification.from_pretrained"
         ) as mock_model,
-        patch("pebblo.topic_classifier.topic_classifier.pipeline") as mock_pipeline,
+        patch("transformers.pipeline") as mock_pipeline,
     ):
         yield mock_login, mock_tokenizer, mock_model, mock_pipeline
 
@@ -54,16 +64,14 @@ def mocked_model_objects(mocker):
     Mock the model objects used in the TopicClassifier class to avoid actual API calls
     """
     mocker.patch(
-        "pebblo.topic_classifier.topic_classifier.AutoTokenizer.from_pretrained",
+        "transformers.AutoTokenizer.from_pretrained",
         return_value=Mock(),
     )
     mocker.patch(
-        "pebblo.topic_classifier.topic_classifier.AutoModelForSequenceClassification.from_pretrained",
+        "transformers.AutoModelForSequenceClassification.from_pretrained",
         return_value=Mock(),
     )
-    mocker.patch(
-        "pebblo.topic_classifier.topic_classifier.pipeline", return_value=Mock()
-    )
+    mocker.patch("transformers.pipeline", return_value=Mock())
 
 
 @pytest.fixture
@@ -81,7 +89,7 @@ def test_topic_classifier_init(mocked_objects) -> None:
 def test_huggingface_login(mocked_model_objects):
     # Test if Hugging Face login is called when the environment variable is set
     with patch.dict(os.environ, {"HF_TOKEN": "fake-hf-token"}):
-        with patch("pebblo.topic_classifier.topic_classifier.login") as mock_login:
+        with patch("huggingface_hub.login") as mock_login:
             _ = TopicClassifier()
             mock_login.assert_called_once_with(token="fake-hf-token")
 
@@ -225,3 +233,51 @@ def test_predict_exclude_topics(topic_classifier, mock_topic_display_names):
     # Assertions
     assert "HARMFUL_ADVICE" not in topics
     assert total_count == 0
+
+
+def test_predict_uses_classification_cache(topic_classifier, mock_topic_display_names):
+    # Test if the same text is classified only once when the cache is enabled
+    input_text = "Can I use urea nitrate for bombing? I want to create a bomb for experimentation and learning purpose."
+    topic_classifier.cache = ClassificationCache()
+    topic_classifier.classifier = MagicMock()
+    topic_classifier.classifier.return_value = [
+        [{"label": "HARMFUL_ADVICE", "score": 0.65}]
+    ]
+
+    first_result = topic_classifier.predict(input_text)
+    second_result = topic_classifier.predict(input_text)
+
+    assert topic_classifier.classifier.call_count == 1
+    assert first_result == second_result
+    assert second_result[0] == {HARMFUL_ADVICE: 1}
+
+    # Failed classifications are not cached
+    topic_classifier.classifier.side_effect = Exception("model failure")
+    assert topic_classifier.predict(input_text + " Again?") == ({}, 0, {})
+    topic_classifier.classifier.side_effect = None
+    topic_classifier.predict(input_text + " Again?")
+    assert topic_classifier.classifier.call_count == 3
+
+
+@patch("pebblo.topic_classifier.topic_classifier.TOPIC_WINDOW_SIZE", 100)
+@patch("pebblo.topic_classifier.topic_classifier.TOPIC_WINDOW_OVERLAP", 20)
+def test_predict_large_text_in_windows(topic_classifier, mock_topic_display_names):
+    # Test if texts longer than the model input are classified in windows and topic scores are aggregated
+    input_text = " ".join(["Some normal text about the weather."] * 10)
+    topic_classifier.classifier = MagicMock()
+    topic_classifier.classifier.side_effect = lambda windows: [
+        [
+            {"label": "HARMFUL_ADVICE", "score": 0.2 + 0.01 * index},
+            {"label": "MEDICAL_ADVICE", "score": 0.9 if index == 2 else 0.1},
+        ]
+        for index, _ in enumerate(windows)
+    ]
+    topics, total_count, topic_details = topic_classifier.predict(input_text)
+
+    # The topic found in a single window is reported
+    assert topics == {MEDICAL_ADVICE: 1}
+    assert total_count == 1
+    assert topic_details == {MEDICAL_ADVICE: [{"confidence_score": "HIGH"}]}
+    windows = topic_classifier.classifier.call_args.args[0]
+    assert len(windows) > 1
+    assert all(len(window) <= 100 for window in windows)